@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.common'
+
+    def ready(self):
+        # Process-wide caches are checked against data versions: track the
+        # models behind them in every process so any write invalidates them.
+        from apps.common import fx, settings_cache  # noqa: F401
+        from apps.common.models import MrpRescheduleDaysClassification, PurchaseTimelinessClassification
+        from apps.django_bi.utils.data_versions import track_data_versions
+
+        track_data_versions(MrpRescheduleDaysClassification, PurchaseTimelinessClassification)
@@ -1,7 +1,10 @@
 """Reusable filter choice builders grouped by model.
 
 Each module inside this package should correspond to a model domain and expose
-callables with the signature: fn(user, query="") -> list[(value, label)].
+callables with the signature: fn(user, query="", ids=None, allowed=None) ->
+list[(value, label)]. ``allowed`` is either a list of values or a subquery of
+values still reachable under the block's other active filters; callables should
+apply it as ``code__in=allowed`` so narrowing and limiting happen in SQL.
 """
 
 __all__ = []
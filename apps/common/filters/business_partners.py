@@ -1,42 +1,47 @@
-from typing import List, Tuple, Callable, Optional
+from typing import List, Tuple, Callable, Optional, Iterable
 
 from apps.common.models import BusinessPartner
-from django.db.models import Q
+
+from .search import search_queryset, with_default_order
 
 def _apply_supplier_search(qs, query: str):
-    if query:
-        qs = qs.filter(Q(code__icontains=query) | Q(name__icontains=query))
-    return qs
+    return search_queryset(qs, query, ("code", "name"))
 
 def format_supplier_choices(qs, limit: int = 200) -> List[Tuple[str, str]]:
     return [
         (bp.code, f"{bp.code} - {bp.name}".strip(" -"))
-        for bp in qs.order_by("code")[:limit]
+        for bp in with_default_order(qs, "code")[:limit]
     ]
 
 def make_supplier_choices_for_queryset(qs_provider: Callable[[object], "models.QuerySet[BusinessPartner]"]):
-    def _choices(user, query: str = "", ids: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+    def _choices(user, query: str = "", ids: Optional[List[str]] = None, allowed: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
         qs = qs_provider(user)
         if ids:
             qs = qs.filter(code__in=ids)
+        if allowed is not None:
+            qs = qs.filter(code__in=allowed)
         qs = _apply_supplier_search(qs, query)
         return format_supplier_choices(qs)
     return _choices
 
 # START ADDING FROM HERE
-def supplier_choices(user, query: str = "", ids: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+def supplier_choices(user, query: str = "", ids: Optional[List[str]] = None, allowed: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
     """Return supplier choices as (code, "code - name")."""
     qs = BusinessPartner.objects.all()
     if ids:
         qs = qs.filter(code__in=ids)
+    if allowed is not None:
+        qs = qs.filter(code__in=allowed)
     qs = _apply_supplier_search(qs, query)
     return format_supplier_choices(qs)
 
-def supplier_choices_for_open_po(user, query: str = "", ids: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+def supplier_choices_for_open_po(user, query: str = "", ids: Optional[List[str]] = None, allowed: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
     """Suppliers that appear on open Purchase Order Lines."""
     base = BusinessPartner.objects.filter(purchaseorder__purchaseorderline__status="open").distinct()
     if ids:
         base = base.filter(code__in=ids)
+    if allowed is not None:
+        base = base.filter(code__in=allowed)
     qs = _apply_supplier_search(base, query)
     return format_supplier_choices(qs)
 
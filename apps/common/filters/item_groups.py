@@ -1,21 +1,20 @@
-from typing import List, Tuple, Callable, Optional
+from typing import List, Tuple, Callable, Optional, Iterable
 
 from apps.common.models import ItemGroup
-from django.db.models import Q
+
+from .search import search_queryset, with_default_order
 
 
 def _apply_item_group_search(qs, query: str):
-    """Apply case-insensitive search on code/description if query provided."""
-    if query:
-        qs = qs.filter(Q(code__icontains=query) | Q(description__icontains=query))
-    return qs
+    """Apply ranked search on code/description if query provided."""
+    return search_queryset(qs, query, ("code", "description"))
 
 
 def format_item_group_choices(qs, limit: int = 200) -> List[Tuple[str, str]]:
     """Format a queryset of Items into (value, label) pairs with a limit."""
     return [
         (i.code, f"{i.code} - {i.description}".strip())
-        for i in qs.order_by("code")[:limit]
+        for i in with_default_order(qs, "code")[:limit]
     ]
 
 def make_item_group_choices_for_queryset(qs_provider: Callable[[object], "models.QuerySet[ItemGroup]"]):
@@ -24,25 +23,29 @@ def make_item_group_choices_for_queryset(qs_provider: Callable[[object], "models
     qs_provider(user) -> QuerySet[ItemGroup]
     Returned function conforms to (user, query) signature used by FilterChoicesView.
     """
-    def _choices(user, query: str = "", ids: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+    def _choices(user, query: str = "", ids: Optional[List[str]] = None, allowed: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
         qs = qs_provider(user)
         if ids:
             qs = qs.filter(code__in=ids)
+        if allowed is not None:
+            qs = qs.filter(code__in=allowed)
         qs = _apply_item_group_search(qs, query)
         return format_item_group_choices(qs)
 
     return _choices
 
-def item_group_choices(user, query: str = "", ids: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+def item_group_choices(user, query: str = "", ids: Optional[List[str]] = None, allowed: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
     """Return item choices as (code, "code - description")."""
     qs = ItemGroup.objects.all()
     if ids:
         qs = qs.filter(code__in=ids)
+    if allowed is not None:
+        qs = qs.filter(code__in=allowed)
     qs = _apply_item_group_search(qs, query)
     return format_item_group_choices(qs)
 
 # START ADDING FROM HERE
-def item_group_choices_for_open_po(user, query: str = "", ids: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+def item_group_choices_for_open_po(user, query: str = "", ids: Optional[List[str]] = None, allowed: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
     """Return item group choices limited to groups used by open PurchaseOrderLines.
 
     Traverses via Item: ItemGroup <- Item.item_group <- PurchaseOrderLine.item
@@ -50,6 +53,8 @@ def item_group_choices_for_open_po(user, query: str = "", ids: Optional[List[str
     base = ItemGroup.objects.filter(item__purchaseorderline__status="open").distinct()
     if ids:
         base = base.filter(code__in=ids)
+    if allowed is not None:
+        base = base.filter(code__in=allowed)
     qs = _apply_item_group_search(base, query)
     return format_item_group_choices(qs)
 
@@ -1,46 +1,51 @@
-from typing import List, Tuple, Callable, Optional
+from typing import List, Tuple, Callable, Optional, Iterable
 
 from apps.common.models import Program
-from django.db.models import Q
+
+from .search import search_queryset, with_default_order
 
 
 def _apply_program_search(qs, query: str):
-    if query:
-        qs = qs.filter(Q(code__icontains=query) | Q(name__icontains=query))
-    return qs
+    return search_queryset(qs, query, ("code", "name"))
 
 
 def format_program_choices(qs, limit: int = 200) -> List[Tuple[str, str]]:
     return [
         (o.code, f"{o.code} - {o.name}".strip(" -"))
-        for o in qs.order_by("code")[:limit]
+        for o in with_default_order(qs, "code")[:limit]
     ]
 
 
 def make_program_choices_for_queryset(qs_provider: Callable[[object], "models.QuerySet[Program]"]):
-    def _choices(user, query: str = "", ids: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+    def _choices(user, query: str = "", ids: Optional[List[str]] = None, allowed: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
         qs = qs_provider(user)
         if ids:
             qs = qs.filter(code__in=ids)
+        if allowed is not None:
+            qs = qs.filter(code__in=allowed)
         qs = _apply_program_search(qs, query)
         return format_program_choices(qs)
 
     return _choices
 
 
-def program_choices(user, query: str = "", ids: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+def program_choices(user, query: str = "", ids: Optional[List[str]] = None, allowed: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
     qs = Program.objects.all()
     if ids:
         qs = qs.filter(code__in=ids)
+    if allowed is not None:
+        qs = qs.filter(code__in=allowed)
     qs = _apply_program_search(qs, query)
     return format_program_choices(qs)
 
 
-def program_choices_for_open_po(user, query: str = "", ids: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+def program_choices_for_open_po(user, query: str = "", ids: Optional[List[str]] = None, allowed: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
     # Program <- ItemGroup (program) <- Item (item_group) <- PurchaseOrderLine (item)
     base = Program.objects.filter(itemgroup__item__purchaseorderline__status="open").distinct()
     if ids:
         base = base.filter(code__in=ids)
+    if allowed is not None:
+        base = base.filter(code__in=allowed)
     qs = _apply_program_search(base, query)
     return format_program_choices(qs)
 
@@ -11,6 +11,7 @@ from .item_group_types import item_group_type_choices
 from .programs import program_choices
 from .item_types import item_type_choices
 from apps.common.models.planning import BaseMrpMessage
+from apps.django_bi.blocks.services.filter_schema import q_handler
 
 def supplier_filter(
     block_name: str,
@@ -24,8 +25,8 @@ def supplier_filter(
     supplier_code_path: Django lookup path to supplier code (e.g., "order__supplier__code").
     """
 
-    def handler(qs, val):
-        return qs.filter(**{f"{supplier_code_path}__in": val}) if val else qs
+    def q(val):
+        return Q(**{f"{supplier_code_path}__in": val}) if val else None
 
     return {
         "label": label,
@@ -41,7 +42,8 @@ def supplier_filter(
             "plugins": ["remove_button"],
             "maxItems": maxItems,
         },
-        "handler": handler,
+        "handler": q_handler(q),
+        "q": q,
     }
 
 
@@ -57,8 +59,8 @@ def item_filter(
     item_code_path: Django lookup path to item code (e.g., "item__code").
     """
 
-    def handler(qs, val):
-        return qs.filter(**{f"{item_code_path}__in": val}) if val else qs
+    def q(val):
+        return Q(**{f"{item_code_path}__in": val}) if val else None
 
     return {
         "label": label,
@@ -72,7 +74,8 @@ def item_filter(
             "plugins": ["remove_button"],
             "maxItems": maxItems,
         },
-        "handler": handler,
+        "handler": q_handler(q),
+        "q": q,
     }
 
 def item_group_filter(
@@ -87,8 +90,8 @@ def item_group_filter(
     item_group_code_path: Django lookup path to item code (e.g., "item_group__code").
     """
 
-    def handler(qs, val):
-        return qs.filter(**{f"{item_group_code_path}__in": val}) if val else qs
+    def q(val):
+        return Q(**{f"{item_group_code_path}__in": val}) if val else None
 
     return {
         "label": label,
@@ -102,7 +105,8 @@ def item_group_filter(
             "plugins": ["remove_button"],
             "maxItems": maxItems,
         },
-        "handler": handler,
+        "handler": q_handler(q),
+        "q": q,
     }
 
 def item_group_type_filter(
@@ -114,8 +118,8 @@ def item_group_type_filter(
 ) -> Dict[str, Any]:
     """Reusable item group type multi-select filter."""
 
-    def handler(qs, val):
-        return qs.filter(**{f"{item_group_type_code_path}__in": val}) if val else qs
+    def q(val):
+        return Q(**{f"{item_group_type_code_path}__in": val}) if val else None
 
     return {
         "label": label,
@@ -131,7 +135,8 @@ def item_group_type_filter(
             "plugins": ["remove_button"],
             "maxItems": maxItems,
         },
-        "handler": handler,
+        "handler": q_handler(q),
+        "q": q,
     }
 
 def program_filter(
@@ -143,8 +148,8 @@ def program_filter(
 ) -> Dict[str, Any]:
     """Reusable program multi-select filter."""
 
-    def handler(qs, val):
-        return qs.filter(**{f"{program_code_path}__in": val}) if val else qs
+    def q(val):
+        return Q(**{f"{program_code_path}__in": val}) if val else None
 
     return {
         "label": label,
@@ -158,7 +163,8 @@ def program_filter(
             "plugins": ["remove_button"],
             "maxItems": maxItems,
         },
-        "handler": handler,
+        "handler": q_handler(q),
+        "q": q,
     }
 
 def item_type_filter(
@@ -170,8 +176,8 @@ def item_type_filter(
 ) -> Dict[str, Any]:
     """Reusable item type multi-select filter."""
 
-    def handler(qs, val):
-        return qs.filter(**{f"{item_type_code_path}__in": val}) if val else qs
+    def q(val):
+        return Q(**{f"{item_type_code_path}__in": val}) if val else None
 
     return {
         "label": label,
@@ -185,7 +191,8 @@ def item_type_filter(
             "plugins": ["remove_button"],
             "maxItems": maxItems,
         },
-        "handler": handler,
+        "handler": q_handler(q),
+        "q": q,
     }
 
 def mrp_reschedule_direction_filter(
@@ -196,8 +203,8 @@ def mrp_reschedule_direction_filter(
 ) -> Dict[str, Any]:
     """Reusable multiselect filter for MRP reschedule direction (PULL_IN/PUSH_OUT)."""
 
-    def handler(qs, val):
-        return qs.filter(**{f"{direction_path}__in": val}) if val else qs
+    def q(val):
+        return Q(**{f"{direction_path}__in": val}) if val else None
 
     choices = list(BaseMrpMessage.DIRECTION_CHOICES)
 
@@ -215,7 +222,8 @@ def mrp_reschedule_direction_filter(
             "plugins": ["remove_button"],
             "maxItems": maxItems,
         },
-        "handler": handler,
+        "handler": q_handler(q),
+        "q": q,
     }
 
 def purchase_order_category_filter(
@@ -230,8 +238,8 @@ def purchase_order_category_filter(
     item_code_path: Django lookup path to item code (e.g., "item__code").
     """
 
-    def handler(qs, val):
-        return qs.filter(**{f"{po_category_code_path}__in": val}) if val else qs
+    def q(val):
+        return Q(**{f"{po_category_code_path}__in": val}) if val else None
 
     return {
         "label": label,
@@ -245,7 +253,8 @@ def purchase_order_category_filter(
             "plugins": ["remove_button"],
             "maxItems": maxItems,
         },
-        "handler": handler,
+        "handler": q_handler(q),
+        "q": q,
     }
 
 def date_from_filter(key: str, label: str, date_field_path: str) -> Dict[str, Any]:
@@ -253,13 +262,14 @@ def date_from_filter(key: str, label: str, date_field_path: str) -> Dict[str, An
 
     lookup = f"{date_field_path}__gte"
 
-    def handler(qs, val):
-        return qs.filter(**{lookup: val}) if val else qs
+    def q(val):
+        return Q(**{lookup: val}) if val else None
 
     return {
         "label": label,
         "type": "date",
-        "handler": handler,
+        "handler": q_handler(q),
+        "q": q,
     }
 
 
@@ -268,13 +278,14 @@ def date_to_filter(key: str, label: str, date_field_path: str) -> Dict[str, Any]
 
     lookup = f"{date_field_path}__lte"
 
-    def handler(qs, val):
-        return qs.filter(**{lookup: val}) if val else qs
+    def q(val):
+        return Q(**{lookup: val}) if val else None
 
     return {
         "label": label,
         "type": "date",
-        "handler": handler,
+        "handler": q_handler(q),
+        "q": q,
     }
 
 
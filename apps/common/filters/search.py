@@ -0,0 +1,227 @@
+"""Search backends for filter choice lookups.
+
+``search_queryset(qs, query, fields)`` narrows ``qs`` to rows whose ``fields``
+contain ``query`` and orders them by relevance (exact code match, code
+prefix, other prefixes, then similarity), leaving the LIMIT to the caller so it
+runs in the database.
+
+Backends:
+
+- ``trigram`` (PostgreSQL): ``icontains`` served by the pg_trgm GIN indexes
+  created in ``apps/common/migrations/0002_filter_search_trgm_indexes.py``,
+  ranked with ``similarity()``.
+- ``ngram`` (other databases): a process-local trigram index per model and
+  field set resolves candidate primary keys; it is rebuilt when the model's
+  data version changes (saves, deletes, imports).
+- ``icontains``: plain ``icontains`` filters, ranked by prefix tiers.
+
+The backend is chosen from the connection vendor; ``FILTER_SEARCH_BACKEND``
+in settings forces one of the names above.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import (
+    Case,
+    F,
+    FloatField,
+    Func,
+    IntegerField,
+    Q,
+    QuerySet,
+    Value,
+    When,
+)
+from django.db.models.functions import Greatest, Upper
+
+from apps.django_bi.utils.data_versions import get_data_version
+
+__all__ = [
+    "IContainsSearchBackend",
+    "NgramSearchBackend",
+    "TrigramSearchBackend",
+    "get_search_backend",
+    "search_queryset",
+    "with_default_order",
+]
+
+NGRAM_SIZE = 3
+
+
+class Similarity(Func):
+    """pg_trgm ``similarity(a, b)``."""
+
+    function = "SIMILARITY"
+    output_field = FloatField()
+
+
+def _icontains_q(fields: Sequence[str], query: str) -> Q:
+    q = Q()
+    for field in fields:
+        q |= Q(**{f"{field}__icontains": query})
+    return q
+
+
+def _tier_rank(fields: Sequence[str], query: str) -> Case:
+    """Rank exact code, code prefix and other-field prefixes above the rest."""
+    code = fields[0]
+    whens = [
+        When(**{f"{code}__iexact": query}, then=Value(3)),
+        When(**{f"{code}__istartswith": query}, then=Value(2)),
+    ]
+    for field in fields[1:]:
+        whens.append(When(**{f"{field}__istartswith": query}, then=Value(1)))
+    return Case(*whens, default=Value(0), output_field=IntegerField())
+
+
+class IContainsSearchBackend:
+    """Plain ``icontains`` filtering ranked by prefix tiers."""
+
+    name = "icontains"
+
+    def search(self, qs: QuerySet, query: str, fields: Sequence[str]) -> QuerySet:
+        return (
+            qs.filter(_icontains_q(fields, query))
+            .annotate(_search_tier=_tier_rank(fields, query))
+            .order_by("-_search_tier", fields[0])
+        )
+
+
+class TrigramSearchBackend(IContainsSearchBackend):
+    """PostgreSQL pg_trgm search ranked by ``similarity()``."""
+
+    name = "trigram"
+
+    def search(self, qs: QuerySet, query: str, fields: Sequence[str]) -> QuerySet:
+        needle = Upper(Value(query))
+        scores = [Similarity(Upper(F(field)), needle) for field in fields]
+        score = scores[0] if len(scores) == 1 else Greatest(*scores)
+        return (
+            qs.filter(_icontains_q(fields, query))
+            .annotate(
+                _search_tier=_tier_rank(fields, query),
+                _search_score=score,
+            )
+            .order_by("-_search_tier", "-_search_score", fields[0])
+        )
+
+
+def _ngrams(text: str) -> set:
+    text = f" {text} "
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class _NgramIndex:
+    """Trigram -> primary keys postings plus normalized text per row."""
+
+    def __init__(self, rows):
+        self.postings: Dict[str, List] = defaultdict(list)
+        self.texts: Dict[object, str] = {}
+        for pk, parts in rows:
+            # NUL-separated so a match cannot span two fields.
+            text = "\x00".join(str(p) for p in parts if p not in (None, "")).upper()
+            self.texts[pk] = text
+            for gram in _ngrams(text):
+                self.postings[gram].append(pk)
+
+    def candidates(self, query: str) -> Optional[set]:
+        needle = query.upper()
+        grams = {needle[i : i + NGRAM_SIZE] for i in range(len(needle) - NGRAM_SIZE + 1)}
+        if not grams:
+            return None
+        lists = sorted((self.postings.get(g, ()) for g in grams), key=len)
+        found = set(lists[0])
+        for posting in lists[1:]:
+            found.intersection_update(posting)
+            if not found:
+                break
+        return {pk for pk in found if needle in self.texts[pk]}
+
+
+class NgramSearchBackend(IContainsSearchBackend):
+    """Process-local trigram index for databases without pg_trgm.
+
+    Rebuilt when the model's shared data version changes, which includes
+    writes made by import commands and other workers.
+    """
+
+    name = "ngram"
+    # Above this many candidates the query is not selective; let the DB scan.
+    MAX_CANDIDATES = 5000
+
+    _indexes: Dict[Tuple, Tuple[int, _NgramIndex]] = {}
+    _lock = threading.Lock()
+
+    def _get_index(self, qs: QuerySet, fields: Sequence[str]) -> _NgramIndex:
+        model = qs.model
+        key = (qs.db, model._meta.label_lower, tuple(fields))
+        version = get_data_version(model)
+        cached = self._indexes.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with self._lock:
+            cached = self._indexes.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            rows = (
+                (row[0], row[1:])
+                for row in model._default_manager.using(qs.db)
+                .order_by("pk")
+                .values_list("pk", *fields)
+                .iterator(chunk_size=5000)
+            )
+            index = _NgramIndex(rows)
+            self._indexes[key] = (version, index)
+            return index
+
+    def search(self, qs: QuerySet, query: str, fields: Sequence[str]) -> QuerySet:
+        candidates = None
+        if len(query) >= NGRAM_SIZE:
+            candidates = self._get_index(qs, fields).candidates(query)
+        if candidates is None or len(candidates) > self.MAX_CANDIDATES:
+            return super().search(qs, query, fields)
+        return (
+            qs.filter(pk__in=candidates)
+            .annotate(_search_tier=_tier_rank(fields, query))
+            .order_by("-_search_tier", fields[0])
+        )
+
+
+_BACKENDS = {
+    backend.name: backend
+    for backend in (IContainsSearchBackend(), TrigramSearchBackend(), NgramSearchBackend())
+}
+
+
+def get_search_backend(using: str = "default"):
+    """Return the search backend for the database alias ``using``."""
+    forced = getattr(settings, "FILTER_SEARCH_BACKEND", None)
+    if forced:
+        return _BACKENDS[forced]
+    if connections[using].vendor == "postgresql":
+        return _BACKENDS["trigram"]
+    return _BACKENDS["ngram"]
+
+
+def search_queryset(qs: QuerySet, query: str, fields: Sequence[str]) -> QuerySet:
+    """Filter ``qs`` by ``query`` over ``fields`` and order by relevance.
+
+    ``fields[0]`` is treated as the code field for exact/prefix ranking.
+    """
+    query = (query or "").strip()
+    if not query:
+        return qs
+    return get_search_backend(qs.db).search(qs, query, fields)
+
+
+def with_default_order(qs: QuerySet, *ordering: str) -> QuerySet:
+    """Apply ``ordering`` unless ``qs`` is already explicitly ordered (ranked)."""
+    if qs.query.order_by:
+        return qs
+    return qs.order_by(*ordering)
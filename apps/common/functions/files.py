@@ -1,7 +1,7 @@
 from datetime import date
 from dateutil.relativedelta import relativedelta
 from django.core.management import call_command
-from shutil import copyfile
+import codecs
 import os
 from datetime import date, timedelta
 import pandas as pd
@@ -9,47 +9,71 @@ from numpy import nan
 
 today = date.today()
 
-def read_text_contents(filename, ignore_line_list):
+# Tried in order on a sample of the file; latin-1 decodes any byte
+TEXT_ENCODINGS = ("utf-8", "cp1252", "latin-1")
+ENCODING_SAMPLE_SIZE = 1 << 20
+
+
+def find_dated_file(filename, max_days_back=10):
+    """Path of ``<filename><mm-dd-yy>.txt`` for today, or the latest of the previous days."""
     no_days = 0
     full_filename = filename + today.strftime("%m-%d-%y") + ".txt"
 
     # If file doesnt exist, check for the previous days
-    while not os.path.exists(full_filename) and no_days < 10:
+    while not os.path.exists(full_filename) and no_days < max_days_back:
         no_days += 1
         full_filename = filename + (today - timedelta(days=no_days)).strftime("%m-%d-%y") + ".txt"
+    return full_filename
 
-    file_copy = "copy of " + os.path.basename(full_filename)
-    copyfile(full_filename, file_copy)
-
-    # Read with encoding fallback to safely handle accented characters
-    def _read_lines(path):
-        last_err = None
-        for enc in ("utf-8", "utf-8-sig", "cp1252", "latin-1"):
-            try:
-                with open(path, "r", encoding=enc) as f:
-                    return f.readlines()
-            except UnicodeDecodeError as e:
-                last_err = e
-                continue
-        # Final fallback with replacement to avoid crashing (preserve as much as possible)
-        with open(path, "r", encoding="utf-8", errors="replace") as f:
-            return f.readlines()
 
-    lines = _read_lines(file_copy)
+def detect_encoding(path, sample_size=ENCODING_SAMPLE_SIZE):
+    """First of ``TEXT_ENCODINGS`` that decodes the start of ``path`` (``utf-8-sig`` with a BOM)."""
+    with open(path, "rb") as f:
+        sample = f.read(sample_size)
+        final = not f.read(1)
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    for enc in TEXT_ENCODINGS:
+        try:
+            # Incremental, so a character cut at the end of the sample still decodes
+            codecs.getincrementaldecoder(enc)().decode(sample, final=final)
+            return enc
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
 
-    # Write cleaned copy in UTF-8 to normalize downstream reading
-    with open(file_copy, "w", encoding="utf-8") as f:
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            # Skip header/separator or ignored prefixes
-            if line.startswith(tuple(ignore_line_list)):
+
+def iter_text_lines(path, ignore_line_list=(), predicates=(), delimiter="|", encoding=None):
+    """Stream the cleaned lines of the text export at ``path``.
+
+    Lines are stripped; blank lines and lines starting with one of
+    ``ignore_line_list`` are skipped, and each of ``predicates`` gets the
+    stripped ``delimiter``-split cells of the remaining lines and returns
+    whether to keep them. The encoding is detected once on a sample (see
+    :func:`detect_encoding`); bytes it can't decode further on are replaced.
+    """
+    prefixes = tuple(ignore_line_list)
+    encoding = encoding or detect_encoding(path)
+    with open(path, "r", encoding=encoding, errors="replace", newline=None) as f:
+        for raw in f:
+            line = raw.strip()
+            # Skip blank, header/separator or ignored prefixes
+            if not line or (prefixes and line.startswith(prefixes)):
                 continue
-            f.write(line)
-            f.write("\n")
+            if predicates:
+                parts = [p.strip() for p in line.split(delimiter)]
+                if not all(predicate(parts) for predicate in predicates):
+                    continue
+            yield line
+
+
+def stage_text_contents(filename, ignore_line_list, predicates=(), delimiter="|"):
+    """:func:`iter_text_lines` of the latest date-stamped ``filename`` export.
 
-    return file_copy
+    Feed the result to ``import_rows_from_text(lines=...)``; nothing is
+    copied to disk and only one line is held in memory at a time.
+    """
+    return iter_text_lines(find_dated_file(filename), ignore_line_list, predicates, delimiter)
 
 
 def check_file_line(line):
@@ -1,16 +1,21 @@
 from __future__ import annotations
 
+import threading
+from bisect import bisect_right
+from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
-from django.db.models import Q
+import numpy as np
 
-from apps.common.models import ExchangeRate, GlobalSettings
+from apps.common.models import Currency, ExchangeRate, GlobalSettings
+from apps.common.settings_cache import get_home_currency_code
+from apps.django_bi.utils.data_versions import get_data_versions, track_data_versions
 
+track_data_versions(ExchangeRate, Currency, GlobalSettings)
 
-def get_home_currency_code(default: str = "CAD") -> str:
-    obj = GlobalSettings.objects.order_by("id").first()
-    return getattr(obj, "home_currency_code", None) or default
+_lock = threading.Lock()
+_rate_index: Optional[Tuple[Dict[str, int], "FxRateIndex"]] = None
 
 
 def _quantize(amount: Decimal, places: int = 2) -> Decimal:
@@ -18,52 +23,144 @@ def _quantize(amount: Decimal, places: int = 2) -> Decimal:
     return amount.quantize(q, rounding=ROUND_HALF_UP)
 
 
-def get_rate(base: str, quote: str, date=None, strategy: str = "on_or_before") -> Optional[Decimal]:
-    base = (base or "").upper()
-    quote = (quote or "").upper()
-    if not base or not quote:
-        return None
-    if base == quote:
-        return Decimal("1")
+class FxRateIndex:
+    """Exchange rates held as per-pair date-sorted arrays, looked up by bisect.
+
+    ``rows`` yields ``(base_code, quote_code, rate_date, rate)``; for the same
+    pair and date the last row wins. Pairs without rates of their own are
+    answered through their inverse, then by triangulating through ``home``.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str, object, object]], home: str = "CAD"):
+        self.home = (home or "").upper()
+        by_pair: Dict[Tuple[str, str], Dict[object, Decimal]] = {}
+        for base, quote, rate_date, rate in rows:
+            if not base or not quote or rate is None:
+                continue
+            by_pair.setdefault((base.upper(), quote.upper()), {})[rate_date] = Decimal(rate)
+        self.pairs: Dict[Tuple[str, str], Tuple[List[object], List[Decimal]]] = {}
+        for pair, points in by_pair.items():
+            dates = sorted(points)
+            self.pairs[pair] = (dates, [points[d] for d in dates])
+        self._arrays: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
 
-    qs = ExchangeRate.objects.filter(base__code=base, quote__code=quote)
-    if date:
+    @classmethod
+    def from_db(cls) -> "FxRateIndex":
+        rows = ExchangeRate.objects.order_by("rate_date", "id").values_list(
+            "base__code", "quote__code", "rate_date", "rate"
+        )
+        return cls(rows.iterator(chunk_size=5000), home=get_home_currency_code())
+
+    def _point(self, base: str, quote: str, date, strategy: str) -> Optional[Decimal]:
+        series = self.pairs.get((base, quote))
+        if series is None:
+            return None
+        dates, rates = series
+        if not date or strategy == "latest":
+            return rates[-1]
+        i = bisect_right(dates, date)
         if strategy == "on":
-            qs = qs.filter(rate_date=date)
-        elif strategy == "on_or_before":
-            qs = qs.filter(rate_date__lte=date)
-        elif strategy == "latest":
-            pass
-        else:
-            qs = qs.filter(rate_date__lte=date)
-        qs = qs.order_by("-rate_date", "-id")
-    else:
-        qs = qs.order_by("-rate_date", "-id")
-
-    row = qs.first()
-    if row:
-        try:
-            return Decimal(row.rate)
-        except Exception:
+            return rates[i - 1] if i and dates[i - 1] == date else None
+        return rates[i - 1] if i else None
+
+    def _direct_or_inverse(self, base: str, quote: str, date, strategy: str) -> Optional[Decimal]:
+        rate = self._point(base, quote, date, strategy)
+        if rate is not None:
+            return rate
+        inverse = self._point(quote, base, date, strategy)
+        if inverse is None or inverse == 0:
             return None
+        return Decimal("1") / inverse
 
-    # Try inverse pair and invert
-    inv = ExchangeRate.objects.filter(base__code=quote, quote__code=base)
-    if date:
-        if strategy == "on":
-            inv = inv.filter(rate_date=date)
-        elif strategy == "on_or_before":
-            inv = inv.filter(rate_date__lte=date)
-    inv = inv.order_by("-rate_date", "-id").first()
-    if inv:
-        try:
-            v = Decimal(inv.rate)
-            if v == 0:
-                return None
-            return Decimal("1") / v
-        except Exception:
+    def rate(self, base: str, quote: str, date=None, strategy: str = "on_or_before") -> Optional[Decimal]:
+        base = (base or "").upper()
+        quote = (quote or "").upper()
+        if not base or not quote:
+            return None
+        if base == quote:
+            return Decimal("1")
+        if isinstance(date, datetime):
+            date = date.date()
+        rate = self._direct_or_inverse(base, quote, date, strategy)
+        if rate is not None or self.home in (base, quote, ""):
+            return rate
+        # Cross rate through the home currency, e.g. USD->EUR as USD->CAD * CAD->EUR
+        to_home = self._direct_or_inverse(base, self.home, date, strategy)
+        from_home = self._direct_or_inverse(self.home, quote, date, strategy)
+        if to_home is None or from_home is None:
             return None
-    return None
+        return to_home * from_home
+
+    # ----- vectorized lookups (convert_many) ------------------------------------------
+    def _series_array(self, base: str, quote: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        arrays = self._arrays.get((base, quote))
+        if arrays is None:
+            series = self.pairs.get((base, quote))
+            if series is None:
+                return None
+            arrays = (np.array(series[0], dtype="datetime64[D]"), np.array(series[1], dtype=float))
+            self._arrays[(base, quote)] = arrays
+        return arrays
+
+    def _points(self, base: str, quote: str, dates: np.ndarray, strategy: str) -> np.ndarray:
+        out = np.full(len(dates), np.nan)
+        arrays = self._series_array(base, quote)
+        if arrays is None:
+            return out
+        series_dates, rates = arrays
+        latest = np.isnat(dates) | (strategy == "latest")
+        out[latest] = rates[-1]
+        i = np.searchsorted(series_dates, dates, side="right")
+        found = ~latest & (i > 0)
+        if strategy == "on":
+            found &= series_dates[np.maximum(i - 1, 0)] == dates
+        out[found] = rates[i[found] - 1]
+        return out
+
+    def _direct_or_inverse_many(self, base: str, quote: str, dates: np.ndarray, strategy: str) -> np.ndarray:
+        out = self._points(base, quote, dates, strategy)
+        todo = np.isnan(out)
+        if todo.any():
+            inverse = self._points(quote, base, dates[todo], strategy)
+            with np.errstate(divide="ignore"):
+                out[todo] = np.where(inverse == 0, np.nan, 1.0 / inverse)
+        return out
+
+    def rates(self, base: str, quote: str, dates: np.ndarray, strategy: str = "on_or_before") -> np.ndarray:
+        """Float rates for one pair at each of ``dates`` (``datetime64[D]``, NaT for latest); NaN if none."""
+        base = (base or "").upper()
+        quote = (quote or "").upper()
+        if not base or not quote:
+            return np.full(len(dates), np.nan)
+        if base == quote:
+            return np.ones(len(dates))
+        out = self._direct_or_inverse_many(base, quote, dates, strategy)
+        todo = np.isnan(out)
+        if todo.any() and self.home not in (base, quote, ""):
+            out[todo] = self._direct_or_inverse_many(base, self.home, dates[todo], strategy) * (
+                self._direct_or_inverse_many(self.home, quote, dates[todo], strategy)
+            )
+        return out
+
+
+def get_rate_index() -> FxRateIndex:
+    """Process-wide :class:`FxRateIndex`, rebuilt when exchange rates or currencies change."""
+    global _rate_index
+    versions = get_data_versions([ExchangeRate, Currency, GlobalSettings])
+    cached = _rate_index
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+    with _lock:
+        cached = _rate_index
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+        index = FxRateIndex.from_db()
+        _rate_index = (versions, index)
+        return index
+
+
+def get_rate(base: str, quote: str, date=None, strategy: str = "on_or_before") -> Optional[Decimal]:
+    return get_rate_index().rate(base, quote, date=date, strategy=strategy)
 
 
 def convert(amount, from_code: str, to_code: str, date=None, strategy: str = "on_or_before", places: int = 2) -> Optional[Decimal]:
@@ -77,3 +174,73 @@ def convert(amount, from_code: str, to_code: str, date=None, strategy: str = "on
     if rate is None:
         return None
     return _quantize(amt * rate, places=places)
+
+
+def _as_float(amount) -> float:
+    try:
+        return float(amount) if amount is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _as_dates(dates, n: int) -> np.ndarray:
+    if dates is None or not isinstance(dates, (list, tuple, np.ndarray)):
+        dates = [dates] * n
+    values = [d.date() if isinstance(d, datetime) else d for d in dates]
+    return np.array([np.datetime64(d, "D") if d else np.datetime64("NaT") for d in values], dtype="datetime64[D]")
+
+
+def convert_many(
+    amounts: Sequence[Any],
+    from_codes: Union[str, Sequence[Optional[str]]],
+    dates=None,
+    to_code: Optional[str] = None,
+    strategy: str = "on_or_before",
+    *,
+    exact: bool = False,
+    places: int = 2,
+) -> List[Any]:
+    """Convert many amounts to ``to_code`` (default: home currency) in one pass.
+
+    ``from_codes`` and ``dates`` are per amount or a single value. Inputs are
+    grouped by currency pair and each pair's rates are looked up for all its
+    dates at once. Results are floats rounded with NumPy, or Decimals rounded
+    like :func:`convert` with ``exact=True``; None where an amount or rate is
+    missing.
+    """
+    n = len(amounts)
+    if isinstance(from_codes, str) or from_codes is None:
+        from_codes = [from_codes] * n
+    to_code = (to_code or get_home_currency_code()).upper()
+    day_array = _as_dates(dates, n)
+    index = get_rate_index()
+
+    rates = np.full(n, np.nan)
+    by_code: Dict[str, List[int]] = {}
+    for i, code in enumerate(from_codes):
+        if code:
+            by_code.setdefault(code.upper(), []).append(i)
+    for code, positions in by_code.items():
+        positions_array = np.array(positions)
+        rates[positions_array] = index.rates(code, to_code, day_array[positions_array], strategy)
+
+    if exact:
+        # One Decimal rate per (currency, date) instead of one per row
+        decimal_rates: Dict[Tuple[str, Any], Optional[Decimal]] = {}
+        results: List[Any] = [None] * n
+        for i, amount in enumerate(amounts):
+            if amount is None or np.isnan(rates[i]):
+                continue
+            key = (from_codes[i].upper(), None if np.isnat(day_array[i]) else day_array[i].item())
+            if key not in decimal_rates:
+                decimal_rates[key] = index.rate(key[0], to_code, date=key[1], strategy=strategy)
+            rate = decimal_rates[key]
+            try:
+                results[i] = _quantize(Decimal(str(amount)) * rate, places=places) if rate is not None else None
+            except Exception:
+                results[i] = None
+        return results
+
+    values = np.array([_as_float(a) for a in amounts], dtype=float)
+    converted = np.round(values * rates, places)
+    return [None if np.isnan(v) else float(v) for v in converted]
@@ -0,0 +1,216 @@
+"""Exchange-rate providers and the concurrent fetch/store used by ``update_exchange_rates``.
+
+A provider answers ``history(base, quote, start, end)`` with ``{date: rate}``
+for one pair. :class:`PolygonProvider` calls the Polygon aggregates API over
+one pooled ``requests.Session``; :class:`FileProvider` reads a local CSV and
+stands in for it offline and in tests. :func:`fetch_rates` runs the pairs on a
+bounded thread pool behind a shared :class:`RateLimiter`, and
+:func:`store_rates` upserts one pair's dates in a single transaction.
+"""
+
+from __future__ import annotations
+
+import csv
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import requests
+from django.db import transaction
+from requests.adapters import HTTPAdapter
+
+from apps.common.models import Currency, ExchangeRate
+from apps.django_bi.utils.data_versions import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "FileProvider",
+    "PolygonProvider",
+    "RateLimiter",
+    "RateProvider",
+    "fetch_rates",
+    "store_rates",
+]
+
+Pair = Tuple[str, str]
+Points = Dict[date, Decimal]
+
+
+class RateLimiter:
+    """Space calls at least ``interval`` seconds apart across threads."""
+
+    def __init__(self, interval: float = 0.0):
+        self.interval = max(0.0, float(interval or 0))
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class RateProvider:
+    """Source of daily exchange rates; subclasses implement :meth:`history`."""
+
+    name = ""
+
+    def history(self, base: str, quote: str, start: date, end: date) -> Points:
+        """Rates of 1 ``base`` in ``quote`` for the days in ``[start, end]`` that have one."""
+        raise NotImplementedError
+
+    def latest(self, base: str, quote: str, on: date) -> Optional[Decimal]:
+        """Most recent rate available on ``on`` (by default, the last point of its week)."""
+        points = self.history(base, quote, date.fromordinal(on.toordinal() - 7), on)
+        return points[max(points)] if points else None
+
+    def close(self) -> None:
+        pass
+
+
+class PolygonProvider(RateProvider):
+    """Polygon.io forex aggregates (``C:{base}{quote}``) over one pooled session."""
+
+    name = "polygon"
+    BASE_URL = "https://api.polygon.io/v2/aggs/ticker"
+
+    def __init__(self, api_key: str, *, pool_size: int = 8, timeout: float = 15, session: Optional[requests.Session] = None):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        if session is None:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+            self.session.mount("https://", adapter)
+
+    def _results(self, path: str, ticker: str) -> List[dict]:
+        try:
+            resp = self.session.get(
+                f"{self.BASE_URL}/{ticker}/{path}",
+                params={"adjusted": "true", "sort": "asc", "limit": 50000, "apiKey": self.api_key},
+                timeout=self.timeout,
+            )
+            if resp.status_code != 200:
+                logger.warning("Polygon HTTP %s for %s", resp.status_code, ticker)
+                return []
+            return resp.json().get("results") or []
+        except Exception as e:
+            logger.warning("Polygon fetch failed for %s: %s", ticker, e)
+            return []
+
+    def history(self, base: str, quote: str, start: date, end: date) -> Points:
+        points: Points = {}
+        for row in self._results(f"range/1/day/{start.isoformat()}/{end.isoformat()}", f"C:{base}{quote}"):
+            if row.get("c") is None or row.get("t") is None:
+                continue
+            day = datetime.fromtimestamp(row["t"] / 1000, tz=timezone.utc).date()
+            points[day] = Decimal(str(row["c"]))
+        return points
+
+    def latest(self, base: str, quote: str, on: date) -> Optional[Decimal]:
+        # Previous close, stored against the run date
+        results = self._results("prev", f"C:{base}{quote}")
+        close = results[0].get("c") if results else None
+        return Decimal(str(close)) if close is not None else None
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class FileProvider(RateProvider):
+    """Rates from a CSV file with a ``base,quote,date,rate`` header (dates as ISO)."""
+
+    name = "file"
+
+    def __init__(self, path: str):
+        self.rates: Dict[Pair, Points] = {}
+        with open(path, newline="", encoding="utf-8") as fh:
+            for row in csv.DictReader(fh):
+                try:
+                    pair = (row["base"].strip().upper(), row["quote"].strip().upper())
+                    self.rates.setdefault(pair, {})[date.fromisoformat(row["date"].strip())] = Decimal(row["rate"].strip())
+                except (KeyError, AttributeError, ValueError, InvalidOperation):
+                    logger.warning("Skipping bad FX file row: %s", row)
+
+    def history(self, base: str, quote: str, start: date, end: date) -> Points:
+        points = self.rates.get((base, quote), {})
+        return {d: r for d, r in points.items() if start <= d <= end}
+
+    def latest(self, base: str, quote: str, on: date) -> Optional[Decimal]:
+        points = self.history(base, quote, date.min, on)
+        return points[max(points)] if points else None
+
+
+def _fetch_pair(provider: RateProvider, limiter: RateLimiter, pair: Pair, start: date, end: date, latest: bool) -> Points:
+    """Rates for ``pair``, falling back to the inverted reverse pair."""
+    base, quote = pair
+    for b, q, invert in ((base, quote, False), (quote, base, True)):
+        limiter.wait()
+        if latest:
+            rate = provider.latest(b, q, end)
+            points = {end: rate} if rate is not None else {}
+        else:
+            points = provider.history(b, q, start, end)
+        if invert:
+            points = {d: Decimal(1) / r for d, r in points.items() if r}
+        if points:
+            return points
+    return {}
+
+
+def fetch_rates(
+    provider: RateProvider,
+    pairs: Iterable[Pair],
+    start: date,
+    end: date,
+    *,
+    latest: bool = False,
+    workers: int = 4,
+    interval: float = 0.0,
+) -> Dict[Pair, Points]:
+    """Fetch every pair on up to ``workers`` threads, at most one request per ``interval`` seconds.
+
+    With ``latest`` each pair gets the provider's latest rate, stored against ``end``.
+    """
+    pairs = list(pairs)
+    limiter = RateLimiter(interval)
+    with ThreadPoolExecutor(max_workers=max(1, int(workers or 1))) as pool:
+        futures = {pair: pool.submit(_fetch_pair, provider, limiter, pair, start, end, latest) for pair in pairs}
+    results: Dict[Pair, Points] = {}
+    for pair, future in futures.items():
+        try:
+            results[pair] = future.result()
+        except Exception as e:
+            logger.warning("FX fetch failed for %s/%s: %s", pair[0], pair[1], e)
+            results[pair] = {}
+    return results
+
+
+def store_rates(base: Currency, quote: Currency, points: Mapping[date, Decimal], source: str) -> int:
+    """Upsert ``points`` for one pair in one transaction; return the number of rows written."""
+    objs = [
+        ExchangeRate(base=base, quote=quote, rate_date=d, rate=Decimal(r).quantize(Decimal("1e-8")), source=source)
+        for d, r in sorted(points.items())
+    ]
+    if not objs:
+        return 0
+    with transaction.atomic():
+        ExchangeRate.objects.bulk_create(
+            objs,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["base", "quote", "rate_date"],
+            update_fields=["rate", "source", "updated_at"],
+        )
+    # bulk_create sends no post_save
+    bump_data_version(ExchangeRate)
+    return len(objs)
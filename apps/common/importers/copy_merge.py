@@ -0,0 +1,219 @@
+"""Staging-table load path for the text importer (``method="copy"``).
+
+Parsed rows are streamed into a temporary staging table shaped like the
+target table and merged in a single statement::
+
+    INSERT INTO target (...) SELECT ... FROM staging
+    ON CONFLICT (unique_fields) DO UPDATE SET col = EXCLUDED.col, ...
+
+On PostgreSQL rows reach the staging table through ``COPY ... FROM STDIN``
+(psycopg2 ``copy_expert``, or ``cursor.copy`` with psycopg 3); on SQLite,
+which has no COPY, through ``executemany`` so the path can be exercised
+locally.
+
+Rows carry final column values: foreign keys are already resolved to ids by
+the importer, auto-computed fields are computed by it, and fields the file
+does not provide get their model default (``auto_now``/``auto_now_add``
+fields the current time), evaluated once per loader as no model instances
+are built. Conflict updates also refresh the ``auto_now`` columns.
+"""
+
+from __future__ import annotations
+
+import datetime
+import io
+import json
+import uuid
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from django.db import connections, models, transaction
+from django.db.models.fields import AutoFieldMixin
+from django.utils import timezone
+
+__all__ = ["SUPPORTED_VENDORS", "StagingTableLoader"]
+
+SUPPORTED_VENDORS = ("postgresql", "sqlite")
+
+
+class StagingTableLoader:
+    """Stage rows for ``model`` and merge them on ``unique_fields``.
+
+    ``rows`` passed to :meth:`stage` are mappings of field name to value
+    (foreign keys as ids, under the field name or its attname). Use as a
+    context manager so the staging table is dropped in any case::
+
+        with StagingTableLoader(Model, unique_fields=("code",)) as loader:
+            loader.stage(rows)
+            inserted, updated = loader.merge(update_fields=["description"])
+    """
+
+    def __init__(self, model, *, unique_fields: Sequence[str] = (), using: str = "default"):
+        self.model = model
+        self.connection = connections[using]
+        if self.connection.vendor not in SUPPORTED_VENDORS:
+            raise NotImplementedError(
+                f"method='copy' is not supported on {self.connection.vendor}; use 'bulk_create'."
+            )
+        opts = model._meta
+        self.fields: List[models.Field] = [
+            f for f in opts.concrete_fields if not isinstance(f, AutoFieldMixin)
+        ]
+        self._by_name: Dict[str, models.Field] = {}
+        for f in self.fields:
+            self._by_name[f.name] = f
+            self._by_name[f.attname] = f
+        self.unique_fields = [self._by_name[name] for name in unique_fields]
+        self.table = f"_import_stage_{uuid.uuid4().hex[:12]}"
+        self._defaults = self._build_defaults()
+        self.staged = 0
+        self._created = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ----- values --------------------------------------------------------------
+    def _build_defaults(self) -> Dict[str, Any]:
+        now = timezone.now()
+        defaults: Dict[str, Any] = {}
+        for f in self.fields:
+            if getattr(f, "auto_now", False) or getattr(f, "auto_now_add", False):
+                if isinstance(f, models.DateTimeField):
+                    defaults[f.attname] = now
+                else:
+                    defaults[f.attname] = timezone.localdate(now) if timezone.is_aware(now) else now.date()
+            elif f.has_default():
+                value = f.get_default()
+                defaults[f.attname] = value.pk if isinstance(value, models.Model) else value
+            else:
+                defaults[f.attname] = None
+        return defaults
+
+    def _row_values(self, row: Mapping[str, Any]) -> List[Any]:
+        values = dict(self._defaults)
+        for name, value in row.items():
+            field = self._by_name.get(name)
+            if field is None:
+                raise ValueError(f"Unknown field '{name}' for {self.model.__name__}")
+            if isinstance(value, models.Model):
+                value = value.pk
+            values[field.attname] = value
+        out = []
+        for f in self.fields:
+            value = values[f.attname]
+            if value is not None:
+                target = f.target_field if f.is_relation else f  # type: ignore[attr-defined]
+                value = target.get_db_prep_save(value, self.connection)
+            out.append(value)
+        return out
+
+    @staticmethod
+    def _csv_cell(value: Any) -> str:
+        # FORMAT csv: unquoted empty is NULL, quoted "" is an empty string.
+        if value is None:
+            return ""
+        if hasattr(value, "adapted"):  # psycopg2 Json adapters
+            value = json.dumps(value.adapted)
+        elif isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        elif isinstance(value, (datetime.date, datetime.time)):
+            value = value.isoformat()
+        return '"' + str(value).replace('"', '""') + '"'
+
+    # ----- staging -------------------------------------------------------------
+    def _columns_sql(self, prefix: str = "") -> str:
+        qn = self.connection.ops.quote_name
+        return ", ".join(prefix + qn(f.column) for f in self.fields)
+
+    def _ensure_table(self, cursor) -> None:
+        if self._created:
+            return
+        qn = self.connection.ops.quote_name
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {qn(self.table)} AS "
+            f"SELECT {self._columns_sql()} FROM {qn(self.model._meta.db_table)} WHERE 1 = 0"
+        )
+        self._created = True
+
+    def stage(self, rows: Iterable[Mapping[str, Any]]) -> int:
+        """Append ``rows`` to the staging table; return how many were staged."""
+        values = [self._row_values(row) for row in rows]
+        if not values:
+            return 0
+        qn = self.connection.ops.quote_name
+        with self.connection.cursor() as cursor:
+            self._ensure_table(cursor)
+            if self.connection.vendor == "postgresql":
+                buf = io.StringIO()
+                for row in values:
+                    buf.write(",".join(self._csv_cell(v) for v in row))
+                    buf.write("\n")
+                buf.seek(0)
+                copy_sql = f"COPY {qn(self.table)} ({self._columns_sql()}) FROM STDIN WITH (FORMAT csv)"
+                raw = cursor.cursor
+                if hasattr(raw, "copy_expert"):
+                    raw.copy_expert(copy_sql, buf)
+                else:  # psycopg 3
+                    with raw.copy(copy_sql) as copy:
+                        copy.write(buf.getvalue())
+            else:
+                placeholders = ", ".join(["%s"] * len(self.fields))
+                cursor.executemany(
+                    f"INSERT INTO {qn(self.table)} ({self._columns_sql()}) VALUES ({placeholders})",
+                    values,
+                )
+        self.staged += len(values)
+        return len(values)
+
+    # ----- merge ---------------------------------------------------------------
+    def merge(self, update_fields: Optional[Iterable[str]] = None) -> Tuple[int, int]:
+        """Merge the staged rows into the target table in one statement.
+
+        Conflicts on ``unique_fields`` update ``update_fields`` and the
+        ``auto_now`` columns (nothing is updated when ``update_fields`` is
+        empty). Returns ``(inserted, updated)``.
+        """
+        if not self.staged:
+            return 0, 0
+        qn = self.connection.ops.quote_name
+        target = qn(self.model._meta.db_table)
+        sql = (
+            f"INSERT INTO {target} ({self._columns_sql()}) "
+            # WHERE keeps SQLite from reading ON CONFLICT as a join constraint.
+            f"SELECT {self._columns_sql('s.')} FROM {qn(self.table)} s WHERE 1 = 1"
+        )
+        updates = []
+        if self.unique_fields:
+            conflict = ", ".join(qn(f.column) for f in self.unique_fields)
+            unique_columns = {f.column for f in self.unique_fields}
+            for name in update_fields or ():
+                field = self._by_name[name]
+                if field.column not in unique_columns and field.column not in updates:
+                    updates.append(field.column)
+            if updates:
+                updates += [
+                    f.column for f in self.fields if getattr(f, "auto_now", False) and f.column not in updates
+                ]
+                assignments = ", ".join(f"{qn(col)} = EXCLUDED.{qn(col)}" for col in updates)
+                sql += f" ON CONFLICT ({conflict}) DO UPDATE SET {assignments}"
+            else:
+                sql += f" ON CONFLICT ({conflict}) DO NOTHING"
+        with transaction.atomic(using=self.connection.alias), self.connection.cursor() as cursor:
+            matched = 0
+            if updates:
+                # The row count covers inserts and updates alike; count the updates first.
+                join = " AND ".join(f"t.{qn(f.column)} = s.{qn(f.column)}" for f in self.unique_fields)
+                cursor.execute(f"SELECT COUNT(*) FROM {qn(self.table)} s INNER JOIN {target} t ON {join}")
+                matched = cursor.fetchone()[0]
+            cursor.execute(sql)
+            written = max(cursor.rowcount, 0)
+        return written - matched, matched
+
+    def close(self) -> None:
+        if not self._created:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.connection.ops.quote_name(self.table)}")
+        self._created = False
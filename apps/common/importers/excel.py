@@ -0,0 +1,128 @@
+"""Streaming Excel importer built on :func:`~apps.common.importers.text.import_rows`.
+
+Worksheets are read row by row with openpyxl in ``read_only`` mode, so
+memory stays bounded by ``chunk_size`` rather than the workbook size, and the
+rows go through the same batched relation resolution and bulk upsert paths
+as the text importer.
+"""
+
+from __future__ import annotations
+
+import datetime
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+from openpyxl import load_workbook
+
+from apps.common.importers.text import ImportResult, RowValues, _is_null, import_rows
+
+__all__ = ["import_rows_from_excel", "iter_excel_batches"]
+
+
+def _cell_text(value: Any) -> Any:
+    """Excel cell value as the importer expects it (text, dates kept as-is)."""
+    if value is None or isinstance(value, (datetime.date, datetime.time)):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _map_value(col_map: Optional[Mapping[Any, Any]], value: Any) -> Any:
+    if not isinstance(col_map, Mapping):
+        return value
+    # Exact match first, then case-insensitive for text
+    if value in col_map:
+        return col_map[value]
+    if isinstance(value, str):
+        low = value.strip().lower()
+        for k, v in col_map.items():
+            if isinstance(k, str) and k.strip().lower() == low:
+                return v
+    return value
+
+
+def iter_excel_batches(
+    path: str,
+    *,
+    mapping: Mapping[str, str],
+    sheet: Optional[Union[str, int]] = None,
+    value_map: Optional[Mapping[str, Mapping[Any, Any]]] = None,
+    chunk_size: int = 1000,
+    missing_columns: Optional[List[str]] = None,
+) -> Iterator[List[Tuple[str, RowValues]]]:
+    """Yield ``(raw, values)`` batches from the header-row sheet at ``path``.
+
+    ``mapping`` keys are header names. Mapped headers absent from the sheet
+    are appended to ``missing_columns`` when a list is given.
+    """
+    value_map = value_map or {}
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        if sheet is None or sheet == "":
+            ws = wb.worksheets[0]
+        elif isinstance(sheet, int) or str(sheet).isdigit():
+            ws = wb.worksheets[int(sheet)]
+        else:
+            ws = wb[str(sheet)]
+
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        headers = [str(h) if h is not None else "" for h in header]
+        columns: Dict[str, int] = {}
+        for col in mapping:
+            if col in headers:
+                columns[col] = headers.index(col)
+            elif missing_columns is not None:
+                missing_columns.append(col)
+
+        batch: List[Tuple[str, RowValues]] = []
+        size = max(1, int(chunk_size or 1000))
+        for row_no, row in enumerate(rows, start=2):
+            if not row or all(v is None or (isinstance(v, str) and not v.strip()) for v in row):
+                continue
+            raw = f"row {row_no}: " + "|".join("" if v is None else str(v) for v in row)
+            try:
+                values: Dict[str, Any] = {}
+                for col, idx in columns.items():
+                    cell = _cell_text(row[idx]) if idx < len(row) else None
+                    cell = _map_value(value_map.get(col), cell)
+                    if isinstance(cell, str):
+                        cell = cell.strip()
+                    values[col] = None if _is_null(cell) else cell
+                batch.append((raw, values))
+            except Exception as exc:
+                batch.append((raw, exc))
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        wb.close()
+
+
+def import_rows_from_excel(
+    *,
+    model,
+    file_path: str,
+    mapping: Mapping[str, str],
+    sheet: Optional[Union[str, int]] = None,
+    value_map: Optional[Mapping[str, Mapping[Any, Any]]] = None,
+    missing_columns: Optional[List[str]] = None,
+    **options: Any,
+) -> ImportResult:
+    """Import an Excel sheet; see :func:`import_rows` for ``options``.
+
+    Empty cells leave fields untouched (``assign_nulls=False``) unless the
+    caller says otherwise.
+    """
+    options.setdefault("assign_nulls", False)
+    batches = iter_excel_batches(
+        file_path,
+        mapping=mapping,
+        sheet=sheet,
+        value_map=value_map,
+        chunk_size=options.get("chunk_size", 1000),
+        missing_columns=missing_columns,
+    )
+    return import_rows(model=model, rows=batches, mapping=mapping, **options)
@@ -0,0 +1,145 @@
+"""Row-hash change detection for repeated imports of the same export.
+
+:class:`FingerprintStore` keeps one :class:`~apps.common.models.ImportFingerprint`
+per natural key of a model: a hash of the normalized source values last
+imported for that key. :func:`~apps.common.importers.text.import_rows` uses it
+(``fingerprints=True``) to drop unchanged rows before any relation lookup or
+save, records the hashes of the rows it wrote, and with ``on_missing`` deletes
+or flags the keys that no longer appear in the file.
+
+Fingerprints only see what went through the importer: rows changed or
+deleted by other means are not re-imported until their source line changes.
+``FingerprintStore(model).reset()`` forces a full re-import.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from django.db import models
+from django.db.models import Q
+
+from apps.django_bi.utils.data_versions import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["FingerprintStore", "ON_MISSING_CHOICES"]
+
+ON_MISSING_CHOICES = ("delete", "flag")
+IN_CHUNK_SIZE = 500
+DELETE_CHUNK_SIZE = 100
+
+
+def _digest(payload: Any, size: int) -> str:
+    data = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=size).hexdigest()
+
+
+class FingerprintStore:
+    """Stored row hashes for ``model``, keyed by natural key.
+
+    ``salt`` is folded into every row hash, so changing it (e.g. the import
+    mapping) makes every row look changed once.
+    """
+
+    def __init__(self, model, *, salt: Any = None):
+        from apps.common.models import ImportFingerprint
+
+        self.model = model
+        self.label = model._meta.label_lower
+        self.salt = salt
+        self.seen: Set[str] = set()
+        self._fingerprints = ImportFingerprint.objects
+
+    @staticmethod
+    def key_for(key_values: Sequence[Any]) -> str:
+        return _digest(list(key_values), 20)
+
+    def hash_for(self, values: Mapping[Any, Any]) -> str:
+        return _digest([self.salt, sorted([str(k), v] for k, v in values.items())], 16)
+
+    def unchanged(self, hashes: Mapping[str, str]) -> Set[str]:
+        """Mark the keys of ``hashes`` (``{key: row_hash}``) seen; return those whose hash is stored."""
+        self.seen.update(hashes)
+        keys = list(hashes)
+        same: Set[str] = set()
+        for i in range(0, len(keys), IN_CHUNK_SIZE):
+            stored = self._fingerprints.filter(model_label=self.label, key__in=keys[i : i + IN_CHUNK_SIZE])
+            for key, row_hash in stored.values_list("key", "row_hash"):
+                if hashes[key] == row_hash:
+                    same.add(key)
+        return same
+
+    def record(self, entries: Iterable[Tuple[str, str, Mapping[str, Any]]]) -> None:
+        """Store ``(key, row_hash, lookup)`` for rows written by the import."""
+        from apps.common.models import ImportFingerprint
+
+        objs = [
+            ImportFingerprint(model_label=self.label, key=key, row_hash=row_hash, lookup=dict(lookup))
+            for key, row_hash, lookup in entries
+        ]
+        if not objs:
+            return
+        self._fingerprints.bulk_create(
+            objs,
+            batch_size=IN_CHUNK_SIZE,
+            update_conflicts=True,
+            unique_fields=["model_label", "key"],
+            update_fields=["row_hash", "lookup", "missing", "updated_at"],
+        )
+
+    @staticmethod
+    def lookup_for(model, unique_fields: Sequence[str], assignments: Mapping[str, Any]) -> Dict[str, Any]:
+        """Natural key of a resolved row as ``{attname: value}`` (related objects by pk)."""
+        lookup: Dict[str, Any] = {}
+        for name in unique_fields:
+            field = model._meta.get_field(name)
+            value = assignments.get(name)
+            if isinstance(value, models.Model):
+                value = value.pk
+            lookup[field.attname] = value
+        return lookup
+
+    def finish(self, on_missing: Optional[str] = None) -> int:
+        """Handle stored keys not seen in this import; return how many there were.
+
+        ``"delete"`` removes their rows (and fingerprints), ``"flag"`` sets
+        ``ImportFingerprint.missing``; keys seen again are unflagged.
+        """
+        stale: List[Tuple[int, Dict[str, Any]]] = []
+        returning: List[int] = []
+        for pk, key, lookup, missing in self._fingerprints.filter(model_label=self.label).values_list(
+            "pk", "key", "lookup", "missing"
+        ):
+            if key not in self.seen:
+                stale.append((pk, lookup))
+            elif missing:
+                returning.append(pk)
+        for i in range(0, len(returning), IN_CHUNK_SIZE):
+            self._fingerprints.filter(pk__in=returning[i : i + IN_CHUNK_SIZE]).update(missing=False)
+
+        if on_missing == "flag":
+            pks = [pk for pk, _lookup in stale]
+            for i in range(0, len(pks), IN_CHUNK_SIZE):
+                self._fingerprints.filter(pk__in=pks[i : i + IN_CHUNK_SIZE]).update(missing=True)
+        elif on_missing == "delete":
+            for i in range(0, len(stale), DELETE_CHUNK_SIZE):
+                chunk = stale[i : i + DELETE_CHUNK_SIZE]
+                cond = Q()
+                for _pk, lookup in chunk:
+                    cond |= Q(**lookup)
+                if cond:
+                    self.model.objects.filter(cond).delete()
+                self._fingerprints.filter(pk__in=[pk for pk, _lookup in chunk]).delete()
+            if stale:
+                bump_data_version(self.model)
+        elif on_missing is not None:
+            raise ValueError(f"on_missing must be one of {', '.join(ON_MISSING_CHOICES)}")
+        return len(stale)
+
+    def reset(self) -> None:
+        """Forget every fingerprint of the model (next import writes all rows)."""
+        self._fingerprints.filter(model_label=self.label).delete()
@@ -0,0 +1,138 @@
+"""Vectorized pandas parsing stage for delimited text imports.
+
+:func:`read_frames` reads a delimited export in ``chunksize`` blocks with
+``pandas.read_csv`` and does the per-cell work of the line parser column by
+column: whitespace trimming, ``##`` row rejection, null normalization,
+``value_map`` substitution and date parsing. Each chunk comes back as
+``(raw_line, values)`` pairs where ``values`` maps mapping keys to cell
+values (None for rejected rows), ready for the importer's upsert paths.
+
+Lines are read whole (NUL as separator) and split with ``Series.str.split``:
+ERP exports have ragged rows, which ``read_csv(sep="|")`` refuses once a row
+is wider than the first one.
+"""
+
+from __future__ import annotations
+
+import csv
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+__all__ = ["read_frames"]
+
+NULL_TOKENS = ["nan", "none", "null"]
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%d-%m-%Y", "%Y/%m/%d")
+DATETIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%m/%d/%Y %H:%M:%S", "%m/%d/%Y")
+
+Key = Union[str, int]
+
+
+def _normalize(col: pd.Series) -> pd.Series:
+    """Trim cells; blanks and null tokens become None."""
+    col = col.str.strip()
+    is_null = col.isna() | col.eq("") | col.str.lower().isin(NULL_TOKENS)
+    return col.astype(object).where(~is_null, None)
+
+
+def _parse_dates(col: pd.Series, kind: str) -> pd.Series:
+    """Parse like ``_coerce_value_for_field``; unparsable cells keep their text."""
+    present = col.notna()
+    if not present.any():
+        return col
+    text = col.where(present, "")
+    if kind == "date":
+        # Dates ignore any time part ("2024-01-31 00:00:00", "2024-01-31T08:00").
+        text = text.str.split(" ", n=1, regex=False).str[0].str.split("T", n=1, regex=False).str[0]
+        formats: Sequence[Optional[str]] = DATE_FORMATS
+    else:
+        formats = ("ISO8601",) + DATETIME_FORMATS
+    parsed = pd.Series(pd.NaT, index=col.index, dtype="datetime64[ns]")
+    for fmt in formats:
+        todo = present & parsed.isna()
+        if not todo.any():
+            break
+        try:
+            attempt = pd.to_datetime(text[todo], format=fmt, errors="coerce")
+        except (ValueError, TypeError):
+            continue
+        if getattr(attempt.dt, "tz", None) is not None:
+            continue  # mixed/aware offsets: leave these cells to the text fallback
+        parsed = parsed.where(~todo, attempt)
+    ok = parsed.notna()
+    if kind == "date":
+        values = parsed.dt.date
+    else:
+        values = pd.Series(parsed.dt.to_pydatetime(), index=col.index, dtype=object)
+    # Unparsed cells keep the (trimmed) text, as the line parser does.
+    return values.astype(object).where(ok, text.where(present, None).astype(object))
+
+
+def read_frames(
+    fh,
+    *,
+    delimiter: str,
+    columns: Mapping[Key, Optional[int]],
+    ignore_prefixes: Sequence[str] = (),
+    value_map: Optional[Mapping[Key, Mapping[Any, Any]]] = None,
+    date_columns: Optional[Mapping[Key, str]] = None,
+    chunk_size: int = 1000,
+) -> Iterator[List[Tuple[str, Optional[Dict[Key, Any]]]]]:
+    """Yield chunks of ``(raw_line, values)`` read from the open text ``fh``.
+
+    ``columns`` maps each mapping key to its column index (None when the
+    file has no such column); ``date_columns`` maps keys to ``"date"`` or
+    ``"datetime"``. Blank lines and lines starting with ``ignore_prefixes``
+    are dropped; rows with a cell starting with ``##`` get ``values=None``.
+    """
+    value_map = value_map or {}
+    date_columns = date_columns or {}
+    prefixes = tuple(ignore_prefixes or ())
+    reader = pd.read_csv(
+        fh,
+        sep="\x00",
+        header=None,
+        names=["raw"],
+        dtype=str,
+        keep_default_na=False,
+        na_filter=False,
+        quoting=csv.QUOTE_NONE,
+        skip_blank_lines=True,
+        chunksize=max(1, int(chunk_size or 1000)),
+        engine="c",
+    )
+    for frame in reader:
+        raw = frame["raw"]
+        if prefixes:
+            raw = raw[~raw.str.startswith(prefixes)]
+        if raw.empty:
+            continue
+        parts = raw.str.split(delimiter, expand=True, regex=False)
+        rejected = pd.Series(False, index=raw.index)
+        for idx in parts.columns:
+            parts[idx] = parts[idx].str.strip()
+            rejected |= parts[idx].str.startswith("##").fillna(False).astype(bool)
+
+        cols: Dict[Key, List[Any]] = {}
+        for key, idx in columns.items():
+            if idx is None or idx not in parts.columns:
+                col = pd.Series(None, index=raw.index, dtype=object)
+            else:
+                col = _normalize(parts[idx])
+            mapped = value_map.get(key)
+            if mapped:
+                hit = col.isin(list(mapped))
+                if hit.any():
+                    col = col.where(~hit, col[hit].map(lambda v: mapped.get(v, v)))
+            if key in date_columns:
+                try:
+                    col = _parse_dates(col, date_columns[key])
+                except (AttributeError, TypeError, ValueError):
+                    pass  # left to the importer's per-value coercion
+            cols[key] = col.tolist()
+
+        keys = list(cols)
+        rows: List[Tuple[str, Optional[Dict[Key, Any]]]] = []
+        for i, (line, bad) in enumerate(zip(raw.tolist(), rejected.tolist())):
+            rows.append((line, None if bad else {key: cols[key][i] for key in keys}))
+        yield rows
@@ -0,0 +1,273 @@
+"""Dependency-aware runner for multi-step import jobs (e.g. ``webapp``).
+
+Each :class:`PipelineStep` names a management command and the steps it
+depends on. :class:`ImportPipeline` runs every step whose dependencies have
+succeeded, independent steps in parallel worker processes, and reports per
+step wall time and the row counts of the imports it ran (collected from the
+:data:`~apps.common.importers.text.import_completed` signal).
+
+A step fails when its command raises or logs an error to ``app_errors`` (the
+import commands catch their own exceptions and log them there). Progress is
+written to a JSON state file after every step; ``run(resume=True)`` skips the
+steps that succeeded in the previous run, so a failed nightly load can be
+picked up from the failing step.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ImportPipeline", "PipelineStep", "StepReport"]
+
+ERROR_LOGGER = "app_errors"
+ROW_COUNTS = ("total", "created", "updated", "skipped", "errors", "deleted")
+
+
+@dataclass(frozen=True)
+class PipelineStep:
+    name: str
+    command: str
+    depends: Tuple[str, ...] = ()
+    # Module-level callable run in the worker right before the command.
+    prepare: Optional[Callable[[], Any]] = None
+    options: Mapping[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class StepReport:
+    name: str
+    status: str  # "ok", "failed", "blocked" or "resumed"
+    seconds: float = 0.0
+    rows: Dict[str, int] = field(default_factory=dict)
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("ok", "resumed")
+
+
+class _ErrorCounter(logging.Handler):
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.records: List[str] = []
+
+    def emit(self, record):
+        try:
+            self.records.append(record.getMessage())
+        except Exception:
+            self.records.append(str(record.msg))
+
+
+def _execute_step(step: PipelineStep, isolated: bool = True) -> StepReport:
+    """Run one step; in a worker process when ``isolated``."""
+    import django
+    from django.apps import apps as django_apps
+
+    if not django_apps.ready:
+        django.setup()
+
+    from django.core.management import call_command
+    from django.db import connections
+
+    from apps.common.importers.text import import_completed
+    from apps.django_bi.utils.data_versions import data_version_snapshot
+
+    rows = dict.fromkeys(ROW_COUNTS, 0)
+
+    def _collect(sender, result, **kwargs):
+        for name in ROW_COUNTS:
+            rows[name] += getattr(result, name, 0) or 0
+
+    errors = _ErrorCounter()
+    error_log = logging.getLogger(ERROR_LOGGER)
+    error_log.addHandler(errors)
+    import_completed.connect(_collect, weak=False)
+    error = ""
+    start = time.perf_counter()
+    try:
+        if step.prepare is not None:
+            step.prepare()
+        with data_version_snapshot():
+            call_command(step.command, **dict(step.options))
+    except BaseException as exc:  # SystemExit from commands counts as a failure too
+        error = f"{type(exc).__name__}: {exc}"
+    finally:
+        seconds = time.perf_counter() - start
+        import_completed.disconnect(_collect)
+        error_log.removeHandler(errors)
+        if isolated:
+            connections.close_all()
+    if not error and errors.records:
+        error = errors.records[0]
+    return StepReport(
+        name=step.name,
+        status="failed" if error else "ok",
+        seconds=round(seconds, 3),
+        rows=rows,
+        error=error[:500],
+    )
+
+
+class ImportPipeline:
+    """Run ``steps`` in dependency order with up to ``workers`` processes.
+
+    With ``workers=1`` steps run one after another in the current process.
+    """
+
+    def __init__(
+        self,
+        steps: Sequence[PipelineStep],
+        *,
+        workers: int = 1,
+        state_path: Optional[str] = None,
+        on_report: Optional[Callable[[StepReport], None]] = None,
+    ):
+        self.steps: Dict[str, PipelineStep] = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"Duplicate pipeline step '{step.name}'")
+            self.steps[step.name] = step
+        self.workers = max(1, int(workers or 1))
+        self.state_path = state_path
+        self.on_report = on_report
+        self._validate()
+
+    def _validate(self) -> None:
+        for step in self.steps.values():
+            for dep in step.depends:
+                if dep not in self.steps:
+                    raise ValueError(f"Step '{step.name}' depends on unknown step '{dep}'")
+        # Kahn's algorithm: anything left over sits on a cycle.
+        remaining = {name: set(step.depends) for name, step in self.steps.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Pipeline has a dependency cycle among: {', '.join(sorted(remaining))}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    # ----- state -----------------------------------------------------------------
+    def _load_state(self) -> Dict[str, Any]:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable pipeline state file %s", self.state_path)
+            return {}
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        if not self.state_path:
+            return
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(state, fh, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    # ----- run -------------------------------------------------------------------
+    def run(self, *, resume: bool = False) -> List[StepReport]:
+        """Run the pipeline and return one report per step (completion order)."""
+        previous = self._load_state() if resume else {}
+        done_before = {
+            name for name, info in (previous.get("steps") or {}).items()
+            if info.get("status") in ("ok", "resumed") and name in self.steps
+        }
+        state: Dict[str, Any] = {"started_at": datetime.now().isoformat(timespec="seconds"), "steps": {}}
+        reports: List[StepReport] = []
+
+        def _record(report: StepReport) -> None:
+            reports.append(report)
+            state["steps"][report.name] = asdict(report)
+            self._save_state(state)
+            if self.on_report is not None:
+                self.on_report(report)
+
+        for name in self.steps:
+            if name in done_before:
+                _record(StepReport(name=name, status="resumed"))
+
+        finished = {r.name: r for r in reports}
+        pending = [name for name in self.steps if name not in finished]
+
+        def _ready() -> List[str]:
+            out = []
+            for name in pending:
+                deps = self.steps[name].depends
+                if all(dep in finished for dep in deps):
+                    out.append(name)
+            return out
+
+        def _block_dependents() -> None:
+            changed = True
+            while changed:
+                changed = False
+                for name in list(pending):
+                    failed = [d for d in self.steps[name].depends if d in finished and not finished[d].ok]
+                    if failed:
+                        pending.remove(name)
+                        report = StepReport(name=name, status="blocked", error=f"dependency failed: {', '.join(failed)}")
+                        finished[name] = report
+                        _record(report)
+                        changed = True
+
+        if self.workers == 1:
+            while pending:
+                _block_dependents()
+                ready = _ready()
+                if not ready:
+                    break
+                name = ready[0]
+                pending.remove(name)
+                finished[name] = report = _execute_step(self.steps[name], isolated=False)
+                _record(report)
+            return reports
+
+        from django.db import connections
+
+        # Workers must open their own connections rather than share forked sockets.
+        connections.close_all()
+        method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        context = multiprocessing.get_context(method)
+        running: Dict[Any, str] = {}
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+            while pending or running:
+                _block_dependents()
+                for name in _ready():
+                    pending.remove(name)
+                    running[pool.submit(_execute_step, self.steps[name])] = name
+                if not running:
+                    break
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        report = future.result()
+                    except BaseException as exc:  # worker crashed
+                        report = StepReport(name=name, status="failed", error=f"{type(exc).__name__}: {exc}")
+                    finished[name] = report
+                    _record(report)
+        return reports
+
+    @staticmethod
+    def summarize(reports: Iterable[StepReport]) -> str:
+        lines = []
+        for r in reports:
+            counts = " ".join(f"{k}={r.rows[k]}" for k in ROW_COUNTS if k in r.rows)
+            line = f"{r.name:<32} {r.status:<8} {r.seconds:>9.2f}s {counts}".rstrip()
+            if r.error:
+                line += f" | {r.error}"
+            lines.append(line)
+        return "\n".join(lines)
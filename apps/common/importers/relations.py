@@ -0,0 +1,246 @@
+"""Batched foreign-key resolution for the text importers.
+
+Rows in an import reference related objects by natural keys, e.g.
+``{"order__order": "PO1", "line": "10"}`` for a purchase order line.
+:class:`RelationResolver` resolves all distinct constraint tuples of a batch
+with one query per relation (``IN`` for single-key lookups, OR-composed
+conditions for composite ones), creates the missing objects with a single
+``bulk_create`` and keeps the results in a bounded LRU so later batches
+referencing the same objects hit no database at all.
+
+Anything the batched path cannot handle (unknown lookup paths, values the
+field cannot coerce, failed bulk inserts) is left to :meth:`resolve`, which
+falls back to the original per-row ``filter().first()`` / ``create()``.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models, transaction
+from django.db.models import F, Q
+
+from apps.django_bi.utils.data_versions import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["RelationResolver"]
+
+_MISSING = object()
+
+
+class RelationResolver:
+    """Resolve ``{lookup: value}`` constraints to related model instances."""
+
+    CACHE_SIZE = 10000
+    IN_CHUNK_SIZE = 500
+    COMPOSITE_CHUNK_SIZE = 100
+
+    def __init__(self, cache_size: Optional[int] = None):
+        self.cache_size = cache_size or self.CACHE_SIZE
+        self._cache: "OrderedDict[Tuple, models.Model]" = OrderedDict()
+        self._fields: Dict[Tuple[type, str], Optional[models.Field]] = {}
+
+    # ----- keys ----------------------------------------------------------------
+    def _lookup_field(self, rel_model, lookup: str) -> Optional[models.Field]:
+        """Return the concrete field a lookup path ends on, or None."""
+        cache_key = (rel_model, lookup)
+        if cache_key in self._fields:
+            return self._fields[cache_key]
+        field = None
+        try:
+            model = rel_model
+            parts = lookup.split("__")
+            for i, part in enumerate(parts):
+                field = model._meta.pk if part == "pk" else model._meta.get_field(part)
+                if i < len(parts) - 1:
+                    model = field.remote_field.model  # type: ignore[union-attr]
+            if field is not None and not getattr(field, "concrete", False):
+                field = None
+            while field is not None and field.is_relation:
+                field = field.target_field  # type: ignore[attr-defined]
+        except (FieldDoesNotExist, AttributeError):
+            field = None
+        self._fields[cache_key] = field
+        return field
+
+    def _key(self, rel_model, constraints: Mapping[str, Any]):
+        """Normalized cache key for ``constraints``, or None if not batchable."""
+        lookups = tuple(sorted(constraints))
+        values = []
+        for lookup in lookups:
+            field = self._lookup_field(rel_model, lookup)
+            if field is None:
+                return None
+            val = constraints[lookup]
+            if val is not None:
+                try:
+                    val = field.to_python(val)
+                except Exception:
+                    return None
+            values.append(val)
+        return (rel_model._meta.label_lower, lookups, tuple(values))
+
+    # ----- cache ---------------------------------------------------------------
+    def _get(self, key):
+        obj = self._cache.get(key, _MISSING)
+        if obj is not _MISSING:
+            self._cache.move_to_end(key)
+        return obj
+
+    def _put(self, key, obj) -> None:
+        self._cache[key] = obj
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    # ----- batched path ----------------------------------------------------------
+    def prefetch(
+        self,
+        rel_model,
+        constraints_list: Iterable[Mapping[str, Any]],
+        overrides: Optional[Mapping[str, Any]] = None,
+        create_missing: bool = True,
+    ) -> None:
+        """Resolve every constraint dict of a batch into the cache.
+
+        Existing objects are fetched with one query per lookup shape; missing
+        ones are created with ``bulk_create`` (``overrides`` applied) when
+        ``create_missing`` is set.
+        """
+        pending: Dict[Tuple, Dict[str, Any]] = {}
+        for constraints in constraints_list:
+            if not any(val is not None for val in constraints.values()):
+                continue
+            key = self._key(rel_model, constraints)
+            if key is None or key in pending or self._get(key) is not _MISSING:
+                continue
+            pending[key] = dict(constraints)
+        if not pending:
+            return
+
+        for lookups, keys in self._group_by_shape(pending).items():
+            self._fetch(rel_model, lookups, keys)
+
+        if not create_missing:
+            return
+        missing = [key for key in pending if self._get(key) is _MISSING]
+        if missing:
+            try:
+                self._create_missing(rel_model, [pending[key] for key in missing], overrides)
+            except Exception:
+                # Leave these to the per-row fallback, which reports the error per line.
+                logger.debug("Bulk creation of %s failed", rel_model.__name__, exc_info=True)
+                return
+            for lookups, keys in self._group_by_shape(missing).items():
+                self._fetch(rel_model, lookups, keys)
+
+    @staticmethod
+    def _group_by_shape(keys) -> Dict[Tuple[str, ...], List[Tuple]]:
+        grouped: Dict[Tuple[str, ...], List[Tuple]] = {}
+        for key in keys:
+            grouped.setdefault(key[1], []).append(key)
+        return grouped
+
+    def _fetch(self, rel_model, lookups: Tuple[str, ...], keys: List[Tuple]) -> None:
+        label = rel_model._meta.label_lower
+        aliases = [f"_rel_key_{i}" for i in range(len(lookups))]
+        annotations = {alias: F(lookup) for alias, lookup in zip(aliases, lookups)}
+        if len(lookups) == 1:
+            chunk_size = self.IN_CHUNK_SIZE
+        else:
+            chunk_size = self.COMPOSITE_CHUNK_SIZE
+        wanted = set(keys)
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            cond = Q()
+            if len(lookups) == 1:
+                values = [key[2][0] for key in chunk]
+                non_null = [v for v in values if v is not None]
+                if non_null:
+                    cond |= Q(**{f"{lookups[0]}__in": non_null})
+                if len(non_null) != len(values):
+                    cond |= Q(**{lookups[0]: None})
+            else:
+                for key in chunk:
+                    cond |= Q(**dict(zip(lookups, key[2])))
+            # Newest first so the lowest pk wins on duplicates, like filter().first().
+            for obj in rel_model.objects.filter(cond).annotate(**annotations).order_by("-pk"):
+                key = (label, lookups, tuple(getattr(obj, alias) for alias in aliases))
+                if key in wanted:
+                    self._put(key, obj)
+
+    def _create_missing(self, rel_model, constraints_list, overrides) -> None:
+        # Resolve nested natural keys (e.g. "order__order") for the new rows first.
+        nested: Dict[str, Tuple[Any, str, List[Dict[str, Any]]]] = {}
+        for constraints in constraints_list:
+            for lookup, val in constraints.items():
+                if "__" not in lookup or lookup == "pk":
+                    continue
+                base_field_name, nested_lookup = lookup.split("__", 1)
+                nested_model = rel_model._meta.get_field(base_field_name).remote_field.model
+                entry = nested.setdefault(base_field_name, (nested_model, nested_lookup, []))
+                entry[2].append({nested_lookup: val})
+        for nested_model, _lookup, nested_constraints in nested.values():
+            self.prefetch(nested_model, nested_constraints)
+
+        instances = []
+        for constraints in constraints_list:
+            create_kwargs = self._create_kwargs(rel_model, constraints)
+            if overrides:
+                create_kwargs.update(overrides)
+            obj = rel_model(**create_kwargs)
+            auto_compute = getattr(obj, "AUTO_COMPUTE", None)
+            if auto_compute:
+                # bulk_create skips save(); compute what save() would have.
+                obj._compute_fields(set(auto_compute))
+            instances.append(obj)
+        with transaction.atomic():
+            rel_model.objects.bulk_create(instances)
+        bump_data_version(rel_model)
+
+    def _create_kwargs(self, rel_model, constraints: Mapping[str, Any]) -> Dict[str, Any]:
+        create_kwargs: Dict[str, Any] = {}
+        for key, val in constraints.items():
+            if "__" not in key or key == "pk":
+                field_name = key if key != "pk" else rel_model._meta.pk.name
+                create_kwargs[field_name] = val
+                continue
+            base_field_name, nested_lookup = key.split("__", 1)
+            nested_model = rel_model._meta.get_field(base_field_name).remote_field.model  # type: ignore[union-attr]
+            create_kwargs[base_field_name] = self.resolve(nested_model, {nested_lookup: val})
+        return create_kwargs
+
+    # ----- per-row path --------------------------------------------------------
+    def resolve(
+        self,
+        rel_model,
+        constraints: Mapping[str, Any],
+        overrides: Optional[Mapping[str, Any]] = None,
+    ) -> Optional[models.Model]:
+        """Return the object matching ``constraints``, creating it if missing.
+
+        Returns None when every constraint value is None.
+        """
+        if not any(val is not None for val in constraints.values()):
+            return None
+        key = self._key(rel_model, constraints)
+        if key is not None:
+            obj = self._get(key)
+            if obj is not _MISSING:
+                return obj
+        obj = rel_model.objects.filter(**constraints).first()
+        if obj is None:
+            create_kwargs = self._create_kwargs(rel_model, constraints)
+            if overrides:
+                create_kwargs.update(overrides)
+            obj = rel_model.objects.create(**create_kwargs)
+        if key is not None:
+            self._put(key, obj)
+        return obj
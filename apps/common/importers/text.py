@@ -1,13 +1,28 @@
 from __future__ import annotations
 
+import io
 import json
+from contextlib import nullcontext
 from dataclasses import dataclass
 import logging
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
 from django.apps import apps as django_apps
 from django.core.exceptions import ImproperlyConfigured
 from django.db import models, transaction
+from django.db.models import Q
+from django.dispatch import Signal
+
+from apps.common.importers.copy_merge import StagingTableLoader
+from apps.common.importers.fingerprints import ON_MISSING_CHOICES, FingerprintStore
+from apps.common.importers.relations import RelationResolver
+from apps.common.importers.sync import normalize_row, row_key, sync_table
+from apps.django_bi.utils.data_versions import bump_data_version, data_version_snapshot
+from apps.django_bi.workflow.models.workflow_model_mixin import WorkflowModelMixin, assign_start_states
+
+
+# Sent with ``sender=<model class>`` and ``result=<ImportResult>`` after each import.
+import_completed = Signal()
 
 
 @dataclass
@@ -17,6 +32,7 @@ class ImportResult:
     updated: int
     skipped: int
     errors: int
+    deleted: int = 0
 
 
 def _is_null(value: Any) -> bool:
@@ -110,43 +126,81 @@ def _get_unique_constraints(model: models.Model) -> List[Tuple[str, ...]]:
     return out
 
 
-# Streaming implementation to handle large files in batches while preserving the same API.
-def import_rows_from_text(
+RowValues = Union[Mapping[Union[str, int], Any], None, Exception]
+
+
+def _mapped_unique_fields(
+    model: models.Model,
+    mapping: Mapping[Union[str, int], str],
+    override_fields: Optional[Mapping[str, Any]] = None,
+) -> Optional[Tuple[str, ...]]:
+    """First unique constraint of ``model`` whose fields are all mapped (or overridden)."""
+    mapped = {str(path).split("__", 1)[0] for path in mapping.values()} | set(override_fields or ())
+    for fields in _get_unique_constraints(model):
+        if all(f in mapped for f in fields):
+            return fields
+    return None
+
+
+def _resolve_model(model: Union[str, models.Model]):
+    # Resolve model class if a label is provided
+    if isinstance(model, str):
+        try:
+            app_label, model_name = model.split(".")
+            return django_apps.get_model(app_label, model_name)
+        except Exception as exc:
+            raise ImproperlyConfigured(f"Invalid model label '{model}': {exc}")
+    return model
+
+
+# Row saves read cached FX rates, settings and classifiers; check their
+# shared data versions once per import rather than on every row.
+@data_version_snapshot()
+def import_rows(
     *,
     model: Union[str, models.Model],
-    file_path: str,
-    delimiter: str = "|",
-    has_header: bool = False,
-    ignore_prefixes: Optional[Iterable[str]] = None,
+    rows: Iterable[Sequence[Tuple[str, RowValues]]],
     mapping: Mapping[Union[str, int], str],
-    value_map: Optional[Mapping[Union[str, int], Mapping[Any, Any]]] = None,
-    method: str = "bulk_create",  # or "save_per_instance"
+    method: str = "bulk_create",  # or "save_per_instance", "hybrid", "copy", "sync"
     unique_fields: Optional[Sequence[str]] = None,
     chunk_size: int = 1000,
     dry_run: bool = False,
     recalc: Optional[Union[str, Iterable[str]]] = None,
     recalc_exclude: Optional[Iterable[str]] = None,
     stop_on_duplicate: bool = True,
-    encoding: Optional[str] = None,
-    encoding_errors: str = "strict",
     override_fields: Optional[Mapping[str, Any]] = None,
     relation_override_fields: Optional[Mapping[str, Mapping[str, Any]]] = None,
     recalc_always_save: bool = False,
     error_log_limit: int = 50,
     error_logger: Optional[str] = None,
+    assign_nulls: bool = True,
+    fingerprints: bool = False,
+    on_missing: Optional[str] = None,  # "delete" or "flag", with fingerprints=True
 ) -> ImportResult:
-    # Resolve model class if a label is provided
-    if isinstance(model, str):
-        try:
-            app_label, model_name = model.split(".")
-            Model = django_apps.get_model(app_label, model_name)
-        except Exception as exc:
-            raise ImproperlyConfigured(f"Invalid model label '{model}': {exc}")
-    else:
-        Model = model  # type: ignore[assignment]
+    """Import already-parsed rows; the engine behind the text and Excel importers.
 
-    ignore_prefixes = list(ignore_prefixes or [])
-    value_map = value_map or {}
+    ``rows`` yields batches of ``(raw, values)`` pairs. ``values`` maps the
+    keys of ``mapping`` to normalized cell values (None for empty cells),
+    or is None for rows rejected by a ``##`` marker, or the exception raised
+    while parsing the row. ``raw`` is only used in log messages. With
+    ``assign_nulls=False`` empty cells leave the field untouched instead of
+    writing None.
+
+    With ``fingerprints=True`` rows whose source values hash the same as at
+    the last import of their natural key are skipped before any ORM work (see
+    :mod:`apps.common.importers.fingerprints`); ``on_missing`` then deletes or
+    flags the keys absent from this import.
+
+    ``method="hybrid"`` gives ``save_per_instance`` results (merged onto the
+    existing row, auto-computed fields, per-row error logging) with bulk
+    writes: each batch is written with one ``bulk_create``/``bulk_update``
+    and only a failing batch is bisected to find the rows to log.
+
+    ``method="sync"`` makes the table match the rows: new keys are inserted,
+    changed rows updated and keys absent from the rows deleted, in one
+    transaction once every row is parsed (see :mod:`apps.common.importers.sync`).
+    """
+    Model = _resolve_model(model)
 
     # Prepare model field map
     field_map: Dict[str, models.Field] = {f.name: f for f in Model._meta.get_fields() if hasattr(f, "attname")}
@@ -155,30 +209,35 @@ def import_rows_from_text(
     if unique_fields and len(unique_fields) > 0:
         unique_fields_tuple: Tuple[str, ...] = tuple(unique_fields)
     else:
-        uniques = _get_unique_constraints(Model)
-        if not uniques:
+        mapped_key = _mapped_unique_fields(Model, mapping, override_fields)
+        if mapped_key is None:
             if stop_on_duplicate:
                 raise ValueError(
-                    "No unique constraints found on model and unique_fields not provided; cannot enforce duplicate detection."
+                    "No unique constraint of the model is fully mapped and unique_fields not provided; "
+                    "cannot enforce duplicate detection."
                 )
             unique_fields_tuple = tuple()
         else:
-            unique_fields_tuple = uniques[0]
+            unique_fields_tuple = mapped_key
 
-    # Helpers
-    def _col_index_for(headers: List[str]):
-        def _inner(key: Union[str, int]) -> Optional[int]:
-            if has_header and not str(key).isdigit():
-                try:
-                    return headers.index(str(key))
-                except ValueError:
-                    return None
-            try:
-                return int(key)
-            except Exception:
-                return None
-        return _inner
+    method = (method or "bulk_create").lower()
+    if method == "sync" and (fingerprints or not unique_fields_tuple):
+        raise ValueError("method='sync' needs a natural key and cannot be combined with fingerprints")
+    if on_missing is not None and (not fingerprints or on_missing not in ON_MISSING_CHOICES):
+        raise ValueError(f"on_missing must be one of {', '.join(ON_MISSING_CHOICES)} and needs fingerprints=True")
+    store: Optional[FingerprintStore] = None
+    if fingerprints and not dry_run:
+        if not unique_fields_tuple:
+            raise ValueError("fingerprints=True needs unique_fields or a unique constraint on the model")
+        # Changing what the columns mean invalidates every stored hash.
+        store = FingerprintStore(
+            Model,
+            salt=[sorted([str(k), v] for k, v in mapping.items()), str(override_fields), str(relation_override_fields), assign_nulls],
+        )
+    # Rows rejected before their natural key was known; they make "missing" keys unreliable.
+    unkeyed_rows = 0
 
+    # Helpers
     def _sanitize_rel_constraints(rel_model: models.Model, constraints: Dict[str, Any]) -> Dict[str, Any]:
         out: Dict[str, Any] = {}
         for key, val in constraints.items():
@@ -195,27 +254,49 @@ def import_rows_from_text(
             out[key] = val
         return out
 
-    def _parse_line(parts: List[str], col_index) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    def _relation_overrides(root_field: str) -> Optional[Mapping[str, Any]]:
+        if relation_override_fields and root_field in relation_override_fields:
+            try:
+                return dict(relation_override_fields[root_field])
+            except Exception:
+                return None
+        return None
+
+    def _prefetch_relations(parsed_batch) -> None:
+        """Sanitize the batch's relation constraints and resolve them in bulk."""
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for _assignments, rel_constraints, _line_no, _raw in parsed_batch:
+            for root_field, constraints in rel_constraints.items():
+                fobj = field_map.get(root_field)
+                if fobj is None or getattr(fobj, "remote_field", None) is None:
+                    continue  # reported per row
+                rel_model = fobj.remote_field.model
+                constraints = _sanitize_rel_constraints(rel_model, constraints)
+                rel_constraints[root_field] = constraints
+                grouped.setdefault(root_field, []).append(constraints)
+        for root_field, constraints_list in grouped.items():
+            rel_model = field_map[root_field].remote_field.model  # type: ignore[attr-defined]
+            try:
+                resolver.prefetch(rel_model, constraints_list, _relation_overrides(root_field))
+            except Exception:
+                # Rows fall back to per-row resolution and report their own errors.
+                log.debug("Batched relation lookup for '%s' failed", root_field, exc_info=True)
+
+    def _resolve_relations(assignments: Dict[str, Any], rel_constraints: Dict[str, Dict[str, Any]]) -> None:
+        for root_field, constraints in rel_constraints.items():
+            fobj = field_map.get(root_field)
+            rel_model = fobj.remote_field.model  # type: ignore[attr-defined]
+            # None when all relation constraints are None/empty: set FK to None explicitly
+            assignments[root_field] = resolver.resolve(rel_model, constraints, _relation_overrides(root_field))
+
+    def _assign_values(values: Mapping[Union[str, int], Any]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """Split normalized cell values into field assignments and relation constraints."""
         assignments: Dict[str, Any] = {}
         rel_constraints: Dict[str, Dict[str, Any]] = {}
         for key, path in mapping.items():
-            idx = col_index(key)
-            if idx is None or idx >= len(parts):
-                raw_value = None
-            else:
-                raw_value = parts[idx]
-            # Normalize blank strings to None and trim whitespace
-            if isinstance(raw_value, str):
-                rv = raw_value.strip()
-                if rv == "" or rv.lower() in {"nan", "none", "null"}:
-                    raw_value = None
-                else:
-                    raw_value = rv
-            if key in value_map:
-                try:
-                    raw_value = value_map[key].get(raw_value, raw_value)
-                except Exception:
-                    pass
+            raw_value = values.get(key)
+            if raw_value is None and not assign_nulls:
+                continue
             if "__" in path:
                 root_field, lookup = path.split("__", 1)
                 cons = rel_constraints.setdefault(root_field, {})
@@ -227,8 +308,6 @@ def import_rows_from_text(
                 assignments[path] = raw_value
         return assignments, rel_constraints
 
-    method = (method or "bulk_create").lower()
-
     total = 0
     created = 0
     updated = 0
@@ -237,34 +316,191 @@ def import_rows_from_text(
     seen_keys: set = set()
     logged_errors = 0
     log = logging.getLogger(error_logger or __name__)
+    # Related objects resolved by natural key, shared across batches.
+    resolver = RelationResolver()
+    # method="copy": rows are staged per batch and merged once at the end.
+    copy_loader: Optional[StagingTableLoader] = None
+    copy_update_fields: set = set()
+    copy_fingerprints: List[Tuple[str, str, Dict[str, Any]]] = []
+    key_attnames = [Model._meta.get_field(f).attname for f in unique_fields_tuple]
+    compute_map = getattr(Model, "AUTO_COMPUTE", None) or {}
 
-    # Open the file in streaming mode
-    enc = encoding or "utf-8"
-    errs = encoding_errors if encoding else "replace"
-    with open(file_path, "r", encoding=enc, errors=errs) as fh:
-        header_cols: List[str] = []
-        if has_header:
-            first = fh.readline()
-            if first:
-                header_cols = [h.strip() for h in first.rstrip("\n\r").split(delimiter)]
-        col_index = _col_index_for(header_cols)
+    def _natural_key(assignments: Mapping[str, Any]) -> Optional[Tuple[Any, ...]]:
+        if not unique_fields_tuple or not all(f in assignments for f in unique_fields_tuple):
+            return None
+        values = []
+        for f in unique_fields_tuple:
+            value = assignments[f]
+            values.append(value.pk if isinstance(value, models.Model) else field_map[f].to_python(value))
+        return tuple(values)
+
+    def _fetch_existing(keys: Iterable[Tuple[Any, ...]]) -> Dict[Tuple[Any, ...], models.Model]:
+        """Existing rows for ``keys`` in one query per 500 keys."""
+        keys = list(keys)
+        found: Dict[Tuple[Any, ...], models.Model] = {}
+        for i in range(0, len(keys), 500):
+            chunk = keys[i : i + 500]
+            if len(key_attnames) == 1:
+                qs = Model.objects.filter(**{f"{key_attnames[0]}__in": [k[0] for k in chunk]})
+            else:
+                cond = Q()
+                for key in chunk:
+                    cond |= Q(**dict(zip(key_attnames, key)))
+                qs = Model.objects.filter(cond)
+            for obj in qs:
+                found[tuple(getattr(obj, a) for a in key_attnames)] = obj
+        return found
+
+    def _compute_plan(changed: Optional[Sequence[str]]) -> List[str]:
+        """Computed fields the recalc policy asks for (``changed`` is None for new rows)."""
+        if not compute_map or recalc == "none":
+            return []
+        if recalc is None or recalc == "all":
+            if changed is None or (not changed and recalc_always_save):
+                fields = set(compute_map)
+            else:
+                fields = set(Model.get_affected_compute_fields(changed))
+        else:
+            fields = {recalc} if isinstance(recalc, str) else set(recalc)
+        fields -= set(recalc_exclude or ())
+        return [f for f in compute_map if f in fields]
+
+    HybridEntry = Tuple[models.Model, Optional[List[str]], int, Dict[str, Any]]
+
+    def _write_bisecting(entries: List[HybridEntry]) -> List[HybridEntry]:
+        """Write ``(instance, update fields or None if new, line, data)`` entries; return those written.
+
+        The whole list is tried in one transaction; on failure each half is
+        retried, down to single rows, which are logged as save errors.
+        """
+        nonlocal created, updated, errors, logged_errors
+        new = [obj for obj, fields, _line, _data in entries if fields is None]
+        grouped: Dict[Tuple[str, ...], List[models.Model]] = {}
+        for obj, fields, _line, _data in entries:
+            if fields is not None:
+                grouped.setdefault(tuple(fields), []).append(obj)
+        try:
+            with transaction.atomic():
+                if new:
+                    Model.objects.bulk_create(new, batch_size=chunk_size)
+                for fields, objs in grouped.items():
+                    Model.objects.bulk_update(objs, list(fields), batch_size=chunk_size)
+        except Exception as e:
+            for obj in new:
+                # A rolled back bulk_create may have assigned primary keys
+                obj.pk = None
+                obj._state.adding = True
+            if len(entries) > 1:
+                mid = len(entries) // 2
+                return _write_bisecting(entries[:mid]) + _write_bisecting(entries[mid:])
+            errors += 1
+            if logged_errors < error_log_limit:
+                try:
+                    _obj, _fields, line_no, data = entries[0]
+                    log.warning("Import save error on line %s: %s | data=%s", line_no, e, json.dumps(data, default=str)[:200])
+                except Exception:
+                    pass
+                logged_errors += 1
+            return []
+        created += len(new)
+        updated += len(entries) - len(new)
+        return entries
+
+    def _start_states(built: List[Tuple[Any, int, Dict[str, Any]]]) -> List[Tuple[Any, int, Dict[str, Any]]]:
+        """Give new ``(instance or row dict, line, data)`` items their workflow start state.
+
+        ``bulk_create`` and staging skip ``WorkflowModelMixin.save``; rows
+        whose workflow does not allow creation are logged and dropped.
+        """
+        nonlocal errors, logged_errors
+        if not issubclass(Model, WorkflowModelMixin) or not built:
+            return built
+        rejected = assign_start_states([obj for obj, _line, _data in built])
+        for i in sorted(rejected):
+            errors += 1
+            if logged_errors < error_log_limit:
+                try:
+                    _obj, line_no, data = built[i]
+                    log.warning("Import build/upsert error on line %s: %s | data=%s", line_no, rejected[i], json.dumps(data, default=str)[:200])
+                except Exception:
+                    pass
+                logged_errors += 1
+        return [item for i, item in enumerate(built) if i not in rejected]
+
+    def _compute_staged(staged: List[Tuple[Dict[str, Any], int, Dict[str, Any]]], fields: List[str]):
+        """Add computed ``fields`` to staged ``(row, line, data)`` items; return those computed.
+
+        Each row is computed on its existing record (if any) with the file's
+        values applied, so conflict updates get the values ``save()`` would.
+        """
+        nonlocal errors, logged_errors
+        existing = _fetch_existing({key for key in (_natural_key(row) for row, _l, _d in staged) if key is not None})
+        objs = []
+        for row, _line, _data in staged:
+            values = {}
+            for name, value in row.items():
+                field = field_map.get(name)
+                # Relations staged as ids (e.g. start states) are set through their attname
+                if field is not None and field.is_relation and not isinstance(value, models.Model):
+                    name = field.attname
+                values[name] = value
+            obj = existing.get(_natural_key(row))
+            if obj is None:
+                obj = Model(**values)
+            else:
+                for name, value in values.items():
+                    setattr(obj, name, value)
+            objs.append(obj)
+        failed: set = set()
+        try:
+            Model.compute_many(objs, fields)
+        except Exception:
+            for i, obj in enumerate(objs):
+                try:
+                    Model.compute_many([obj], fields)
+                except Exception as e:
+                    failed.add(i)
+                    errors += 1
+                    if logged_errors < error_log_limit:
+                        try:
+                            _row, line_no, data = staged[i]
+                            log.warning("Import build/upsert error on line %s: %s | data=%s", line_no, e, json.dumps(data, default=str)[:200])
+                        except Exception:
+                            pass
+                        logged_errors += 1
+        attnames = {f: Model._meta.get_field(f).attname for f in fields}
+        for (row, _line, _data), obj in zip(staged, objs):
+            for field, attname in attnames.items():
+                row.pop(field, None)
+                row[attname] = getattr(obj, attname)
+        return [item for i, item in enumerate(staged) if i not in failed]
+
+    # method="sync": normalized rows by natural key, applied once at the end.
+    sync_rows: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    deleted = 0
+    if method == "copy" and not dry_run:
+        copy_loader = StagingTableLoader(Model, unique_fields=unique_fields_tuple)
 
-        batch_lines: List[str] = []
+    with (copy_loader or nullcontext()):
 
-        def process_batch(lines: List[str]):
+        def process_batch(batch: Sequence[Tuple[str, RowValues]]):
             nonlocal total, created, updated, skipped, errors
-            nonlocal logged_errors
-            if not lines:
+            nonlocal logged_errors, unkeyed_rows
+            if not batch:
                 return
-            # Parse lines to assignments/constraints
+            # Turn cell values into assignments/constraints
             parsed_batch: List[Tuple[Dict[str, Any], Dict[str, Dict[str, Any]], int, str]] = []
-            for ln in lines:
+            # line number -> (fingerprint key, row hash)
+            batch_fingerprints: Dict[int, Tuple[str, str]] = {}
+            for ln, values in batch:
                 total += 1
                 try:
-                    parts = [p.strip() for p in ln.split(delimiter)]
-                    # Ignore rows with any column starting with '##' (comment/invalid markers)
-                    if any((isinstance(p, str) and p.startswith('##')) for p in parts):
+                    if isinstance(values, Exception):
+                        raise values
+                    if values is None:
+                        # Rows with any column starting with '##' (comment/invalid markers)
                         errors += 1
+                        unkeyed_rows += 1
                         if logged_errors < error_log_limit:
                             try:
                                 log.warning("Import ignored line %s due to '##' marker | raw='%s'", total, (ln or '')[:200])
@@ -272,7 +508,7 @@ def import_rows_from_text(
                                 pass
                             logged_errors += 1
                         continue
-                    assignments, rel_constraints = _parse_line(parts, col_index)
+                    assignments, rel_constraints = _assign_values(values)
 
                     # Duplicate detection across entire stream
                     if unique_fields_tuple:
@@ -300,10 +536,14 @@ def import_rows_from_text(
                                 skipped += 1
                                 continue
                         seen_keys.add(key_tuple)
+                        if store is not None:
+                            batch_fingerprints[total] = (store.key_for(key_tuple), store.hash_for(values))
 
                     parsed_batch.append((assignments, rel_constraints, total, ln))
                 except Exception as e:
                     errors += 1
+                    if total not in batch_fingerprints:
+                        unkeyed_rows += 1
                     if logged_errors < error_log_limit:
                         try:
                             log.warning("Import parse error on line %s: %s | raw='%s'", total, e, (ln or '')[:200])
@@ -315,49 +555,38 @@ def import_rows_from_text(
             if dry_run or not parsed_batch:
                 return
 
+            if store is not None:
+                same = store.unchanged(dict(batch_fingerprints.values()))
+                if same:
+                    kept = [entry for entry in parsed_batch if batch_fingerprints[entry[2]][0] not in same]
+                    skipped += len(parsed_batch) - len(kept)
+                    parsed_batch = kept
+                    if not parsed_batch:
+                        return
+            written_fingerprints: List[Tuple[str, str, Dict[str, Any]]] = []
+
+            def _fingerprint(line_no: int, assignments: Mapping[str, Any]) -> None:
+                if store is not None:
+                    key, row_hash = batch_fingerprints[line_no]
+                    written_fingerprints.append(
+                        (key, row_hash, FingerprintStore.lookup_for(Model, unique_fields_tuple, assignments))
+                    )
+
+            if method in ("bulk_create", "save_per_instance", "hybrid", "copy", "sync"):
+                _prefetch_relations(parsed_batch)
+
             if method == "bulk_create":
                 # Resolve relations and build instances
-                instances: List[models.Model] = []
+                built: List[Tuple[models.Model, int, Dict[str, Any]]] = []
                 update_fields_set = set()
                 for assignments, rel_constraints, line_no, raw_line in parsed_batch:
                     try:
-                        for root_field, constraints in rel_constraints.items():
-                            fobj = field_map.get(root_field)
-                            rel_model = fobj.remote_field.model  # type: ignore[attr-defined]
-                            constraints = _sanitize_rel_constraints(rel_model, constraints)
-                            # If all relation constraints are None/empty, set FK to None explicitly
-                            if not any(val is not None for val in constraints.values()):
-                                assignments[root_field] = None
-                                continue
-                            rel_instance = rel_model.objects.filter(**constraints).first()
-                            if not rel_instance:
-                                create_kwargs: Dict[str, Any] = {}
-                                for key, val in constraints.items():
-                                    if "__" not in key or key == "pk":
-                                        field_name = key if key != "pk" else rel_model._meta.pk.name
-                                        create_kwargs[field_name] = val
-                                        continue
-                                    parts_path = key.split("__")
-                                    base_field_name = parts_path[0]
-                                    nested_lookup = "__".join(parts_path[1:])
-                                    base_field = rel_model._meta.get_field(base_field_name)
-                                    nested_model = base_field.remote_field.model  # type: ignore[attr-defined]
-                                    nested_obj = nested_model.objects.filter(**{nested_lookup: val}).first()
-                                    if not nested_obj:
-                                        nested_obj = nested_model.objects.create(**{nested_lookup: val})
-                                    create_kwargs[base_field_name] = nested_obj
-                                if relation_override_fields and root_field in relation_override_fields:
-                                    try:
-                                        create_kwargs.update(relation_override_fields[root_field])
-                                    except Exception:
-                                        pass
-                                rel_instance = rel_model.objects.create(**create_kwargs)
-                            assignments[root_field] = rel_instance
+                        _resolve_relations(assignments, rel_constraints)
                         if override_fields:
                             assignments.update(override_fields)
                         for k in assignments.keys():
                             update_fields_set.add(k)
-                        instances.append(Model(**assignments))
+                        built.append((Model(**assignments), line_no, assignments))
                     except Exception as e:
                         errors += 1
                         if logged_errors < error_log_limit:
@@ -368,6 +597,10 @@ def import_rows_from_text(
                             logged_errors += 1
                         continue
 
+                instances: List[models.Model] = []
+                for instance, line_no, assignments in _start_states(built):
+                    instances.append(instance)
+                    _fingerprint(line_no, assignments)
                 if not instances:
                     return
 
@@ -392,44 +625,127 @@ def import_rows_from_text(
                 else:
                     Model.objects.bulk_create(instances, batch_size=chunk_size)
                 created += len(instances)
+                if store is not None:
+                    store.record(written_fingerprints)
+
+            elif method == "hybrid":
+                resolved: List[Tuple[Dict[str, Any], int, Optional[Tuple[Any, ...]]]] = []
+                for assignments, rel_constraints, line_no, raw_line in parsed_batch:
+                    try:
+                        _resolve_relations(assignments, rel_constraints)
+                        if override_fields:
+                            assignments.update(override_fields)
+                        resolved.append((assignments, line_no, _natural_key(assignments)))
+                    except Exception as e:
+                        errors += 1
+                        if logged_errors < error_log_limit:
+                            try:
+                                log.warning("Import build/upsert error on line %s: %s | data=%s", line_no, e, json.dumps(assignments, default=str)[:200])
+                            except Exception:
+                                pass
+                            logged_errors += 1
+                        continue
+
+                existing = _fetch_existing({key for _a, _l, key in resolved if key is not None})
+                auto_now = [f.name for f in Model._meta.concrete_fields if getattr(f, "auto_now", False)]
+                # (instance, changed fields or None if new, fields to compute, line, data)
+                candidates: List[Tuple[models.Model, Optional[List[str]], List[str], int, Dict[str, Any]]] = []
+                for assignments, line_no, key in resolved:
+                    try:
+                        instance = existing.get(key) if key is not None else None
+                        if instance is None:
+                            candidates.append((Model(**assignments), None, _compute_plan(None), line_no, assignments))
+                            continue
+                        # Compare as the field's Python type, so "5" matches a stored 5;
+                        # relations by id, without loading the related object
+                        values = {
+                            name: value if field_map[name].is_relation else field_map[name].to_python(value)
+                            for name, value in assignments.items()
+                        }
+                        changed = []
+                        for name, value in values.items():
+                            field = field_map[name]
+                            if field.is_relation:
+                                value = value.pk if isinstance(value, models.Model) else field.target_field.to_python(value)  # type: ignore[attr-defined]
+                                if getattr(instance, field.attname) != value:
+                                    changed.append(name)
+                            elif getattr(instance, name) != value:
+                                changed.append(name)
+                        if not changed and not (recalc and recalc_always_save):
+                            skipped += 1
+                            _fingerprint(line_no, assignments)
+                            continue
+                        for name in changed:
+                            setattr(instance, name, values[name])
+                        candidates.append((instance, changed, _compute_plan(changed), line_no, assignments))
+                    except Exception as e:
+                        errors += 1
+                        if logged_errors < error_log_limit:
+                            try:
+                                log.warning("Import save error on line %s: %s | data=%s", line_no, e, json.dumps(assignments, default=str)[:200])
+                            except Exception:
+                                pass
+                            logged_errors += 1
+                        continue
+                kept = {id(obj) for obj, _line, _data in _start_states([(c[0], c[3], c[4]) for c in candidates if c[1] is None])}
+                candidates = [c for c in candidates if c[1] is not None or id(c[0]) in kept]
+
+                # Computed fields for the whole batch, grouped by field set so
+                # batched compute methods (e.g. FX conversion) run once per group
+                attnames = {f: Model._meta.get_field(f).attname for f in compute_map}
+                before = {id(c[0]): {f: getattr(c[0], attnames[f]) for f in c[2]} for c in candidates}
+                groups: Dict[Tuple[str, ...], List[Any]] = {}
+                for candidate in candidates:
+                    if candidate[2]:
+                        groups.setdefault(tuple(candidate[2]), []).append(candidate)
+                failed: set = set()
+                for fields, group in groups.items():
+                    try:
+                        Model.compute_many([c[0] for c in group], fields)
+                        continue
+                    except Exception:
+                        pass
+                    for instance, _changed, _fields, line_no, assignments in group:
+                        try:
+                            Model.compute_many([instance], fields)
+                        except Exception as e:
+                            failed.add(id(instance))
+                            errors += 1
+                            if logged_errors < error_log_limit:
+                                try:
+                                    log.warning("Import save error on line %s: %s | data=%s", line_no, e, json.dumps(assignments, default=str)[:200])
+                                except Exception:
+                                    pass
+                                logged_errors += 1
+
+                entries: List[HybridEntry] = []
+                for instance, changed, fields, line_no, assignments in candidates:
+                    if id(instance) in failed:
+                        continue
+                    if changed is None:
+                        entries.append((instance, None, line_no, assignments))
+                        continue
+                    old = before[id(instance)]
+                    write = changed + [f for f in fields if f not in changed and getattr(instance, attnames[f]) != old[f]]
+                    if not write:
+                        skipped += 1
+                        _fingerprint(line_no, assignments)
+                        continue
+                    for name in auto_now:
+                        Model._meta.get_field(name).pre_save(instance, add=False)
+                    entries.append((instance, write + [f for f in auto_now if f not in write], line_no, assignments))
+
+                for _obj, _fields, line_no, assignments in _write_bisecting(entries) if entries else []:
+                    _fingerprint(line_no, assignments)
+                if store is not None:
+                    store.record(written_fingerprints)
 
             elif method == "save_per_instance":
                 # Per-row savepoints to avoid aborting the whole batch on one failure
                 for assignments, rel_constraints, line_no, raw_line in parsed_batch:
                     try:
                         with transaction.atomic():
-                            for root_field, constraints in rel_constraints.items():
-                                fobj = field_map.get(root_field)
-                                rel_model = fobj.remote_field.model  # type: ignore[attr-defined]
-                                constraints = _sanitize_rel_constraints(rel_model, constraints)
-                                # If all relation constraints are None/empty, set FK to None explicitly
-                                if not any(val is not None for val in constraints.values()):
-                                    assignments[root_field] = None
-                                    continue
-                                rel_instance = rel_model.objects.filter(**constraints).first()
-                                if not rel_instance:
-                                    create_kwargs: Dict[str, Any] = {}
-                                    for key, val in constraints.items():
-                                        if "__" not in key or key == "pk":
-                                            field_name = key if key != "pk" else rel_model._meta.pk.name
-                                            create_kwargs[field_name] = val
-                                            continue
-                                        parts_path = key.split("__")
-                                        base_field_name = parts_path[0]
-                                        nested_lookup = "__".join(parts_path[1:])
-                                        base_field = rel_model._meta.get_field(base_field_name)
-                                        nested_model = base_field.remote_field.model  # type: ignore[attr-defined]
-                                        nested_obj = nested_model.objects.filter(**{nested_lookup: val}).first()
-                                        if not nested_obj:
-                                            nested_obj = nested_model.objects.create(**{nested_lookup: val})
-                                        create_kwargs[base_field_name] = nested_obj
-                                    if relation_override_fields and root_field in relation_override_fields:
-                                        try:
-                                            create_kwargs.update(relation_override_fields[root_field])
-                                        except Exception:
-                                            pass
-                                    rel_instance = rel_model.objects.create(**create_kwargs)
-                                assignments[root_field] = rel_instance
+                            _resolve_relations(assignments, rel_constraints)
 
                             if override_fields:
                                 assignments.update(override_fields)
@@ -450,10 +766,8 @@ def import_rows_from_text(
                                 if recalc is not None:
                                     if isinstance(recalc, str):
                                         if recalc == "all":
-                                            try:
-                                                recalc_fields = list(getattr(instance, "AUTO_COMPUTE", {}).keys())
-                                            except Exception:
-                                                recalc_fields = []
+                                            # AutoComputeMixin.save() adds the computed fields affected by `changed`
+                                            recalc_fields = []
                                         elif recalc == "none":
                                             recalc_fields = []
                                         else:
@@ -509,20 +823,309 @@ def import_rows_from_text(
                                 pass
                             logged_errors += 1
                         continue
+                    _fingerprint(line_no, assignments)
+                if store is not None:
+                    store.record(written_fingerprints)
+            elif method == "copy":
+                staged: List[Tuple[Dict[str, Any], int, Dict[str, Any]]] = []
+                for assignments, rel_constraints, line_no, raw_line in parsed_batch:
+                    try:
+                        _resolve_relations(assignments, rel_constraints)
+                        if override_fields:
+                            assignments.update(override_fields)
+                        copy_update_fields.update(assignments.keys())
+                        staged.append((assignments, line_no, assignments))
+                    except Exception as e:
+                        errors += 1
+                        if logged_errors < error_log_limit:
+                            try:
+                                log.warning("Import build/upsert error on line %s: %s | data=%s", line_no, e, json.dumps(assignments, default=str)[:200])
+                            except Exception:
+                                pass
+                            logged_errors += 1
+                        continue
+                # Start states are only staged, not added to the merge's update fields
+                staged = _start_states(staged)
+                fields = _compute_plan(None)
+                if fields:
+                    staged = _compute_staged(staged, fields)
+                    copy_update_fields.update(fields)
+                staged_rows: List[Dict[str, Any]] = []
+                for row, line_no, assignments in staged:
+                    staged_rows.append(row)
+                    _fingerprint(line_no, assignments)
+                copy_loader.stage(staged_rows)  # type: ignore[union-attr]
+                # Recorded once the merge has succeeded
+                copy_fingerprints.extend(written_fingerprints)
+            elif method == "sync":
+                for assignments, rel_constraints, line_no, raw_line in parsed_batch:
+                    try:
+                        _resolve_relations(assignments, rel_constraints)
+                        if override_fields:
+                            assignments.update(override_fields)
+                        row = normalize_row(Model, assignments)
+                        sync_rows[row_key(Model, unique_fields_tuple, row)] = row
+                    except Exception as e:
+                        errors += 1
+                        unkeyed_rows += 1
+                        if logged_errors < error_log_limit:
+                            try:
+                                log.warning("Import build error on line %s: %s | data=%s", line_no, e, json.dumps(assignments, default=str)[:200])
+                            except Exception:
+                                pass
+                            logged_errors += 1
+                        continue
             else:
-                raise ValueError("method must be 'bulk_create' or 'save_per_instance'")
+                raise ValueError("method must be 'bulk_create', 'save_per_instance', 'hybrid', 'copy' or 'sync'")
 
-        # Stream lines and process in batches
-        for raw in fh:
-            ln = raw.rstrip("\n\r")
-            if not ln or any(ln.startswith(pfx) for pfx in ignore_prefixes):
-                continue
-            batch_lines.append(ln)
-            if len(batch_lines) >= max(1, int(chunk_size or 1000)):
-                process_batch(batch_lines)
-                batch_lines = []
+        for batch in rows:
+            process_batch(batch)
+
+        if copy_loader is not None:
+            inserted, merged = copy_loader.merge(update_fields=copy_update_fields)
+            created += inserted
+            updated += merged
+            skipped += copy_loader.staged - inserted - merged
+            if store is not None:
+                store.record(copy_fingerprints)
+
+        if method == "sync" and not dry_run:
+            if unkeyed_rows:
+                log.warning(
+                    "Sync of %s: %s rows could not be keyed; rows missing from the file are kept",
+                    Model.__name__, unkeyed_rows,
+                )
+            synced = sync_table(
+                Model,
+                unique_fields_tuple,
+                sync_rows,
+                delete_missing=not unkeyed_rows,
+                recalc=recalc,
+                recalc_exclude=recalc_exclude,
+                batch_size=chunk_size,
+            )
+            created += synced.created
+            updated += synced.updated
+            skipped += synced.unchanged
+            deleted = synced.deleted
+
+    if (method == "bulk_create" and created) or (method in ("hybrid", "copy") and (created or updated)):
+        # Bulk writes send no post_save; invalidate caches keyed on data versions.
+        bump_data_version(Model)
+
+    if store is not None:
+        if on_missing is not None and unkeyed_rows:
+            log.warning(
+                "Import of %s: %s rows had no natural key; keys missing from the file left as is (on_missing=%s)",
+                Model.__name__, unkeyed_rows, on_missing,
+            )
+            on_missing = None
+        missing = store.finish(on_missing)
+        if missing:
+            log.info("Import of %s: %s keys missing from the file (%s)", Model.__name__, missing, on_missing or "kept")
+
+    result = ImportResult(
+        total=total, created=created, updated=updated, skipped=skipped, errors=errors, deleted=deleted
+    )
+    if not dry_run:
+        import_completed.send(sender=Model, result=result)
+    return result
+
+
+def _col_index_for(headers: List[str], has_header: bool):
+    def _inner(key: Union[str, int]) -> Optional[int]:
+        if has_header and not str(key).isdigit():
+            try:
+                return headers.index(str(key))
+            except ValueError:
+                return None
+        try:
+            return int(key)
+        except Exception:
+            return None
+    return _inner
+
+
+def _iter_line_batches(
+    fh,
+    *,
+    delimiter: str,
+    ignore_prefixes: Sequence[str],
+    mapping: Mapping[Union[str, int], str],
+    value_map: Mapping[Union[str, int], Mapping[Any, Any]],
+    col_index,
+    chunk_size: int,
+) -> Iterator[List[Tuple[str, RowValues]]]:
+    """Split, trim and normalize lines of ``fh`` in batches of ``chunk_size``."""
+
+    def _parse_line(ln: str) -> RowValues:
+        parts = [p.strip() for p in ln.split(delimiter)]
+        # Ignore rows with any column starting with '##' (comment/invalid markers)
+        if any((isinstance(p, str) and p.startswith('##')) for p in parts):
+            return None
+        values: Dict[Union[str, int], Any] = {}
+        for key in mapping:
+            idx = col_index(key)
+            if idx is None or idx >= len(parts):
+                raw_value = None
+            else:
+                raw_value = parts[idx]
+            # Normalize blank strings to None and trim whitespace
+            if isinstance(raw_value, str):
+                rv = raw_value.strip()
+                if rv == "" or rv.lower() in {"nan", "none", "null"}:
+                    raw_value = None
+                else:
+                    raw_value = rv
+            if key in value_map:
+                try:
+                    raw_value = value_map[key].get(raw_value, raw_value)
+                except Exception:
+                    pass
+            values[key] = raw_value
+        return values
+
+    batch: List[Tuple[str, RowValues]] = []
+    size = max(1, int(chunk_size or 1000))
+    for raw in fh:
+        ln = raw.rstrip("\n\r")
+        if not ln or any(ln.startswith(pfx) for pfx in ignore_prefixes):
+            continue
+        try:
+            batch.append((ln, _parse_line(ln)))
+        except Exception as exc:
+            batch.append((ln, exc))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _LineReader(io.TextIOBase):
+    """Read-only text stream over an iterable of lines, for ``lines=`` imports.
+
+    Iterating yields the lines one at a time; ``read()`` (used by the pandas
+    parser) joins as many as the requested size needs.
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        self._lines = iter(lines)
+        self._pending = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def _next_line(self) -> str:
+        for line in self._lines:
+            return line if line.endswith("\n") else line + "\n"
+        return ""
+
+    def readline(self, size: Optional[int] = -1) -> str:
+        if not self._pending:
+            return self._next_line()
+        line, sep, rest = self._pending.partition("\n")
+        self._pending = rest
+        return line + sep if sep else line + self._next_line()
+
+    def __next__(self) -> str:
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def read(self, size: Optional[int] = -1) -> str:
+        chunks = [self._pending]
+        length = len(self._pending)
+        while size is None or size < 0 or length < size:
+            line = self._next_line()
+            if not line:
+                break
+            chunks.append(line)
+            length += len(line)
+        data = "".join(chunks)
+        if size is None or size < 0:
+            self._pending = ""
+            return data
+        data, self._pending = data[:size], data[size:]
+        return data
+
+
+# Streaming implementation to handle large files in batches while preserving the same API.
+def import_rows_from_text(
+    *,
+    model: Union[str, models.Model],
+    file_path: Optional[str] = None,
+    lines: Optional[Iterable[str]] = None,
+    delimiter: str = "|",
+    has_header: bool = False,
+    ignore_prefixes: Optional[Iterable[str]] = None,
+    mapping: Mapping[Union[str, int], str],
+    value_map: Optional[Mapping[Union[str, int], Mapping[Any, Any]]] = None,
+    encoding: Optional[str] = None,
+    encoding_errors: str = "strict",
+    parser: str = "python",  # or "pandas" (vectorized, see importers.frames)
+    **options: Any,
+) -> ImportResult:
+    """Import a delimited text export; see :func:`import_rows` for ``options``.
+
+    Reads ``file_path``, or the text lines of ``lines`` (e.g. a
+    :func:`apps.common.functions.files.stage_text_contents` stream) as they
+    are iterated.
+    """
+    if (file_path is None) == (lines is None):
+        raise ValueError("Pass exactly one of file_path or lines")
+    Model = _resolve_model(model)
+    ignore_prefixes = list(ignore_prefixes or [])
+    value_map = value_map or {}
+    parser = (parser or "python").lower()
+    if parser not in ("python", "pandas"):
+        raise ValueError("parser must be 'python' or 'pandas'")
+    chunk_size = options.get("chunk_size", 1000)
+
+    # Open the file in streaming mode
+    if lines is not None:
+        source = nullcontext(_LineReader(lines))
+    else:
+        enc = encoding or "utf-8"
+        errs = encoding_errors if encoding else "replace"
+        source = open(file_path, "r", encoding=enc, errors=errs)
+    with source as fh:
+        header_cols: List[str] = []
+        if has_header:
+            first = fh.readline()
+            if first:
+                header_cols = [h.strip() for h in first.rstrip("\n\r").split(delimiter)]
+        col_index = _col_index_for(header_cols, has_header)
 
-        if batch_lines:
-            process_batch(batch_lines)
+        if parser == "pandas":
+            from apps.common.importers.frames import read_frames
 
-    return ImportResult(total=total, created=created, updated=updated, skipped=skipped, errors=errors)
+            field_map = {f.name: f for f in Model._meta.get_fields() if hasattr(f, "attname")}
+            date_columns: Dict[Union[str, int], str] = {}
+            for key, path in mapping.items():
+                fobj = field_map.get(path)
+                if isinstance(fobj, models.DateTimeField):
+                    date_columns[key] = "datetime"
+                elif isinstance(fobj, models.DateField):
+                    date_columns[key] = "date"
+            batches = read_frames(
+                fh,
+                delimiter=delimiter,
+                columns={key: col_index(key) for key in mapping},
+                ignore_prefixes=ignore_prefixes,
+                value_map=value_map,
+                date_columns=date_columns,
+                chunk_size=chunk_size,
+            )
+        else:
+            batches = _iter_line_batches(
+                fh,
+                delimiter=delimiter,
+                ignore_prefixes=ignore_prefixes,
+                mapping=mapping,
+                value_map=value_map,
+                col_index=col_index,
+                chunk_size=chunk_size,
+            )
+        return import_rows(model=Model, rows=batches, mapping=mapping, **options)
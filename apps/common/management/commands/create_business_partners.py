@@ -1,5 +1,4 @@
 import logging
-import os
 import environ
 from django.core.management.base import BaseCommand
 from apps.common.functions import files as files_utils
@@ -23,32 +22,26 @@ class Command(BaseCommand):
             else:
                 prefix = "/srv/mag360mai/reports/Business-Partners-"
 
-            # Create a cleaned copy of the latest date-stamped file
+            # Stream the cleaned lines of the latest date-stamped file
             # Header is: "BP | Name"; also strip separator rows
-            file_copy = files_utils.read_text_contents(prefix, ["Date", "MAI - ", "ELIMETAL - ", "BP", "|", "-"])
-            try:
-                result = import_rows_from_text(
-                    model="common.BusinessPartner",
-                    file_path=file_copy,
-                    delimiter="|",
-                    has_header=False,
-                    ignore_prefixes=[],  # already cleaned in the copy
-                    mapping={
-                        "0": "code",
-                        "1": "name",
-                    },
-                    method="bulk_create",
-                    unique_fields=("code",),
-                )
-                debug_logger.info(
-                    "BusinessPartners import: total=%s created=%s updated=%s skipped=%s errors=%s",
-                    result.total, result.created, result.updated, result.skipped, result.errors,
-                )
-            finally:
-                try:
-                    os.remove(file_copy)
-                except Exception:
-                    pass
+            lines = files_utils.stage_text_contents(prefix, ["Date", "MAI - ", "ELIMETAL - ", "BP", "|", "-"])
+            result = import_rows_from_text(
+                model="common.BusinessPartner",
+                lines=lines,
+                delimiter="|",
+                has_header=False,
+                ignore_prefixes=[],  # already skipped while staging
+                mapping={
+                    "0": "code",
+                    "1": "name",
+                },
+                method="bulk_create",
+                unique_fields=("code",),
+            )
+            debug_logger.info(
+                "BusinessPartners import: total=%s created=%s updated=%s skipped=%s errors=%s",
+                result.total, result.created, result.updated, result.skipped, result.errors,
+            )
 
             debug_logger.info("Updated Business Partners via importer")
 
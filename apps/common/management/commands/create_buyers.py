@@ -1,5 +1,4 @@
 import logging
-import os
 import environ
 from django.core.management.base import BaseCommand
 from apps.common.functions import files as files_utils
@@ -23,33 +22,27 @@ class Command(BaseCommand):
             else:
                 prefix = "/srv/mag360mai/reports/Buyers-"
 
-            file_copy = files_utils.read_text_contents(prefix, ["Date", "MAI - ", "ELIMETAL - ", "Employee", "|", "-"])
-            try:
-                result = import_rows_from_text(
-                    model="accounts.CustomUser",
-                    file_path=file_copy,
-                    delimiter="|",
-                    has_header=False,
-                    ignore_prefixes=[],  # already cleaned in the copy
-                    # Text file columns: Employee | Name | Given Name
-                    # Mapping requested: Employee -> username, Name -> first_name
-                    mapping={
-                        "0": "username",     # Employee
-                        "1": "first_name",   # Name
-                        # "2": "last_name",  # Given Name (left unmapped unless needed)
-                    },
-                    method="bulk_create",
-                    unique_fields=("username",),
-                )
-                debug_logger.info(
-                    "CustomUsers import: total=%s created=%s updated=%s skipped=%s errors=%s",
-                    result.total, result.created, result.updated, result.skipped, result.errors,
-                )
-            finally:
-                try:
-                    os.remove(file_copy)
-                except Exception:
-                    pass
+            lines = files_utils.stage_text_contents(prefix, ["Date", "MAI - ", "ELIMETAL - ", "Employee", "|", "-"])
+            result = import_rows_from_text(
+                model="accounts.CustomUser",
+                lines=lines,
+                delimiter="|",
+                has_header=False,
+                ignore_prefixes=[],  # already skipped while staging
+                # Text file columns: Employee | Name | Given Name
+                # Mapping requested: Employee -> username, Name -> first_name
+                mapping={
+                    "0": "username",     # Employee
+                    "1": "first_name",   # Name
+                    # "2": "last_name",  # Given Name (left unmapped unless needed)
+                },
+                method="bulk_create",
+                unique_fields=("username",),
+            )
+            debug_logger.info(
+                "CustomUsers import: total=%s created=%s updated=%s skipped=%s errors=%s",
+                result.total, result.created, result.updated, result.skipped, result.errors,
+            )
 
             debug_logger.info("Updated Custom Users via importer")
 
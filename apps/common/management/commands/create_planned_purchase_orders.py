@@ -1,5 +1,4 @@
 import logging
-import os
 import environ
 from django.core.management.base import BaseCommand
 from apps.common.functions import files as files_utils
@@ -26,35 +25,30 @@ class Command(BaseCommand):
             # Source columns example:
             # Order | Order Item | Order Quantity | Pl.St.Dt | Pl.Fi.Dt | Req.Date | Buyer | supplier | Shop Floor Pln
 
-            file_copy = files_utils.read_text_contents(prefix, ["Date", "MAI", "ELIMETAL", "Order", "|", "-"])
-            try:
-                result = import_rows_from_text(
-                    model="common.PlannedPurchaseOrder",
-                    file_path=file_copy,
-                    delimiter="|",
-                    has_header=False,
-                    ignore_prefixes=[],  # already cleaned in the copy
-                    mapping={
-                        "0": "order",
-                        "1": "item__code",
-                        "2": "quantity",
-                        "3": "planned_start_date",
-                        "4": "planned_end_date",
-                        "5": "required_date",
-                        "6": "buyer__username",
-                        "7": "supplier__code",
-                    },
-                    method="bulk_create",
-                )
-                debug_logger.info(
-                    "PlannedPurchaseOrders import: total=%s created=%s updated=%s skipped=%s errors=%s",
-                    result.total, result.created, result.updated, result.skipped, result.errors,
-                )
-            finally:
-                try:
-                    os.remove(file_copy)
-                except Exception:
-                    pass
+            lines = files_utils.stage_text_contents(prefix, ["Date", "MAI", "ELIMETAL", "Order", "|", "-"])
+            result = import_rows_from_text(
+                model="common.PlannedPurchaseOrder",
+                lines=lines,
+                delimiter="|",
+                has_header=False,
+                ignore_prefixes=[],  # already skipped while staging
+                mapping={
+                    "0": "order",
+                    "1": "item__code",
+                    "2": "quantity",
+                    "3": "planned_start_date",
+                    "4": "planned_end_date",
+                    "5": "required_date",
+                    "6": "buyer__username",
+                    "7": "supplier__code",
+                },
+                method="sync",  # orders gone from the file are deleted
+                unique_fields=("order",),
+            )
+            debug_logger.info(
+                "PlannedPurchaseOrders import: total=%s created=%s updated=%s skipped=%s errors=%s",
+                result.total, result.created, result.updated, result.skipped, result.errors,
+            )
 
             debug_logger.info("Updated Planned Purchase Orders via importer")
 
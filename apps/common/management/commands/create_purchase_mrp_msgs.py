@@ -1,9 +1,10 @@
 import logging
-import os
 import environ
 from django.core.management.base import BaseCommand
 from apps.common.functions import files as files_utils
 from apps.common.importers.text import import_rows_from_text
+from apps.common.models import PurchaseMrpMessage
+from apps.common.models.auto_compute_mixin import bulk_recompute
 
 
 env = environ.Env()
@@ -26,49 +27,34 @@ class Command(BaseCommand):
             # Source columns example:
             # Order | Pos | Sq | PN | Description | Order.Date | Pl.Del.Dte | Conf.Date | Modify Dt | Whs | Cur | Ord. | Un.Price | Tot.Amnt | Buyer | Notes on P.O.Line | Itm Gr | Exception Msg | Res.Dt | Suppli
 
-            file_copy = files_utils.read_text_contents(prefix, ["Order", "-"])
             # Keep only rows where column 17 (0-based index) is NOT blank
             # Column 17 in mapping corresponds to the Exception Msg field
-            try:
-                with open(file_copy, "r", encoding="utf-8") as fh:
-                    lines = fh.readlines()
-                with open(file_copy, "w", encoding="utf-8") as fh:
-                    for ln in lines:
-                        parts = [p.strip() for p in ln.split("|")]
-                        # Ensure there are at least 18 columns and the 18th value is non-empty
-                        if len(parts) > 17 and parts[17] != "":
-                            fh.write(ln)
-            except Exception:
-                # If any issue occurs during pre-filtering, proceed without additional filtering
-                pass
-            try:
-                result = import_rows_from_text(
-                    model="common.PurchaseMrpMessage",
-                    file_path=file_copy,
-                    delimiter="|",
-                    has_header=False,
-                    ignore_prefixes=[],  # already cleaned in the copy
-                    mapping={
-                        "0": "pol__order__order",      # PO number
-                        "1": "pol__line",              # PO line (Pos)
-                        "2": "pol__sequence",          # PO sequence (Sq)
-                        "17": "mrp_message",           # Exception Msg
-                        "18": "mrp_reschedule_date",   # Res.Dt
-                    },
-                    method="save_per_instance",  # compute delta/direction/classification on save
-                    unique_fields=("pol",),       # OneToOne(pol) implies unique
-                    recalc={"reschedule_delta_days", "direction", "classification"},
-                    recalc_always_save=True,
-                )
-                debug_logger.info(
-                    "PurchaseMrpMessages import: total=%s created=%s updated=%s skipped=%s errors=%s",
-                    result.total, result.created, result.updated, result.skipped, result.errors,
-                )
-            finally:
-                try:
-                    os.remove(file_copy)
-                except Exception:
-                    pass
+            lines = files_utils.stage_text_contents(
+                prefix, ["Order", "-"], predicates=[lambda parts: len(parts) > 17 and parts[17] != ""]
+            )
+            result = import_rows_from_text(
+                model="common.PurchaseMrpMessage",
+                lines=lines,
+                delimiter="|",
+                has_header=False,
+                ignore_prefixes=[],  # already skipped while staging
+                mapping={
+                    "0": "pol__order__order",      # PO number
+                    "1": "pol__line",              # PO line (Pos)
+                    "2": "pol__sequence",          # PO sequence (Sq)
+                    "17": "mrp_message",           # Exception Msg
+                    "18": "mrp_reschedule_date",   # Res.Dt
+                },
+                method="sync",                # insert/update/delete the difference in one transaction
+                unique_fields=("pol",),       # OneToOne(pol) implies unique
+            )
+            # Unchanged messages still follow their PO line's dates; only rows whose
+            # computed values differ are written, and only then is the version bumped
+            recomputed = bulk_recompute(PurchaseMrpMessage.objects.all())
+            debug_logger.info(
+                "PurchaseMrpMessages import: total=%s created=%s updated=%s skipped=%s errors=%s recomputed=%s",
+                result.total, result.created, result.updated, result.skipped, result.errors, recomputed,
+            )
 
             debug_logger.info("Updated Purchase MRP Messages via importer")
 
@@ -1,5 +1,4 @@
 import logging
-import os
 import environ
 from django.core.management.base import BaseCommand
 from apps.common.functions import files as files_utils
@@ -23,30 +22,24 @@ class Command(BaseCommand):
             else:
                 prefix = "/srv/mag360mai/reports/Receipts-"
 
-            # Create a cleaned copy of the latest date-stamped file
-            file_copy = files_utils.read_text_contents(prefix, ["Date", "Company", "Receipt", "|", "-"])
-            try:
-                result = import_rows_from_text(
-                    model="common.Receipt",
-                    file_path=file_copy,
-                    delimiter="|",
-                    has_header=False,
-                    ignore_prefixes=[],  # already cleaned in the copy
-                    mapping={
-                        "0": "number",
-                    },
-                    method="bulk_create",
-                    unique_fields=("number",),
-                )
-                debug_logger.info(
-                    "Receipts import: total=%s created=%s updated=%s skipped=%s errors=%s",
-                    result.total, result.created, result.updated, result.skipped, result.errors,
-                )
-            finally:
-                try:
-                    os.remove(file_copy)
-                except Exception:
-                    pass
+            # Stream the cleaned lines of the latest date-stamped file
+            lines = files_utils.stage_text_contents(prefix, ["Date", "Company", "Receipt", "|", "-"])
+            result = import_rows_from_text(
+                model="common.Receipt",
+                lines=lines,
+                delimiter="|",
+                has_header=False,
+                ignore_prefixes=[],  # already skipped while staging
+                mapping={
+                    "0": "number",
+                },
+                method="bulk_create",
+                unique_fields=("number",),
+            )
+            debug_logger.info(
+                "Receipts import: total=%s created=%s updated=%s skipped=%s errors=%s",
+                result.total, result.created, result.updated, result.skipped, result.errors,
+            )
 
             debug_logger.info("Updated Receipts via importer")
 
@@ -209,52 +209,32 @@ class Command(BaseCommand):
             except Exception as exc:
                 raise CommandError(f"Invalid --value-map JSON: {exc}")
 
-        # Choose source file and optionally clean it like existing utilities
+        # Choose source file and stream its cleaned lines like existing utilities
         file_path: Optional[str] = None
-        cleanup_copy = False
         if options.get("prefix"):
-            try:
-                file_path = files_utils.read_text_contents(options["prefix"], ignore_prefixes)
-            except Exception as exc:
-                raise CommandError(f"Could not resolve prefix to a file: prefix='{options['prefix']}', error={exc}")
-            cleanup_copy = True
+            file_path = files_utils.find_dated_file(options["prefix"])
+            if not os.path.exists(file_path):
+                raise CommandError(f"Could not resolve prefix to a file: prefix='{options['prefix']}'")
         else:
             file_path = options["file"]
             if not os.path.exists(file_path):
                 raise CommandError(f"File not found: {file_path}")
-            # If ignore prefixes were provided for a direct file, mimic cleaning by creating a copy
-            if ignore_prefixes:
-                file_path = files_utils.read_text_contents(file_path.replace(".txt", ""), ignore_prefixes)
-                cleanup_copy = True
 
         log.info("Using file: %s", file_path)
 
-        # Read rows
+        # Read rows lazily; blank and ignored lines are skipped while streaming
         try:
-            with open(file_path, "r", encoding="utf-8") as fh:
-                raw_lines = [ln.rstrip("\n\r") for ln in fh.readlines()]
+            raw_lines = files_utils.iter_text_lines(file_path, ignore_prefixes)
+            header: List[str] = []
+            if has_header:
+                first = next(raw_lines, None)
+                if first is not None:
+                    header = [h.strip() for h in first.split(delimiter)]
+            data_lines = raw_lines
         except Exception as exc:
             raise CommandError(f"Failed to read file: {exc}")
-        finally:
-            # remove the temp copy produced by read_text_contents
-            if cleanup_copy:
-                try:
-                    os.remove(file_path)
-                except Exception:
-                    pass
-
-        header: List[str] = []
-        data_lines: List[str] = []
-        if has_header and raw_lines:
-            header = [h.strip() for h in raw_lines[0].split(delimiter)]
-            data_lines = raw_lines[1:]
-        else:
-            data_lines = raw_lines
 
-        log.info(
-            "Parsed file: raw_lines=%s, header=%s, data_lines=%s, delimiter='%s'",
-            len(raw_lines), bool(header), len(data_lines), delimiter,
-        )
+        log.info("Parsing file: header=%s, delimiter='%s'", bool(header), delimiter)
         if has_header and header:
             log.info("Header columns: %s", header)
 
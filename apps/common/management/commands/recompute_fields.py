@@ -0,0 +1,39 @@
+from django.apps import apps as django_apps
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common.models.auto_compute_mixin import AutoComputeMixin, bulk_recompute
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute AUTO_COMPUTE fields for every row of a model.\n"
+        "Fields with an SQL expression are refreshed with one UPDATE each; the rest "
+        "are computed in Python and written with bulk_update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", help="Target model as 'app_label.ModelName'")
+        parser.add_argument(
+            "--fields",
+            nargs="*",
+            default=None,
+            help="Optional space-separated list of fields to recompute (defaults to all AUTO_COMPUTE fields).",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per bulk_update batch (default: 1000)")
+
+    def handle(self, *args, **options):
+        try:
+            model = django_apps.get_model(options["model"])
+        except (LookupError, ValueError) as exc:
+            raise CommandError(f"Unknown model '{options['model']}'") from exc
+        if not issubclass(model, AutoComputeMixin):
+            raise CommandError(f"{model.__name__} has no auto-computed fields")
+
+        try:
+            counts = bulk_recompute(model.objects.all(), options.get("fields"), batch_size=options["batch_size"])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        for field, count in counts.items():
+            mode = "sql" if model.get_compute_expression(field) is not None else "python"
+            self.stdout.write(f"{model.__name__}.{field}: {count} rows changed ({mode})")
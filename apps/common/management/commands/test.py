@@ -7,6 +7,4 @@ class Command(BaseCommand):
     help = 'Daily'
 
     def handle(self, *args, **kwargs):
-        PurchaseMrpMessage.objects.all().delete()
-
         call_command('create_purchase_mrp_msgs')
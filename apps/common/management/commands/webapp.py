@@ -1,22 +1,90 @@
+import logging
+import os
+import tempfile
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from apps.common.models import *
-from datetime import datetime, time, timedelta, date
-from django.core.management import call_command
+from apps.common.importers.pipeline import ImportPipeline, PipelineStep
+
+error_logger = logging.getLogger(name="app_errors")
+debug_logger = logging.getLogger(__name__)
+
+
+STEPS = [
+    PipelineStep("update_exchange_rates", "update_exchange_rates"),
+    PipelineStep("create_business_partners", "create_business_partners"),
+    PipelineStep("create_buyers", "create_buyers"),
+    PipelineStep("create_items", "create_items"),
+    PipelineStep("create_receipts", "create_receipts"),
+    PipelineStep(
+        "create_purchase_orders", "create_purchase_orders",
+        depends=("create_business_partners", "create_buyers"),
+    ),
+    PipelineStep(
+        "create_purchase_order_lines", "create_purchase_order_lines",
+        # amount_home_currency is converted at today's rates
+        depends=("create_purchase_orders", "create_items", "update_exchange_rates"),
+    ),
+    PipelineStep(
+        "create_receipts_lines", "create_receipts_lines",
+        depends=("create_receipts", "create_purchase_order_lines"),
+    ),
+    PipelineStep(
+        "create_planned_purchase_orders", "create_planned_purchase_orders",
+        depends=("create_items", "create_buyers", "create_business_partners"),
+    ),
+    PipelineStep(
+        "create_purchase_mrp_msgs", "create_purchase_mrp_msgs",
+        depends=("create_purchase_order_lines",),
+    ),
+]
+
 
 class Command(BaseCommand):
     help = 'Daily'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=getattr(settings, "WEBAPP_PIPELINE_WORKERS", 4),
+            help="Parallel worker processes for independent steps (1 runs everything in-process)",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Skip the steps that succeeded in the previous run",
+        )
+        parser.add_argument(
+            "--state-file",
+            dest="state_file",
+            # Runtime state: kept out of the source tree unless configured
+            default=getattr(
+                settings,
+                "WEBAPP_PIPELINE_STATE_FILE",
+                os.path.join(tempfile.gettempdir(), "mag360_webapp_pipeline_state.json"),
+            ),
+            help="JSON file recording step progress for --resume",
+        )
+
     def handle(self, *args, **kwargs):
-        PurchaseMrpMessage.objects.all().delete()
-        PlannedPurchaseOrder.objects.all().delete()
-
-        call_command('update_exchange_rates')
-        call_command('create_business_partners')
-        call_command('create_buyers')
-        call_command('create_items')
-        call_command('create_purchase_orders')
-        call_command('create_purchase_order_lines')
-        call_command('create_receipts')
-        call_command('create_receipts_lines')
-        call_command('create_planned_purchase_orders')
-        call_command('create_purchase_mrp_msgs')
+        def _report(report):
+            debug_logger.info(
+                "webapp step %s: %s in %.2fs rows=%s %s",
+                report.name, report.status, report.seconds, report.rows, report.error,
+            )
+
+        pipeline = ImportPipeline(
+            STEPS,
+            workers=kwargs["workers"],
+            state_path=kwargs["state_file"],
+            on_report=_report,
+        )
+        reports = pipeline.run(resume=kwargs["resume"])
+        self.stdout.write(ImportPipeline.summarize(reports))
+
+        failed = [r.name for r in reports if not r.ok]
+        if failed:
+            error_logger.error("webapp pipeline incomplete; failed or blocked steps: %s", ", ".join(failed))
+            self.stderr.write("Re-run with --resume to continue from the failed steps.")
@@ -0,0 +1,56 @@
+from django.db import migrations
+
+# (model, fields) searched by apps.common.filters; the index expression matches
+# the UPPER(col::text) LIKE UPPER(...) SQL Django emits for icontains.
+SEARCH_FIELDS = [
+    ("Item", ("code", "description")),
+    ("BusinessPartner", ("code", "name")),
+    ("ItemGroup", ("code", "description")),
+    ("ItemGroupType", ("code", "description")),
+    ("ItemType", ("code", "description")),
+    ("Program", ("code", "name")),
+    ("PurchaseOrderCategory", ("code", "description")),
+]
+
+
+def _index_name(table, column):
+    return f"{table}_{column}_trgm"[:63]
+
+
+def create_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    qn = schema_editor.quote_name
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for model_name, fields in SEARCH_FIELDS:
+        model = apps.get_model("common", model_name)
+        table = model._meta.db_table
+        for field_name in fields:
+            column = model._meta.get_field(field_name).column
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS {qn(_index_name(table, column))} "
+                f"ON {qn(table)} USING gin (UPPER({qn(column)}::text) gin_trgm_ops)"
+            )
+
+
+def drop_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    qn = schema_editor.quote_name
+    for model_name, fields in SEARCH_FIELDS:
+        model = apps.get_model("common", model_name)
+        table = model._meta.db_table
+        for field_name in fields:
+            column = model._meta.get_field(field_name).column
+            schema_editor.execute(f"DROP INDEX IF EXISTS {qn(_index_name(table, column))}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_indexes, drop_trgm_indexes),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:45
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0002_filter_search_trgm_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=40)),
+                ('row_hash', models.CharField(max_length=32)),
+                ('lookup', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('missing', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model_label', 'missing'], name='idx_fingerprint_missing')],
+                'constraints': [models.UniqueConstraint(fields=('model_label', 'key'), name='unique_import_fingerprint')],
+            },
+        ),
+    ]
@@ -45,3 +45,4 @@ from apps.common.models.item_group_types import ItemGroupType
 from apps.common.models.programs import Program
 from apps.common.models.item_groups import ItemGroup
 from apps.common.models.item_types import ItemType
+from apps.common.models.import_fingerprints import ImportFingerprint
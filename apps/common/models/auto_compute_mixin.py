@@ -1,4 +1,40 @@
+from django.core.exceptions import FieldDoesNotExist
 from django.db import models
+from django.db.models import F, Q
+
+
+def sql_expression(builder):
+    """Declare the SQL equivalent of a compute method.
+
+    ``builder(model)`` returns a query expression evaluating to the same value
+    as the method for each row; it is called when a bulk recompute runs, so
+    it may read lookup tables (e.g. classification rules)::
+
+        @sql_expression(lambda model: Coalesce("modified_date", "initial_date"))
+        def compute_final_date(self):
+            return self.modified_date or self.initial_date
+    """
+
+    def decorator(method):
+        method.sql_expression = builder
+        return method
+
+    return decorator
+
+
+def batch_compute(builder):
+    """Declare a batched version of a compute method.
+
+    ``builder(model, objs)`` returns the computed values for ``objs`` in
+    order; ``compute_many`` (used by ``bulk_recompute`` and the hybrid
+    importer) calls it once per batch instead of the method once per row.
+    """
+
+    def decorator(method):
+        method.batch_compute = builder
+        return method
+
+    return decorator
 
 
 class AutoComputeMixin(models.Model):
@@ -7,13 +43,25 @@ class AutoComputeMixin(models.Model):
     Usage:
     - Define AUTO_COMPUTE = {"field_name": "compute_method_name", ...}
     - Implement compute methods on the model (e.g., compute_field_name).
+    - Optionally declare AUTO_COMPUTE_DEPENDS = {"field_name": ("source", ...)}
+      so partial saves only recompute the fields whose sources changed.
+      Sources may be other computed fields listed earlier in AUTO_COMPUTE;
+      computed fields without an entry are always recomputed.
+    - Optionally decorate a compute method with ``@sql_expression(...)`` so
+      ``bulk_recompute`` can refresh that field with a single UPDATE, and/or
+      with ``@batch_compute(...)`` to compute it for many rows at once.
 
     Policy kwargs accepted by save():
     - recalc: "all" (default), "none", or an iterable of field names to compute
     - recalc_exclude: iterable of field names to exclude from computation
+
+    With ``update_fields`` on an existing row, recalc="all" only computes the
+    fields affected by ``update_fields``, and computed fields whose value
+    changed are added to ``update_fields``.
     """
 
     AUTO_COMPUTE = {}
+    AUTO_COMPUTE_DEPENDS = {}
 
     class Meta:
         abstract = True
@@ -25,9 +73,35 @@ class AutoComputeMixin(models.Model):
             return {value}
         return set(value)
 
+    @classmethod
+    def get_compute_expression(cls, field):
+        """Return the SQL expression for computed ``field``, or None."""
+        method = getattr(cls, (cls.AUTO_COMPUTE or {}).get(field) or "", None)
+        builder = getattr(method, "sql_expression", None)
+        return builder(cls) if builder is not None else None
+
+    @classmethod
+    def get_affected_compute_fields(cls, changed):
+        """Return the computed fields (AUTO_COMPUTE order) affected by ``changed`` fields."""
+        depends = cls.AUTO_COMPUTE_DEPENDS or {}
+        touched = set()
+        for name in changed:
+            try:
+                touched.add(cls._meta.get_field(name).name)  # accepts attnames like "currency_id"
+            except FieldDoesNotExist:
+                touched.add(name)
+        affected = []
+        for field in cls.AUTO_COMPUTE or {}:
+            sources = depends.get(field)
+            if sources is None or touched.intersection(sources):
+                affected.append(field)
+                touched.add(field)
+        return affected
+
     def _compute_fields(self, fields_to_compute):
         mapping = getattr(self, "AUTO_COMPUTE", {}) or {}
-        for field in fields_to_compute:
+        # AUTO_COMPUTE order, so later fields see the values computed before them
+        for field in [f for f in mapping if f in fields_to_compute]:
             method_name = mapping.get(field)
             if not method_name:
                 continue
@@ -36,23 +110,141 @@ class AutoComputeMixin(models.Model):
                 continue
             setattr(self, field, method())
 
+    @classmethod
+    def compute_many(cls, objs, fields):
+        """Compute ``fields`` on each of ``objs`` in AUTO_COMPUTE order, batched where declared."""
+        mapping = cls.AUTO_COMPUTE or {}
+        objs = list(objs)
+        for field in [f for f in mapping if f in set(fields)]:
+            builder = getattr(getattr(cls, mapping[field], None), "batch_compute", None)
+            if builder is None:
+                for obj in objs:
+                    obj._compute_fields([field])
+                continue
+            for obj, value in zip(objs, builder(cls, objs)):
+                setattr(obj, field, value)
+
+    def _compute_attname(self, field):
+        try:
+            return self._meta.get_field(field).attname
+        except FieldDoesNotExist:
+            return field
+
     def save(self, *args, **kwargs):
         recalc = kwargs.pop("recalc", "all")
         recalc_exclude = self._normalize_fields_iterable(kwargs.pop("recalc_exclude", set()))
+        update_fields = kwargs.get("update_fields")
 
         mapping = getattr(self, "AUTO_COMPUTE", {}) or {}
 
         if recalc == "none":
             fields_to_compute = set()
         elif recalc == "all":
-            fields_to_compute = set(mapping.keys())
+            if update_fields is not None and self.pk is not None:
+                requested = set(update_fields)
+                fields_to_compute = set(self.get_affected_compute_fields(requested)) | (requested & set(mapping))
+            else:
+                fields_to_compute = set(mapping.keys())
         else:
             fields_to_compute = self._normalize_fields_iterable(recalc)
 
         fields_to_compute -= recalc_exclude
 
         if fields_to_compute:
+            attnames = {f: self._compute_attname(f) for f in fields_to_compute}
+            before = {f: getattr(self, a, None) for f, a in attnames.items()}
             self._compute_fields(fields_to_compute)
+            if update_fields is not None:
+                written = list(update_fields)
+                for field in mapping:
+                    if field in attnames and field not in written and getattr(self, attnames[field], None) != before[field]:
+                        written.append(field)
+                kwargs["update_fields"] = written
 
         super().save(*args, **kwargs)
 
+
+def _differs(field):
+    """Q matching rows whose stored ``field`` differs from the ``_recomputed`` alias (NULL-aware)."""
+    stored_null = Q(**{f"{field}__isnull": True})
+    new_null = Q(_recomputed__isnull=True)
+    return (stored_null & ~new_null) | (~stored_null & new_null) | (
+        ~stored_null & ~new_null & ~Q(**{field: F("_recomputed")})
+    )
+
+
+def bulk_recompute(queryset, fields=None, *, batch_size=1000):
+    """Recompute ``fields`` (default: all of AUTO_COMPUTE) for every row of ``queryset``.
+
+    Fields are refreshed strictly in AUTO_COMPUTE order, so later fields see
+    earlier results: a field with a declared SQL expression with one UPDATE
+    of the rows whose value changes, a run of fields without one computed in
+    Python and the changed rows written with ``bulk_update`` in
+    ``batch_size`` chunks. Returns ``{field: rows changed}``; the data
+    version is bumped only when a row changed.
+    """
+    from apps.django_bi.utils.data_versions import bump_data_version
+
+    model = queryset.model
+    mapping = getattr(model, "AUTO_COMPUTE", {}) or {}
+    wanted = list(mapping) if fields is None else [f for f in mapping if f in set(fields)]
+    unknown = set(fields or ()) - set(mapping)
+    if unknown:
+        raise ValueError(f"Not auto-computed on {model.__name__}: {', '.join(sorted(unknown))}")
+
+    # Consecutive fields without an expression share one Python pass.
+    passes = []
+    for field in wanted:
+        expression = model.get_compute_expression(field)
+        if expression is not None:
+            passes.append((field, expression))
+        elif passes and isinstance(passes[-1], list):
+            passes[-1].append(field)
+        else:
+            passes.append([field])
+
+    counts = {}
+    for step in passes:
+        if isinstance(step, tuple):
+            field, expression = step
+            changed = queryset.alias(_recomputed=expression).filter(_differs(field))
+            counts[field] = changed.update(**{field: expression})
+            continue
+        counts.update(_recompute_in_python(queryset, step, batch_size))
+
+    if any(counts.values()):
+        # update()/bulk_update() send no post_save.
+        bump_data_version(model)
+    return counts
+
+
+def _recompute_in_python(queryset, fields, batch_size):
+    from apps.django_bi.utils.data_versions import data_version_snapshot
+
+    model = queryset.model
+    attnames = [model._meta.get_field(f).attname for f in fields]
+    counts = dict.fromkeys(fields, 0)
+
+    def _write(batch):
+        before = [[getattr(obj, a) for a in attnames] for obj in batch]
+        model.compute_many(batch, fields)
+        changed = []
+        for obj, old in zip(batch, before):
+            diff = [f for f, a, value in zip(fields, attnames, old) if getattr(obj, a) != value]
+            for f in diff:
+                counts[f] += 1
+            if diff:
+                changed.append(obj)
+        if changed:
+            model.objects.bulk_update(changed, fields)
+
+    batch = []
+    with data_version_snapshot():
+        for obj in queryset.order_by("pk").iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                _write(batch)
+                batch = []
+        if batch:
+            _write(batch)
+    return counts
@@ -0,0 +1,109 @@
+"""Day-range rule sets compiled to sorted boundaries for fast classification."""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_right
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.db import models
+from django.db.models import Case, Q, Value, When
+
+from apps.django_bi.utils.data_versions import get_data_version, model_label
+
+_lock = threading.Lock()
+_compiled: Dict[str, Tuple[int, "IntervalClassifier"]] = {}
+
+
+class IntervalClassifier:
+    """First-match integer range rules as a sorted array of segment starts.
+
+    ``rules`` yields ``(low, high, value)`` in match order, bounds inclusive
+    and None for unbounded. The number line is cut at every bound into
+    segments, each holding the value of the first rule covering it, so a
+    lookup is one bisect. With ``absolute`` the rules apply to ``abs(days)``.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[Optional[int], Optional[int], Any]], *, absolute: bool = False):
+        self.absolute = absolute
+        rules = [(low, high, value) for low, high, value in rules if low is None or high is None or low <= high]
+        cuts = sorted({low for low, _high, _value in rules if low is not None} | {high + 1 for _low, high, _value in rules if high is not None})
+
+        def winner(day: int) -> Any:
+            for low, high, value in rules:
+                if (low is None or day >= low) and (high is None or day <= high):
+                    return value
+            return None
+
+        # starts[i] begins segment i + 1; segment 0 runs from -inf to starts[0] - 1
+        self.starts: List[int] = []
+        self.values: List[Any] = [winner(cuts[0] - 1 if cuts else 0)]
+        for cut in cuts:
+            value = winner(cut)
+            if value is not self.values[-1]:
+                self.starts.append(cut)
+                self.values.append(value)
+        self._starts_array = np.array(self.starts, dtype=np.int64)
+
+    def classify(self, days: Optional[int]) -> Any:
+        if days is None:
+            return None
+        if self.absolute:
+            days = abs(days)
+        return self.values[bisect_right(self.starts, days)]
+
+    def classify_many(self, days: Sequence[Optional[int]]) -> List[Any]:
+        """:meth:`classify` for a whole sequence (None stays None)."""
+        values = np.array([np.nan if d is None else d for d in days], dtype=float)
+        missing = np.isnan(values)
+        if self.absolute:
+            values = np.abs(values)
+        positions = np.searchsorted(self._starts_array, np.where(missing, 0, values), side="right")
+        return [None if m else self.values[p] for m, p in zip(missing.tolist(), positions.tolist())]
+
+    def segments(self) -> List[Tuple[Optional[int], Optional[int], Any]]:
+        """Non-overlapping ``(low, high, value)`` ranges that have a value."""
+        bounds = [None] + self.starts
+        out = []
+        for i, value in enumerate(self.values):
+            if value is not None:
+                out.append((bounds[i], self.starts[i] - 1 if i < len(self.starts) else None, value))
+        return out
+
+    def as_case(self, field: str, key: Callable[[Any], Any] = lambda value: value.pk) -> Case:
+        """SQL rendering: ``CASE WHEN <field in segment> THEN key(value) ...`` over the segments."""
+        whens = []
+        for low, high, value in self.segments():
+            if self.absolute:
+                if high is not None and high < 0:
+                    continue
+                low = max(low or 0, 0)
+                positive = Q(**{f"{field}__gte": low})
+                negative = Q(**{f"{field}__lte": -low})
+                if high is not None:
+                    positive &= Q(**{f"{field}__lte": high})
+                    negative &= Q(**{f"{field}__gte": -high})
+                cond = positive | negative
+            else:
+                cond = Q(**{f"{field}__isnull": False})
+                if low is not None:
+                    cond &= Q(**{f"{field}__gte": low})
+                if high is not None:
+                    cond &= Q(**{f"{field}__lte": high})
+            whens.append(When(cond, then=Value(key(value))))
+        return Case(*whens, default=Value(None), output_field=models.IntegerField())
+
+
+def compiled_classifier(model, build: Callable[[], IntervalClassifier]) -> IntervalClassifier:
+    """Process-wide classifier for the rules in ``model``, rebuilt when they change."""
+    label = model_label(model)
+    version = get_data_version(model)
+    cached = _compiled.get(label)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _lock:
+        cached = _compiled.get(label)
+        if cached is None or cached[0] != version:
+            cached = _compiled[label] = (version, build())
+        return cached[1]
@@ -0,0 +1,33 @@
+"""Database expressions shared by the models' set-based computations."""
+
+from django.db import models
+
+
+class DaysBetween(models.Func):
+    """Whole days from ``start`` to ``end`` (``end - start``) for two dates.
+
+    NULL when either date is NULL, like ``(end - start).days`` on None-free
+    Python dates.
+    """
+
+    output_field = models.IntegerField()
+    arity = 2
+
+    def __init__(self, end, start, **extra):
+        super().__init__(end, start, **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        # PostgreSQL/Oracle: date - date is a number of days.
+        return super().as_sql(compiler, connection, template="(%(expressions)s)", arg_joiner=" - ", **extra_context)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler,
+            connection,
+            template="CAST(julianday(%(expressions)s) AS INTEGER)",
+            arg_joiner=") - julianday(",
+            **extra_context,
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function="DATEDIFF", **extra_context)
@@ -0,0 +1,31 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class ImportFingerprint(models.Model):
+    """Hash of the source row last imported for a natural key.
+
+    Maintained by :class:`apps.common.importers.fingerprints.FingerprintStore`;
+    ``lookup`` holds the resolved natural key (e.g. ``{"pol_id": 12}``) so
+    rows missing from a later file can be deleted.
+    """
+
+    model_label = models.CharField(max_length=100)
+    key = models.CharField(max_length=40)
+    row_hash = models.CharField(max_length=32)
+    lookup = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    missing = models.BooleanField(default=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("model_label", "key"), name="unique_import_fingerprint"),
+        ]
+        indexes = [
+            models.Index(fields=["model_label", "missing"], name="idx_fingerprint_missing"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.model_label} {self.key}"
@@ -1,13 +1,16 @@
 from django.conf import settings
 from django.db import models
-from django.db.models import Q
+from django.db.models import Case, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
 
 from apps.common.models.items import Item
 from apps.common.models.unit_of_measuries import UOM
 from apps.common.models.purchase_order_lines import PurchaseOrderLine
 from apps.common.models.production_orders import ProductionOrder
 from apps.common.models.business_partners import BusinessPartner
-from apps.common.models.auto_compute_mixin import AutoComputeMixin
+from apps.common.models.auto_compute_mixin import AutoComputeMixin, sql_expression
+from apps.common.models.classifiers import IntervalClassifier, compiled_classifier
+from apps.common.models.expressions import DaysBetween
 
 
 class MrpRescheduleDaysClassification(models.Model):
@@ -29,6 +32,17 @@ class MrpRescheduleDaysClassification(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def classifier(cls) -> IntervalClassifier:
+        """Rules by (min_days, id) compiled over absolute days; rebuilt when any rule changes."""
+        return compiled_classifier(
+            cls,
+            lambda: IntervalClassifier(
+                ((rule.min_days, rule.max_days, rule) for rule in cls.objects.order_by("min_days", "id")),
+                absolute=True,
+            ),
+        )
+
     def matches(self, days: int) -> bool:
         if days is None:
             return False
@@ -110,6 +124,14 @@ class BaseMrpMessage(AutoComputeMixin, models.Model):
     def compute_reschedule_delta_days(self):
         return None
 
+    @sql_expression(
+        lambda model: Case(
+            When(reschedule_delta_days__lt=0, then=Value("PULL_IN")),
+            When(reschedule_delta_days__isnull=False, then=Value("PUSH_OUT")),
+            default=Value(None),
+            output_field=models.CharField(),
+        )
+    )
     def compute_direction(self):
         delta = getattr(self, "reschedule_delta_days", None)
         if delta is None:
@@ -121,21 +143,20 @@ class BaseMrpMessage(AutoComputeMixin, models.Model):
             return None
         return "PULL_IN" if delta < 0 else "PUSH_OUT"
 
+    @staticmethod
+    def _classification_expression(model):
+        # First rule by (min_days, id) matching abs(reschedule_delta_days).
+        return MrpRescheduleDaysClassification.classifier().as_case("reschedule_delta_days")
+
+    @sql_expression(lambda model: model._classification_expression(model))
     def compute_classification(self):
         try:
             days = getattr(self, "reschedule_delta_days", None)
             if days is None:
                 days = self.compute_reschedule_delta_days()
-            if days is None:
-                return None
-            abs_days = abs(days)
         except Exception:
             return None
-        qs = MrpRescheduleDaysClassification.objects.all().order_by("min_days", "id")
-        for rule in qs:
-            if rule.matches(abs_days):
-                return rule
-        return None
+        return MrpRescheduleDaysClassification.classifier().classify(days)
 
 
 class PurchaseMrpMessage(BaseMrpMessage):
@@ -153,6 +174,16 @@ class PurchaseMrpMessage(BaseMrpMessage):
             msg = str(msg)[:30]
         return f"MRP Message for PO Line {self.pol_id}: {msg}".strip()
 
+    @sql_expression(
+        lambda model: DaysBetween(
+            "mrp_reschedule_date",
+            Subquery(
+                PurchaseOrderLine.objects.filter(pk=OuterRef("pol_id")).values(
+                    final=Coalesce("final_receive_date", PurchaseOrderLine.final_receive_date_expression())
+                )[:1]
+            ),
+        )
+    )
     def compute_reschedule_delta_days(self):
         pol = self.pol
         if not pol or not self.mrp_reschedule_date:
@@ -170,6 +201,11 @@ class PurchaseMrpMessage(BaseMrpMessage):
         "direction": "compute_direction",
         "classification": "compute_classification",
     }
+    AUTO_COMPUTE_DEPENDS = {
+        "reschedule_delta_days": ("mrp_reschedule_date", "pol"),
+        "direction": ("reschedule_delta_days",),
+        "classification": ("reschedule_delta_days",),
+    }
 
 
 class ProductionMrpMessage(BaseMrpMessage):
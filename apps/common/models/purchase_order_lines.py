@@ -1,8 +1,10 @@
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce
 from apps.common.models import PurchaseOrder, Item, Currency, UOM
 from apps.django_bi.workflow.models import WorkflowModelMixin
 from django_pandas.managers import DataFrameManager
-from apps.common.models.auto_compute_mixin import AutoComputeMixin
+from apps.common.models.auto_compute_mixin import AutoComputeMixin, batch_compute, sql_expression
 from apps.django_bi.utils.clock import today
 
 class PurchaseOrderLine(AutoComputeMixin, WorkflowModelMixin):
@@ -47,6 +49,12 @@ class PurchaseOrderLine(AutoComputeMixin, WorkflowModelMixin):
     def __str__(self):
         return f"{self.order}-{self.line}-{self.sequence}"
 
+    @staticmethod
+    def final_receive_date_expression():
+        """SQL twin of compute_final_receive_date."""
+        return Coalesce("modified_receive_date", "supplier_confirmed_date", "initial_receive_date")
+
+    @sql_expression(lambda model: model.final_receive_date_expression())
     def compute_final_receive_date(self):
         """Return the effective final receive date based on priority rules.
 
@@ -61,6 +69,9 @@ class PurchaseOrderLine(AutoComputeMixin, WorkflowModelMixin):
             or self.initial_receive_date
         )
 
+    @sql_expression(
+        lambda model: Coalesce("total_quantity", Value(0.0)) - Coalesce("received_quantity", Value(0.0))
+    )
     def compute_back_order(self):
         """Return back order as total_quantity - received_quantity, treating NULLs as 0.
 
@@ -70,6 +81,23 @@ class PurchaseOrderLine(AutoComputeMixin, WorkflowModelMixin):
         received = self.received_quantity if self.received_quantity is not None else 0.0
         return total - received
 
+    @staticmethod
+    def _amount_home_currency_batch(model, objs):
+        # One currency query and one vectorized FX pass for the whole batch;
+        # exact (Decimal, ROUND_HALF_UP) so values match compute_amount_home_currency
+        from apps.common.fx import convert_many
+
+        codes = dict(Currency.objects.filter(pk__in={o.currency_id for o in objs if o.currency_id}).values_list("pk", "code"))
+        values = convert_many(
+            [o.amount_original_currency for o in objs],
+            [codes.get(o.currency_id) for o in objs],
+            dates=today(),
+            strategy="on_or_before",
+            exact=True,
+        )
+        return [float(v) if v is not None else None for v in values]
+
+    @batch_compute(lambda model, objs: model._amount_home_currency_batch(model, objs))
     def compute_amount_home_currency(self):
         # Compute using amount_original_currency and currency against home currency with dated FX rates
         if self.amount_original_currency is None or not self.currency:
@@ -101,3 +129,8 @@ class PurchaseOrderLine(AutoComputeMixin, WorkflowModelMixin):
         "back_order": "compute_back_order",
         "amount_home_currency": "compute_amount_home_currency",
     }
+    AUTO_COMPUTE_DEPENDS = {
+        "final_receive_date": ("modified_receive_date", "supplier_confirmed_date", "initial_receive_date"),
+        "back_order": ("total_quantity", "received_quantity"),
+        "amount_home_currency": ("amount_original_currency", "currency"),
+    }
@@ -54,3 +54,6 @@ class PurchaseOrder(AutoComputeMixin, WorkflowModelMixin):
     AUTO_COMPUTE = {
         "category": "_compute_category",
     }
+    AUTO_COMPUTE_DEPENDS = {
+        "category": ("order",),
+    }
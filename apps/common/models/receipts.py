@@ -1,8 +1,12 @@
 from django.db import models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from apps.django_bi.workflow.models import WorkflowModelMixin
 from django_pandas.managers import DataFrameManager
-from apps.common.models.auto_compute_mixin import AutoComputeMixin
+from apps.common.models.auto_compute_mixin import AutoComputeMixin, sql_expression
+from apps.common.models.classifiers import IntervalClassifier, compiled_classifier
+from apps.common.models.expressions import DaysBetween
 from apps.common.models.purchase_order_lines import PurchaseOrderLine
 
 
@@ -49,6 +53,23 @@ class PurchaseTimelinessClassification(models.Model):
     def __str__(self):
         return f"{self.name} (prio {self.priority})"
 
+    @property
+    def day_range(self):
+        """Inclusive whole-day ``(low, high)`` bounds of this rule (None: unbounded)."""
+        low = self.min_days if self.min_days is None or self.min_inclusive else self.min_days + 1
+        high = self.max_days if self.max_days is None or self.max_inclusive else self.max_days - 1
+        return low, high
+
+    @classmethod
+    def classifier(cls) -> IntervalClassifier:
+        """Active rules compiled by priority; rebuilt when any rule changes."""
+        return compiled_classifier(
+            cls,
+            lambda: IntervalClassifier(
+                (*rule.day_range, rule) for rule in cls.objects.filter(active=True).order_by("priority", "id")
+            ),
+        )
+
     def matches(self, days_offset: int) -> bool:
         if self.min_days is not None:
             if self.min_inclusive:
@@ -139,6 +160,16 @@ class ReceiptLine(AutoComputeMixin, WorkflowModelMixin):
         except Exception:
             return None
 
+    @sql_expression(
+        lambda model: DaysBetween(
+            "receipt_date",
+            Subquery(
+                PurchaseOrderLine.objects.filter(pk=OuterRef("po_line_id")).values(
+                    final=Coalesce("final_receive_date", PurchaseOrderLine.final_receive_date_expression())
+                )[:1]
+            ),
+        )
+    )
     def compute_days_offset(self):
         if not self.receipt_date:
             return None
@@ -152,14 +183,14 @@ class ReceiptLine(AutoComputeMixin, WorkflowModelMixin):
         return delta.days
 
     def classify(self, days_offset: int):
-        if days_offset is None:
-            return None
-        qs = PurchaseTimelinessClassification.objects.filter(active=True).order_by("priority", "id")
-        for rule in qs:
-            if rule.matches(days_offset):
-                return rule
-        return None
+        return PurchaseTimelinessClassification.classifier().classify(days_offset)
 
+    @staticmethod
+    def _classification_expression(model):
+        # First matching active rule by priority, evaluated on the stored days_offset.
+        return PurchaseTimelinessClassification.classifier().as_case("days_offset")
+
+    @sql_expression(lambda model: model._classification_expression(model))
     def compute_classification(self):
         days = self.days_offset
         if days is None:
@@ -171,3 +202,7 @@ class ReceiptLine(AutoComputeMixin, WorkflowModelMixin):
         "days_offset": "compute_days_offset",
         "classification": "compute_classification",
     }
+    AUTO_COMPUTE_DEPENDS = {
+        "days_offset": ("receipt_date", "po_line"),
+        "classification": ("days_offset",),
+    }
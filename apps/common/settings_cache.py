@@ -0,0 +1,81 @@
+"""Process-wide cache of the single-row settings models.
+
+``GlobalSettings`` and ``PurchaseSettings`` hold one row each and are read
+on hot paths (PO line saves, dial renders). :func:`get_settings` loads the
+row once per process and keeps it until the model's data version changes;
+saves and deletes in this process also drop it right away through signals.
+The returned instances are shared: read them, don't modify them.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Optional, Tuple, Type, TypeVar
+
+from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.common.models import GlobalSettings, PurchaseSettings
+from apps.django_bi.utils.data_versions import get_data_version, model_label, track_data_versions
+
+__all__ = [
+    "clear_settings_cache",
+    "get_global_settings",
+    "get_home_currency_code",
+    "get_otd_target_percent",
+    "get_purchase_settings",
+    "get_settings",
+]
+
+M = TypeVar("M", bound=models.Model)
+
+_lock = threading.Lock()
+_cache: Dict[str, Tuple[int, Optional[models.Model]]] = {}
+
+track_data_versions(GlobalSettings, PurchaseSettings)
+
+
+def get_settings(model: Type[M]) -> Optional[M]:
+    """The first row (by id) of ``model``, or None if there is none."""
+    label = model_label(model)
+    version = get_data_version(model)
+    cached = _cache.get(label)
+    if cached is None or cached[0] != version:
+        with _lock:
+            cached = _cache[label] = (version, model.objects.order_by("id").first())
+    return cached[1]
+
+
+def clear_settings_cache(model=None) -> None:
+    """Drop the cached row of ``model`` (or of every settings model)."""
+    with _lock:
+        if model is None:
+            _cache.clear()
+        else:
+            _cache.pop(model_label(model), None)
+
+
+@receiver(post_save, sender=GlobalSettings, dispatch_uid="apps.common.settings_cache.global_saved")
+@receiver(post_delete, sender=GlobalSettings, dispatch_uid="apps.common.settings_cache.global_deleted")
+@receiver(post_save, sender=PurchaseSettings, dispatch_uid="apps.common.settings_cache.purchase_saved")
+@receiver(post_delete, sender=PurchaseSettings, dispatch_uid="apps.common.settings_cache.purchase_deleted")
+def _drop_on_write(sender, **kwargs):
+    clear_settings_cache(sender)
+
+
+def get_global_settings() -> Optional[GlobalSettings]:
+    return get_settings(GlobalSettings)
+
+
+def get_purchase_settings() -> Optional[PurchaseSettings]:
+    return get_settings(PurchaseSettings)
+
+
+def get_home_currency_code(default: str = "CAD") -> str:
+    code = getattr(get_global_settings(), "home_currency_code", None)
+    return (code or default).strip().upper()
+
+
+def get_otd_target_percent(default: float = 95) -> float:
+    return float(getattr(get_purchase_settings(), "otd_target_percent", None) or default)
@@ -0,0 +1,927 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db.models import F, IntegerField, Value
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from openpyxl import Workbook
+
+from apps.common import fx, settings_cache
+from apps.common.functions import files as files_utils
+from apps.common.filters.items import item_choices
+from apps.common.filters.search import NgramSearchBackend, search_queryset
+from apps.common.importers.excel import import_rows_from_excel
+from apps.common.importers.fingerprints import FingerprintStore
+from apps.common.importers.pipeline import ImportPipeline, PipelineStep
+from apps.common.importers.relations import RelationResolver
+from apps.common.importers.text import import_rows_from_text
+from apps.common.models import (
+    BusinessPartner,
+    Currency,
+    ExchangeRate,
+    GlobalSettings,
+    ImportFingerprint,
+    Item,
+    MrpRescheduleDaysClassification,
+    PlannedPurchaseOrder,
+    PurchaseMrpMessage,
+    PurchaseOrder,
+    PurchaseOrderLine,
+    PurchaseSettings,
+    PurchaseTimelinessClassification,
+    Receipt,
+    ReceiptLine,
+)
+from apps.common.models.auto_compute_mixin import bulk_recompute
+from apps.django_bi.utils.data_versions import data_version_snapshot, get_data_version, model_label
+from apps.django_bi.utils.models import DataVersion
+from apps.django_bi.workflow.models import State, Workflow
+
+
+class FilterSearchTests(TestCase):
+    def setUp(self):
+        Item.objects.create(code="BOLT-10", description="Hex bolt")
+        Item.objects.create(code="NUT-10", description="Bolt nut")
+        Item.objects.create(code="BOLT", description="Generic")
+        Item.objects.create(code="WASHER", description="Flat washer")
+
+    def test_ngram_backend_ranks_code_matches_first(self):
+        values = [code for code, _ in item_choices(None, query="bolt")]
+        self.assertEqual(values, ["BOLT", "BOLT-10", "NUT-10"])
+
+    @override_settings(FILTER_SEARCH_BACKEND="icontains")
+    def test_icontains_backend_matches_ngram_results(self):
+        values = [code for code, _ in item_choices(None, query="bolt")]
+        self.assertEqual(values, ["BOLT", "BOLT-10", "NUT-10"])
+
+    def test_ngram_index_refreshes_after_writes(self):
+        self.assertFalse(search_queryset(Item.objects.all(), "gasket", ("code", "description")).exists())
+        Item.objects.create(code="GSK", description="Gasket")
+        qs = search_queryset(Item.objects.all(), "gasket", ("code", "description"))
+        self.assertEqual(list(qs.values_list("code", flat=True)), ["GSK"])
+
+    def test_ngram_index_refreshes_after_other_process_writes(self):
+        search_queryset(Item.objects.all(), "gasket", ("code", "description")).exists()
+        # An import in another process: no signals here, only its bump of the shared counter
+        Item.objects.bulk_create([Item(code="GSK", description="Gasket")])
+        DataVersion.objects.filter(label=model_label(Item)).update(version=F("version") + 1)
+        qs = search_queryset(Item.objects.all(), "gasket", ("code", "description"))
+        self.assertEqual(list(qs.values_list("code", flat=True)), ["GSK"])
+
+    def test_ngram_candidates_do_not_span_fields(self):
+        index = NgramSearchBackend()._get_index(Item.objects.all(), ("code", "description"))
+        self.assertEqual(index.candidates("HERFLAT"), set())
+
+
+class RelationResolverTests(TestCase):
+    def setUp(self):
+        BusinessPartner.objects.create(code="SUP1", name="One")
+        BusinessPartner.objects.create(code="SUP2", name="Two")
+
+    def test_batch_is_fetched_with_one_query(self):
+        resolver = RelationResolver()
+        with self.assertNumQueries(1):
+            resolver.prefetch(BusinessPartner, [{"code": "SUP1"}, {"code": "SUP2"}, {"code": "SUP1"}])
+        with self.assertNumQueries(0):
+            self.assertEqual(resolver.resolve(BusinessPartner, {"code": "SUP2"}).name, "Two")
+
+    def test_missing_rows_are_bulk_created_with_overrides(self):
+        resolver = RelationResolver()
+        resolver.prefetch(BusinessPartner, [{"code": "SUP3"}, {"code": "SUP4"}], {"status": "active"})
+        self.assertEqual(
+            sorted(BusinessPartner.objects.filter(status="active").values_list("code", flat=True)),
+            ["SUP3", "SUP4"],
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(resolver.resolve(BusinessPartner, {"code": "SUP3"}).code, "SUP3")
+
+    def test_importer_resolves_relations_per_batch(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as fh:
+            fh.write("PO1|SUP1\nPO2|SUP9\nPO3|SUP9\nPO4|\n")
+        self.addCleanup(os.remove, fh.name)
+
+        result = import_rows_from_text(
+            model="common.PurchaseOrder",
+            file_path=fh.name,
+            mapping={"0": "order", "1": "supplier__code"},
+            unique_fields=("order",),
+        )
+
+        self.assertEqual((result.created, result.errors), (4, 0))
+        suppliers = dict(PurchaseOrder.objects.values_list("order", "supplier__code"))
+        self.assertEqual(suppliers, {"PO1": "SUP1", "PO2": "SUP9", "PO3": "SUP9", "PO4": None})
+        self.assertEqual(BusinessPartner.objects.filter(code="SUP9").count(), 1)
+
+
+class CopyImportTests(TestCase):
+    def _write(self, content):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as fh:
+            fh.write(content)
+        self.addCleanup(os.remove, fh.name)
+        return fh.name
+
+    def test_copy_method_merges_on_unique_fields(self):
+        sup1 = BusinessPartner.objects.create(code="SUP1")
+        PurchaseOrder.objects.create(order="PO1", supplier=sup1)
+        path = self._write("PO1|SUP2\nPO2|SUP1\nPO3|\n")
+
+        result = import_rows_from_text(
+            model="common.PurchaseOrder",
+            file_path=path,
+            mapping={"0": "order", "1": "supplier__code"},
+            method="copy",
+            unique_fields=("order",),
+        )
+
+        self.assertEqual((result.total, result.created, result.updated, result.errors), (3, 2, 1, 0))
+        suppliers = dict(PurchaseOrder.objects.values_list("order", "supplier__code"))
+        self.assertEqual(suppliers, {"PO1": "SUP2", "PO2": "SUP1", "PO3": None})
+        self.assertFalse(PurchaseOrder.objects.filter(created_at__isnull=True).exists())
+
+    def test_copy_conflict_update_refreshes_auto_now(self):
+        partner = BusinessPartner.objects.create(code="SUP1", name="Old")
+        stale = partner.updated_at - timedelta(days=1)
+        BusinessPartner.objects.filter(pk=partner.pk).update(updated_at=stale)
+
+        result = import_rows_from_text(
+            model="common.BusinessPartner",
+            file_path=self._write("SUP1|New\n"),
+            mapping={"0": "code", "1": "name"},
+            method="copy",
+            unique_fields=("code",),
+        )
+
+        self.assertEqual((result.created, result.updated), (0, 1))
+        partner.refresh_from_db()
+        self.assertEqual(partner.name, "New")
+        self.assertGreater(partner.updated_at, stale)
+
+    def test_bulk_methods_assign_workflow_start_states(self):
+        workflow = Workflow.objects.create(name="PO", content_type=ContentType.objects.get_for_model(PurchaseOrder))
+        start = State.objects.create(workflow=workflow, name="Draft", is_start=True)
+        path = self._write("PO1\nPO2\n")
+        for method in ("bulk_create", "copy", "hybrid"):
+            PurchaseOrder.objects.all().delete()
+            result = import_rows_from_text(
+                model="common.PurchaseOrder",
+                file_path=path,
+                mapping={"0": "order"},
+                method=method,
+                unique_fields=("order",),
+                override_fields={"workflow": workflow},
+            )
+            self.assertEqual((result.created, result.errors), (2, 0), method)
+            self.assertEqual(set(PurchaseOrder.objects.values_list("workflow_state", flat=True)), {start.pk}, method)
+
+        workflow.status = Workflow.INACTIVE
+        workflow.save()
+        with self.assertLogs("apps.common.importers.text", "WARNING"):
+            result = import_rows_from_text(
+                model="common.PurchaseOrder",
+                file_path=self._write("PO3\n"),
+                mapping={"0": "order"},
+                override_fields={"workflow": workflow},
+            )
+        self.assertEqual((result.created, result.errors), (0, 1))
+
+
+def _failing_prepare():
+    raise RuntimeError("boom")
+
+
+class ImportPipelineTests(TestCase):
+    def test_cycles_are_rejected(self):
+        with self.assertRaises(ValueError):
+            ImportPipeline([
+                PipelineStep("a", "a", depends=("b",)),
+                PipelineStep("b", "b", depends=("a",)),
+            ])
+
+    @mock.patch("django.core.management.call_command")
+    def test_failure_blocks_dependents_and_resume_skips_finished_steps(self, call_command):
+        state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, state_dir)
+        state_path = os.path.join(state_dir, "state.json")
+        steps = [
+            PipelineStep("a", "a"),
+            PipelineStep("b", "b", prepare=_failing_prepare),
+            PipelineStep("c", "c", depends=("a", "b")),
+        ]
+
+        reports = ImportPipeline(steps, state_path=state_path).run()
+        self.assertEqual({r.name: r.status for r in reports}, {"a": "ok", "b": "failed", "c": "blocked"})
+        self.assertEqual([c.args[0] for c in call_command.call_args_list], ["a"])
+
+        call_command.reset_mock()
+        steps[1] = PipelineStep("b", "b")
+        reports = ImportPipeline(steps, state_path=state_path).run(resume=True)
+        self.assertEqual({r.name: r.status for r in reports}, {"a": "resumed", "b": "ok", "c": "ok"})
+        self.assertEqual([c.args[0] for c in call_command.call_args_list], ["b", "c"])
+
+    @mock.patch("django.core.management.call_command")
+    def test_step_reports_import_row_counts(self, call_command):
+        def _import(*args, **kwargs):
+            path = os.path.join(tempfile.mkdtemp(), "bp.txt")
+            with open(path, "w") as fh:
+                fh.write("SUP1|One\nSUP2|Two\n")
+            import_rows_from_text(model="common.BusinessPartner", file_path=path, mapping={"0": "code", "1": "name"})
+            shutil.rmtree(os.path.dirname(path))
+
+        call_command.side_effect = _import
+        (report,) = ImportPipeline([PipelineStep("bp", "bp")]).run()
+        self.assertEqual((report.rows["total"], report.rows["created"]), (2, 2))
+
+
+class TextStagingTests(TestCase):
+    def _write_dated(self, prefix, days_ago, data):
+        path = prefix + (date.today() - timedelta(days=days_ago)).strftime("%m-%d-%y") + ".txt"
+        with open(path, "wb") as fh:
+            fh.write(data)
+        return path
+
+    def test_streams_cleaned_lines_of_latest_file(self):
+        prefix = os.path.join(tempfile.mkdtemp(), "BP-")
+        self.addCleanup(shutil.rmtree, os.path.dirname(prefix))
+        path = self._write_dated(prefix, 2, "BP|Name\n----\n\n SUP1 | Caf\u00e9 \nSUP2|Old\nSUP3|\n".encode("cp1252"))
+        self.assertEqual(files_utils.detect_encoding(path), "cp1252")
+
+        lines = files_utils.stage_text_contents(prefix, ["BP", "-"], predicates=[lambda parts: parts[1] != "Old"])
+        self.assertEqual(list(lines), ["SUP1 | Caf\u00e9", "SUP3|"])
+
+        self._write_dated(prefix, 0, b"\xef\xbb\xbfSUP4|Caf\xc3\xa9\n")
+        result = import_rows_from_text(
+            model="common.BusinessPartner",
+            lines=files_utils.stage_text_contents(prefix, []),
+            mapping={"0": "code", "1": "name"},
+        )
+        self.assertEqual(result.created, 1)
+        self.assertEqual(BusinessPartner.objects.get().name, "Caf\u00e9")
+        self.assertFalse(any(name.startswith("copy of") for name in os.listdir(".")))
+
+    def test_lines_feed_the_pandas_parser(self):
+        result = import_rows_from_text(
+            model="common.BusinessPartner",
+            lines=iter(["Code|Name", "SUP1|One", "SUP2|Two"]),
+            has_header=True,
+            mapping={"Code": "code", "Name": "name"},
+            parser="pandas",
+            chunk_size=1,
+        )
+        self.assertEqual(result.created, 2)
+        self.assertEqual(dict(BusinessPartner.objects.values_list("code", "name")), {"SUP1": "One", "SUP2": "Two"})
+
+
+class PandasParserTests(TestCase):
+    CONTENT = (
+        "Order|Qty|Start|Required|Supplier\n"
+        "P1 | 5 | 2024-01-31 00:00:00 | 02/15/2024 | SUP1\n"
+        "P2|NULL|31-01-2024||x|extra|cols\n"
+        "P3|1|##skip|2024-01-01|\n"
+        "P4|2|not a date|2024/03/01|SUP1\n"
+    )
+    MAPPING = {
+        "Order": "order",
+        "Qty": "quantity",
+        "Start": "planned_start_date",
+        "Required": "required_date",
+        "Supplier": "supplier__code",
+    }
+
+    def _import(self, parser):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as fh:
+            fh.write(self.CONTENT)
+        self.addCleanup(os.remove, fh.name)
+        result = import_rows_from_text(
+            model="common.PlannedPurchaseOrder",
+            file_path=fh.name,
+            has_header=True,
+            mapping=self.MAPPING,
+            value_map={"Supplier": {"x": "SUP2"}},
+            unique_fields=("order",),
+            method="save_per_instance",
+            parser=parser,
+            chunk_size=2,
+        )
+        rows = list(
+            PlannedPurchaseOrder.objects.order_by("order").values_list(
+                "order", "quantity", "planned_start_date", "required_date", "supplier__code"
+            )
+        )
+        PlannedPurchaseOrder.objects.all().delete()
+        return result, rows
+
+    def test_pandas_parser_matches_line_parser(self):
+        python_result, python_rows = self._import("python")
+        pandas_result, pandas_rows = self._import("pandas")
+        self.assertEqual(pandas_rows, python_rows)
+        self.assertEqual(pandas_result, python_result)
+        self.assertEqual(
+            [row[0] for row in pandas_rows[:2]] + [pandas_rows[0][2], pandas_rows[1][2]],
+            ["P1", "P2", date(2024, 1, 31), date(2024, 1, 31)],
+        )
+        self.assertEqual((pandas_result.total, pandas_result.errors), (4, 2))
+
+
+class ExcelImportTests(TestCase):
+    def _workbook(self, rows):
+        wb = Workbook()
+        ws = wb.active
+        for row in rows:
+            ws.append(row)
+        path = os.path.join(tempfile.mkdtemp(), "import.xlsx")
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        wb.save(path)
+        return path
+
+    def test_command_upserts_in_batches(self):
+        sup1 = BusinessPartner.objects.create(code="SUP1")
+        PurchaseOrder.objects.create(order="PO1", supplier=sup1)
+        path = self._workbook([
+            ["Order", "Supplier", "Ignored"],
+            ["PO1", None, "x"],
+            [1002, "sup9", None],
+            [None, None, None],
+            ["PO3", "SUP1", None],
+        ])
+
+        call_command(
+            "import_excel",
+            excel=path,
+            model="common.PurchaseOrder",
+            mapping=json.dumps({"Order": "order", "Supplier": "supplier__code"}),
+            value_map=json.dumps({"Supplier": {"SUP9": "SUP2"}}),
+            chunk_size=2,
+            log_file=os.path.join(os.path.dirname(path), "import.log"),
+        )
+
+        suppliers = dict(PurchaseOrder.objects.values_list("order", "supplier__code"))
+        # Empty cells leave existing values alone.
+        self.assertEqual(suppliers, {"PO1": "SUP1", "1002": "SUP2", "PO3": "SUP1"})
+
+    def test_matches_on_the_mapped_unique_constraint(self):
+        # The model's first unique constraint is "id"; the sheet carries "name"
+        PurchaseTimelinessClassification.objects.create(name="Late", priority=1, min_days=1)
+        path = self._workbook([["Name", "Priority"], ["Late", 5], ["Early", 2]])
+        result = import_rows_from_excel(
+            model="common.PurchaseTimelinessClassification", file_path=path, mapping={"Name": "name", "Priority": "priority"}
+        )
+        self.assertEqual(result.errors, 0)
+        self.assertEqual(
+            dict(PurchaseTimelinessClassification.objects.values_list("name", "priority")), {"Late": 5, "Early": 2}
+        )
+
+    def test_dry_run_writes_nothing(self):
+        path = self._workbook([["Order"], ["PO1"], ["PO2"]])
+        result = import_rows_from_excel(
+            model="common.PurchaseOrder", file_path=path, mapping={"Order": "order"}, dry_run=True
+        )
+        self.assertEqual((result.total, result.created), (2, 0))
+        self.assertFalse(PurchaseOrder.objects.exists())
+
+
+class BulkRecomputeTests(TestCase):
+    def setUp(self):
+        PurchaseTimelinessClassification.objects.create(name="Early", priority=1, max_days=0, max_inclusive=False)
+        PurchaseTimelinessClassification.objects.create(name="On time", priority=2, min_days=0, max_days=3)
+        PurchaseTimelinessClassification.objects.create(name="Late", priority=3, min_days=3, min_inclusive=False)
+        MrpRescheduleDaysClassification.objects.create(name="Small", min_days=0, max_days=5)
+        MrpRescheduleDaysClassification.objects.create(name="Large", min_days=6)
+
+        order = PurchaseOrder.objects.create(order="PO1")
+        dates = [
+            (date(2024, 1, 10), None, None, 5.0, 2.0),
+            (date(2024, 1, 10), date(2024, 1, 12), None, None, 1.0),
+            (date(2024, 1, 10), date(2024, 1, 12), date(2024, 1, 20), 4.0, None),
+            (None, None, None, 1.0, 1.0),
+        ]
+        receipt = Receipt.objects.create(number="R1")
+        for line, (initial, confirmed, modified, total, received) in enumerate(dates, start=1):
+            pol = PurchaseOrderLine.objects.create(
+                order=order,
+                line=line,
+                sequence=1,
+                initial_receive_date=initial,
+                supplier_confirmed_date=confirmed,
+                modified_receive_date=modified,
+                total_quantity=total,
+                received_quantity=received,
+            )
+            for offset, receipt_date in enumerate((date(2024, 1, 8), date(2024, 1, 14), None)):
+                ReceiptLine.objects.create(receipt=receipt, line=line * 10 + offset, po_line=pol, receipt_date=receipt_date)
+            PurchaseMrpMessage.objects.create(pol=pol, mrp_reschedule_date=date(2024, 1, 1 + 4 * line))
+
+    def _snapshot(self, model, fields):
+        return list(model.objects.order_by("pk").values_list(*fields))
+
+    def _check_matches_python(self, model, fields):
+        expected = self._snapshot(model, fields)
+        model.objects.update(**{f: None for f in fields})
+        counts = bulk_recompute(model.objects.all(), fields)
+        self.assertEqual(self._snapshot(model, fields), expected)
+        self.assertEqual(set(counts), set(fields))
+        for field in fields:
+            self.assertIsNotNone(model.get_compute_expression(field), field)
+
+    def test_sql_recompute_matches_python_compute(self):
+        self._check_matches_python(PurchaseOrderLine, ["final_receive_date", "back_order"])
+        self._check_matches_python(ReceiptLine, ["days_offset", "classification"])
+        self._check_matches_python(PurchaseMrpMessage, ["reschedule_delta_days", "direction", "classification"])
+        self.assertTrue(ReceiptLine.objects.filter(classification__name="Late").exists())
+        self.assertTrue(PurchaseMrpMessage.objects.filter(direction="PULL_IN").exists())
+
+    def test_python_fallback_and_unknown_fields(self):
+        self.assertIsNone(PurchaseOrderLine.get_compute_expression("amount_home_currency"))
+        PurchaseOrderLine.objects.update(amount_home_currency=-1)
+        counts = bulk_recompute(PurchaseOrderLine.objects.all(), ["amount_home_currency"], batch_size=3)
+        self.assertEqual(counts, {"amount_home_currency": PurchaseOrderLine.objects.count()})
+        with self.assertRaises(ValueError):
+            bulk_recompute(ReceiptLine.objects.all(), ["receipt_date"])
+
+    def test_only_changed_rows_written_and_bumped(self):
+        version = get_data_version(PurchaseOrderLine)
+        counts = bulk_recompute(PurchaseOrderLine.objects.all())
+        self.assertEqual(counts, {"final_receive_date": 0, "back_order": 0, "amount_home_currency": 0})
+        self.assertEqual(get_data_version(PurchaseOrderLine), version)
+
+        PurchaseOrderLine.objects.filter(line=1).update(back_order=99)
+        self.assertEqual(bulk_recompute(PurchaseOrderLine.objects.all())["back_order"], 1)
+        self.assertGreater(get_data_version(PurchaseOrderLine), version)
+
+    def test_fields_refreshed_in_declared_order(self):
+        order = {
+            "back_order": "compute_back_order",
+            "amount_home_currency": "compute_amount_home_currency",
+            "final_receive_date": "compute_final_receive_date",
+        }
+        PurchaseOrderLine.objects.update(back_order=-1, amount_home_currency=-1, final_receive_date=None)
+        with mock.patch.object(PurchaseOrderLine, "AUTO_COMPUTE", order), CaptureQueriesContext(connection) as ctx:
+            bulk_recompute(PurchaseOrderLine.objects.all())
+        written = [
+            field
+            for query in ctx.captured_queries
+            if query["sql"].startswith("UPDATE")
+            for field in order
+            if f'SET "{field}"' in query["sql"]
+        ]
+        self.assertEqual(written, list(order))
+
+
+class AutoComputeDependsTests(TestCase):
+    def setUp(self):
+        self.rule = PurchaseTimelinessClassification.objects.create(name="Late", priority=1, min_days=1)
+        self.pol = PurchaseOrderLine.objects.create(
+            order=PurchaseOrder.objects.create(order="PO1"),
+            line=1,
+            sequence=1,
+            initial_receive_date=date(2024, 1, 10),
+            total_quantity=5.0,
+        )
+        self.receipt_line = ReceiptLine.objects.create(
+            receipt=Receipt.objects.create(number="R1"), line=1, po_line=self.pol, receipt_date=date(2024, 1, 10)
+        )
+
+    def test_affected_fields_follow_declared_dependencies(self):
+        self.assertEqual(PurchaseOrderLine.get_affected_compute_fields({"comments"}), [])
+        self.assertEqual(PurchaseOrderLine.get_affected_compute_fields({"currency_id"}), ["amount_home_currency"])
+        self.assertEqual(ReceiptLine.get_affected_compute_fields({"receipt_date"}), ["days_offset", "classification"])
+
+    def test_partial_save_recomputes_and_writes_only_affected_fields(self):
+        self.pol.comments = "call supplier"
+        with mock.patch.object(PurchaseOrderLine, "compute_amount_home_currency") as fx:
+            with self.assertNumQueries(1):
+                self.pol.save(update_fields=["comments"])
+        fx.assert_not_called()
+
+        self.pol.received_quantity = 2.0
+        self.pol.save(update_fields=["received_quantity"])
+        self.assertEqual(PurchaseOrderLine.objects.get(pk=self.pol.pk).back_order, 3.0)
+
+        self.receipt_line.receipt_date = date(2024, 1, 15)
+        self.receipt_line.save(update_fields=["receipt_date"])
+        self.assertEqual(
+            ReceiptLine.objects.filter(pk=self.receipt_line.pk).values_list("days_offset", "classification").get(),
+            (5, self.rule.pk),
+        )
+
+
+class FingerprintImportTests(TestCase):
+    MAPPING = {"0": "order", "1": "quantity"}
+
+    def _import(self, content, **options):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as fh:
+            fh.write(content)
+        self.addCleanup(os.remove, fh.name)
+        return import_rows_from_text(
+            model="common.PlannedPurchaseOrder",
+            file_path=fh.name,
+            mapping=self.MAPPING,
+            unique_fields=("order",),
+            fingerprints=True,
+            **options,
+        )
+
+    def test_unchanged_rows_skipped_and_missing_keys_deleted(self):
+        first = self._import("P1|1\nP2|2\nP3|3\n", method="save_per_instance")
+        self.assertEqual((first.created, first.skipped), (3, 0))
+        self.assertEqual(ImportFingerprint.objects.count(), 3)
+
+        again = self._import("P1|1\nP2|2\nP3|3\n", method="save_per_instance")
+        self.assertEqual((again.created, again.updated, again.skipped), (0, 0, 3))
+
+        changed = self._import("P1|1\nP2|20\n", method="save_per_instance", on_missing="delete")
+        self.assertEqual((changed.updated, changed.skipped), (1, 1))
+        self.assertEqual(
+            list(PlannedPurchaseOrder.objects.order_by("order").values_list("order", "quantity")),
+            [("P1", 1.0), ("P2", 20.0)],
+        )
+        self.assertEqual(ImportFingerprint.objects.count(), 2)
+
+    def test_missing_keys_flagged_then_unflagged(self):
+        self._import("P1|1\nP2|2\n", method="bulk_create")
+        self._import("P1|1\n", method="bulk_create", on_missing="flag")
+        self.assertEqual(PlannedPurchaseOrder.objects.count(), 2)
+        self.assertEqual(
+            list(ImportFingerprint.objects.filter(missing=True).values_list("lookup", flat=True)), [{"order": "P2"}]
+        )
+
+        result = self._import("P1|1\nP2|2\n##bad|0\n", method="bulk_create", on_missing="delete")
+        self.assertEqual((result.skipped, result.errors), (2, 1))
+        self.assertFalse(ImportFingerprint.objects.filter(missing=True).exists())
+
+        FingerprintStore(PlannedPurchaseOrder).reset()
+        self.assertEqual(self._import("P1|1\n", method="bulk_create").created, 1)
+
+
+class SyncImportTests(TestCase):
+    def _sync(self, content):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as fh:
+            fh.write(content)
+        self.addCleanup(os.remove, fh.name)
+        return import_rows_from_text(
+            model="common.PlannedPurchaseOrder",
+            file_path=fh.name,
+            mapping={"0": "order", "1": "quantity", "2": "required_date"},
+            unique_fields=("order",),
+            method="sync",
+        )
+
+    def _rows(self):
+        return list(PlannedPurchaseOrder.objects.order_by("order").values_list("order", "quantity", "required_date"))
+
+    def test_sync_applies_only_the_difference(self):
+        first = self._sync("P1|1|2024-01-01\nP2|2|\nP3|3|2024-01-03\n")
+        self.assertEqual((first.created, first.updated, first.deleted), (3, 0, 0))
+        p1 = PlannedPurchaseOrder.objects.get(order="P1").pk
+
+        version = get_data_version(PlannedPurchaseOrder)
+        same = self._sync("P3|3|2024-01-03\nP1|1.0|01/01/2024\nP2|2|\n")
+        self.assertEqual((same.created, same.updated, same.skipped, same.deleted), (0, 0, 3, 0))
+        self.assertEqual(get_data_version(PlannedPurchaseOrder), version)
+
+        changed = self._sync("P1|1|2024-01-01\nP2|5|\nP4|4|\n")
+        self.assertEqual((changed.created, changed.updated, changed.skipped, changed.deleted), (1, 1, 1, 1))
+        self.assertEqual(
+            self._rows(),
+            [("P1", 1.0, date(2024, 1, 1)), ("P2", 5.0, None), ("P4", 4.0, None)],
+        )
+        self.assertEqual(PlannedPurchaseOrder.objects.get(order="P1").pk, p1)
+        self.assertNotEqual(get_data_version(PlannedPurchaseOrder), version)
+
+    def test_rejected_rows_keep_missing_keys(self):
+        self._sync("P1|1|\nP2|2|\n")
+        result = self._sync("P1|1|\n##P2|2|\n")
+        self.assertEqual((result.errors, result.deleted), (1, 0))
+        self.assertEqual([row[0] for row in self._rows()], ["P1", "P2"])
+
+
+class MrpMessageCommandTests(TestCase):
+    def setUp(self):
+        self.pol = PurchaseOrderLine.objects.create(
+            order=PurchaseOrder.objects.create(order="PO1"), line=1, sequence=1, initial_receive_date=date(2024, 1, 10)
+        )
+        self.lines = ["|".join(["PO1", "1", "1"] + [""] * 14 + ["Reschedule in", "2024-01-05"])]
+
+    def _run(self):
+        # The command module reads STATUS from the environment when imported
+        with mock.patch.dict(os.environ, {"STATUS": "TEST"}), mock.patch(
+            "apps.common.management.commands.create_purchase_mrp_msgs.files_utils.stage_text_contents",
+            side_effect=lambda *args, **kwargs: iter(self.lines),
+        ):
+            call_command("create_purchase_mrp_msgs")
+
+    def test_unchanged_rerun_keeps_data_version(self):
+        self._run()
+        self.assertEqual(PurchaseMrpMessage.objects.get().reschedule_delta_days, -5)
+        version = get_data_version(PurchaseMrpMessage)
+        self._run()
+        self.assertEqual(get_data_version(PurchaseMrpMessage), version)
+
+        # The PO line import moved the date without touching the message
+        PurchaseOrderLine.objects.filter(pk=self.pol.pk).update(final_receive_date=date(2024, 1, 8))
+        self._run()
+        self.assertEqual(PurchaseMrpMessage.objects.get().reschedule_delta_days, -3)
+        self.assertGreater(get_data_version(PurchaseMrpMessage), version)
+
+
+class HybridImportTests(TestCase):
+    MAPPING = {
+        "0": "receipt__number",
+        "1": "line",
+        "2": "po_line__order__order",
+        "3": "po_line__line",
+        "4": "po_line__sequence",
+        "5": "receipt_date",
+    }
+    CONTENT = (
+        "R1|1|PO1|1|1|2024-01-15\n"
+        "R1|2|PO1|1|1|2024-01-05\n"
+        "R1|-1|PO1|1|1|2024-01-05\n"
+        "R1|3|PO1|1|1|\n"
+        "R1|4|PO1|1|1|2024-01-10\n"
+    )
+
+    def setUp(self):
+        PurchaseTimelinessClassification.objects.create(name="Late", priority=1, min_days=1)
+        PurchaseTimelinessClassification.objects.create(name="Not late", priority=2, max_days=0)
+        PurchaseOrderLine.objects.create(
+            order=PurchaseOrder.objects.create(order="PO1"), line=1, sequence=1, initial_receive_date=date(2024, 1, 10)
+        )
+
+    def _import(self, method, content=CONTENT):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as fh:
+            fh.write(content)
+        self.addCleanup(os.remove, fh.name)
+        return import_rows_from_text(
+            model="common.ReceiptLine",
+            file_path=fh.name,
+            mapping=self.MAPPING,
+            method=method,
+            unique_fields=("receipt", "line"),
+            chunk_size=10,
+        )
+
+    def _rows(self):
+        return list(
+            ReceiptLine.objects.order_by("line").values_list("line", "receipt_date", "days_offset", "classification__name")
+        )
+
+    def test_hybrid_matches_save_per_instance(self):
+        expected_result = self._import("save_per_instance")
+        expected_rows = self._rows()
+        ReceiptLine.objects.all().delete()
+
+        with self.assertLogs("apps.common.importers.text", "WARNING") as logs:
+            result = self._import("hybrid")
+        self.assertEqual(result, expected_result)
+        self.assertEqual((result.created, result.errors), (4, 1))
+        self.assertEqual(self._rows(), expected_rows)
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("line 3", logs.output[0])
+        self.assertEqual(
+            [row[2:] for row in self._rows()],
+            [(5, "Late"), (-5, "Not late"), (None, None), (0, "Not late")],
+        )
+
+    def test_unchanged_reimport_does_not_load_relations(self):
+        def reimport_queries(lines):
+            content = "".join(f"R1|{n}|PO1|1|1|2024-01-10\n" for n in range(1, lines + 1))
+            self._import("hybrid", content)
+            with CaptureQueriesContext(connection) as ctx:
+                result = self._import("hybrid", content)
+            self.assertEqual(result.skipped, lines)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(reimport_queries(3), reimport_queries(8))
+
+    def test_copy_computes_like_save_per_instance(self):
+        # A staged batch is merged as a whole: leave out the row the database rejects
+        content = self.CONTENT.replace("R1|-1|PO1|1|1|2024-01-05\n", "")
+        self._import("save_per_instance", content)
+        expected_rows = self._rows()
+        ReceiptLine.objects.all().delete()
+
+        result = self._import("copy", content)
+        self.assertEqual((result.created, result.updated, result.errors), (4, 0, 0))
+        self.assertEqual(self._rows(), expected_rows)
+
+        result = self._import("copy", "R1|1|PO1|1|1|2024-01-15\nR1|2|PO1|1|1|2024-01-12\n")
+        self.assertEqual((result.created, result.updated), (0, 2))
+        self.assertEqual(ReceiptLine.objects.get(line=2).classification.name, "Late")
+
+    def test_save_per_instance_reads_data_versions_once(self):
+        def version_queries(lines):
+            ReceiptLine.objects.all().delete()
+            content = "".join(f"R1|{n}|PO1|1|1|2024-01-10\n" for n in range(1, lines + 1))
+            with CaptureQueriesContext(connection) as ctx:
+                self._import("save_per_instance", content)
+            return sum(DataVersion._meta.db_table in query["sql"] for query in ctx.captured_queries)
+
+        version_queries(1)  # creates the missing counters
+        self.assertEqual(version_queries(2), version_queries(6))
+
+    def test_hybrid_updates_changed_rows_only(self):
+        self._import("hybrid")
+        result = self._import("hybrid", "R1|1|PO1|1|1|2024-01-15\nR1|2|PO1|1|1|2024-01-12\n")
+        self.assertEqual((result.created, result.updated, result.skipped, result.errors), (0, 1, 1, 0))
+        self.assertEqual(ReceiptLine.objects.get(line=2).classification.name, "Late")
+
+
+class FxRateIndexTests(TestCase):
+    def setUp(self):
+        GlobalSettings.objects.create(home_currency_code="CAD")
+        self.cad, self.usd, self.eur = (Currency.objects.create(code=c) for c in ("CAD", "USD", "EUR"))
+        for base, quote, day, rate in (
+            (self.usd, self.cad, 1, "1.30"),
+            (self.usd, self.cad, 10, "1.40"),
+            (self.eur, self.cad, 5, "1.50"),
+        ):
+            ExchangeRate.objects.create(base=base, quote=quote, rate_date=date(2024, 1, day), rate=rate)
+
+    def test_lookup_strategies_inverse_and_cross_rates(self):
+        rate = fx.get_rate
+        self.assertEqual(rate("usd", "CAD", date(2024, 1, 9)), Decimal("1.30"))
+        self.assertEqual(rate("USD", "CAD", date(2024, 1, 10)), Decimal("1.40"))
+        self.assertIsNone(rate("USD", "CAD", date(2023, 12, 31)))
+        self.assertIsNone(rate("USD", "CAD", date(2024, 1, 9), strategy="on"))
+        self.assertEqual(rate("USD", "CAD", date(2023, 12, 31), strategy="latest"), Decimal("1.40"))
+        self.assertEqual(rate("CAD", "USD", date(2024, 1, 2)), Decimal("1") / Decimal("1.30"))
+        self.assertEqual(rate("USD", "EUR", date(2024, 1, 6)), Decimal("1.30") / Decimal("1.50"))
+        self.assertIsNone(rate("USD", "EUR", date(2024, 1, 2)))
+        self.assertEqual(fx.convert(10, "USD", "CAD", date(2024, 1, 2)), Decimal("13.00"))
+
+    def test_index_served_from_memory_and_refreshed_on_change(self):
+        with data_version_snapshot():
+            fx.get_rate("USD", "CAD")
+            with self.assertNumQueries(0):
+                self.assertEqual(fx.convert(1, "USD", "CAD", date(2024, 1, 2)), Decimal("1.30"))
+                self.assertEqual(fx.get_home_currency_code(), "CAD")
+        ExchangeRate.objects.create(base=self.usd, quote=self.cad, rate_date=date(2024, 1, 2), rate="1.35")
+        self.assertEqual(fx.get_rate("USD", "CAD", date(2024, 1, 2)), Decimal("1.35"))
+
+    def test_convert_many_matches_convert(self):
+        amounts = [10, None, "2.5", 7, 3, 4]
+        codes = ["USD", "USD", "eur", None, "CAD", "USD"]
+        days = [date(2024, 1, 2), date(2024, 1, 2), date(2024, 1, 6), date(2024, 1, 6), None, date(2023, 12, 1)]
+        expected = [
+            fx.convert(a, c, "USD", d) if c else None for a, c, d in zip(amounts, codes, days)
+        ]
+        self.assertEqual(fx.convert_many(amounts, codes, days, "USD", exact=True), expected)
+        floats = fx.convert_many(amounts, codes, days, "USD")
+        self.assertEqual(floats, [None if v is None else float(v) for v in expected])
+        self.assertEqual(fx.convert_many([1, 2], "USD", date(2024, 1, 12)), [1.4, 2.8])
+
+    def test_amount_home_currency_batched_in_bulk_recompute(self):
+        order = PurchaseOrder.objects.create(order="PO1")
+        for line, (currency, amount) in enumerate(((self.usd, 10.0), (self.eur, 2.0), (None, 5.0)), start=1):
+            PurchaseOrderLine.objects.create(
+                order=order, line=line, sequence=1, currency=currency, amount_original_currency=amount
+            )
+        expected = list(PurchaseOrderLine.objects.order_by("pk").values_list("amount_home_currency", flat=True))
+        self.assertEqual(expected, [14.0, 3.0, None])
+        PurchaseOrderLine.objects.update(amount_home_currency=None)
+        # read the batch, FX and settings data versions, currency codes, one bulk UPDATE
+        with self.assertNumQueries(5):
+            bulk_recompute(PurchaseOrderLine.objects.all(), ["amount_home_currency"])
+        self.assertEqual(
+            list(PurchaseOrderLine.objects.order_by("pk").values_list("amount_home_currency", flat=True)), expected
+        )
+
+    def test_batched_amounts_round_like_save(self):
+        order = PurchaseOrder.objects.create(order="PO1")
+        for line, amount in enumerate((0.125, 1.005), start=1):
+            PurchaseOrderLine.objects.create(
+                order=order, line=line, sequence=1, currency=self.cad, amount_original_currency=amount
+            )
+        saved = list(PurchaseOrderLine.objects.order_by("pk").values_list("amount_home_currency", flat=True))
+        self.assertEqual(saved, [0.13, 1.01])
+        PurchaseOrderLine.objects.update(amount_home_currency=None)
+        bulk_recompute(PurchaseOrderLine.objects.all(), ["amount_home_currency"])
+        self.assertEqual(
+            list(PurchaseOrderLine.objects.order_by("pk").values_list("amount_home_currency", flat=True)), saved
+        )
+
+
+class ExchangeRateFetchTests(TestCase):
+    def setUp(self):
+        GlobalSettings.objects.create(home_currency_code="CAD")
+        for code in ("CAD", "USD", "EUR", "JPY"):
+            Currency.objects.create(code=code)
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        self.path = os.path.join(tmp, "rates.csv")
+        with open(self.path, "w", encoding="utf-8") as fh:
+            fh.write("base,quote,date,rate\n")
+            fh.write("USD,CAD,2024-01-01,1.30\nUSD,CAD,2024-01-02,1.31\nUSD,CAD,2024-01-05,1.35\n")
+            fh.write("CAD,EUR,2024-01-02,0.50\n")
+
+    def _rates(self):
+        return sorted(ExchangeRate.objects.values_list("base__code", "quote__code", "rate_date", "rate", "source"))
+
+    def test_backfill_range_with_inverse_pairs(self):
+        args = ["--provider", "file", "--file", self.path, "--from", "2024-01-01", "--to", "2024-01-02", "--sleep", "0"]
+        call_command("update_exchange_rates", *args, stdout=StringIO())
+        self.assertEqual(
+            self._rates(),
+            [
+                ("CAD", "CAD", date(2024, 1, 2), Decimal("1"), "file"),
+                ("EUR", "CAD", date(2024, 1, 2), Decimal("2"), "file"),
+                ("USD", "CAD", date(2024, 1, 1), Decimal("1.30"), "file"),
+                ("USD", "CAD", date(2024, 1, 2), Decimal("1.31"), "file"),
+            ],
+        )
+        self.assertEqual(fx.get_rate("EUR", "USD", date(2024, 1, 3)), Decimal("2") / Decimal("1.31"))
+
+        # Re-running upserts in place
+        ExchangeRate.objects.filter(rate_date=date(2024, 1, 1)).update(rate="9")
+        call_command("update_exchange_rates", *args, stdout=StringIO())
+        self.assertEqual(self._rates()[2][3], Decimal("1.30"))
+        self.assertEqual(ExchangeRate.objects.count(), 4)
+
+    def test_latest_rate_per_pair_stored_on_run_date(self):
+        call_command(
+            "update_exchange_rates", "--provider", "file", "--file", self.path, "--to", "2024-01-04", "--sleep", "0",
+            stdout=StringIO(),
+        )
+        self.assertIn(("USD", "CAD", date(2024, 1, 4), Decimal("1.31"), "file"), self._rates())
+        self.assertFalse(ExchangeRate.objects.filter(base__code="JPY").exists())
+
+    def test_polygon_provider_parses_range_over_session(self):
+        from apps.common.fx_providers import PolygonProvider
+
+        session = mock.Mock()
+        session.get.return_value.status_code = 200
+        session.get.return_value.json.return_value = {"results": [{"t": 1704067200000, "c": 1.3}]}
+        provider = PolygonProvider("key", session=session)
+        self.assertEqual(provider.history("USD", "CAD", date(2024, 1, 1), date(2024, 1, 2)), {date(2024, 1, 1): Decimal("1.3")})
+        self.assertIn("C:USDCAD/range/1/day/2024-01-01/2024-01-02", session.get.call_args[0][0])
+
+
+class IntervalClassifierTests(TestCase):
+    def setUp(self):
+        rules = PurchaseTimelinessClassification.objects
+        rules.create(name="Early", priority=1, max_days=-2, max_inclusive=False)
+        rules.create(name="On time", priority=2, min_days=-3, max_days=3)
+        rules.create(name="Late", priority=3, min_days=3, min_inclusive=False, max_days=30, max_inclusive=False)
+        rules.create(name="Off", priority=0, min_days=10, max_days=12, active=False)
+        MrpRescheduleDaysClassification.objects.create(name="Small", min_days=0, max_days=5)
+        MrpRescheduleDaysClassification.objects.create(name="Large", min_days=4)
+
+    def _first_match(self, rules, days):
+        return next((rule for rule in rules if rule.matches(days)), None)
+
+    def test_matches_rule_walk_in_python_and_sql(self):
+        timeliness = list(PurchaseTimelinessClassification.objects.filter(active=True).order_by("priority", "id"))
+        mrp = list(MrpRescheduleDaysClassification.objects.order_by("min_days", "id"))
+        days = list(range(-40, 41))
+        classifier = PurchaseTimelinessClassification.classifier()
+        expected = [self._first_match(timeliness, d) for d in days]
+        self.assertEqual([classifier.classify(d) for d in days], expected)
+        self.assertEqual(classifier.classify_many(days + [None]), expected + [None])
+        mrp_expected = [self._first_match(mrp, abs(d)) for d in days]
+        self.assertEqual(MrpRescheduleDaysClassification.classifier().classify_many(days), mrp_expected)
+
+        # SQL rendering over abs(n) agrees row for row
+        Currency.objects.create(code="CAD")
+        case = MrpRescheduleDaysClassification.classifier().as_case("n")
+        for d, rule in zip(days, mrp_expected):
+            got = Currency.objects.annotate(n=Value(d, output_field=IntegerField())).values_list(case, flat=True)
+            self.assertEqual(got.get(), rule.pk if rule else None, d)
+
+    def test_compiled_once_and_rebuilt_on_rule_save(self):
+        with data_version_snapshot():
+            PurchaseTimelinessClassification.classifier()
+            with self.assertNumQueries(0):
+                self.assertEqual(PurchaseTimelinessClassification.classifier().classify(20).name, "Late")
+        rule = PurchaseTimelinessClassification.objects.get(name="Off")
+        rule.active = True
+        rule.save()
+        self.assertEqual(PurchaseTimelinessClassification.classifier().classify(11).name, "Off")
+
+
+class SettingsCacheTests(TestCase):
+    def test_singletons_cached_until_saved(self):
+        self.assertEqual(settings_cache.get_home_currency_code(), "CAD")
+        self.assertEqual(settings_cache.get_otd_target_percent(), 95.0)
+        obj = GlobalSettings.objects.create(home_currency_code="usd")
+        purchase = PurchaseSettings.objects.create(otd_target_percent=90)
+        with data_version_snapshot():
+            settings_cache.get_global_settings()
+            settings_cache.get_purchase_settings()
+            with self.assertNumQueries(0):
+                self.assertEqual(settings_cache.get_home_currency_code(), "USD")
+                self.assertEqual(fx.get_home_currency_code(), "USD")
+                self.assertEqual(settings_cache.get_otd_target_percent(), 90.0)
+        obj.home_currency_code = "EUR"
+        obj.save()
+        purchase.delete()
+        self.assertEqual(settings_cache.get_home_currency_code(), "EUR")
+        self.assertEqual(settings_cache.get_otd_target_percent(), 95.0)
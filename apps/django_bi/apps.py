@@ -36,3 +36,9 @@ class DjangoBiConfig(AppConfig):
 
         # Workflow ready logic: load workflow signals.
         from .workflow import signals as workflow_signals  # noqa: F401
+
+        # Data versions: bump per-model counters on writes (used for ETags).
+        # Importing etags and the workflow graph tracks their models.
+        from .utils import data_versions  # noqa: F401
+        from .blocks.services import etags  # noqa: F401
+        from .workflow import graph  # noqa: F401
@@ -23,6 +23,15 @@ class BaseBlock(ABC):
     def get_data(self, request, instance_id=None):
         """Return the data required to render this block."""
 
+    def get_data_models(self, user):
+        """Return the models whose rows this block reads.
+
+        Used to build ETags for conditional responses.  ``None`` (the
+        default) means the dependencies are unknown and the block is always
+        rendered in full.
+        """
+        return None
+
     def render(self, request, instance_id=None):
         """Render the block using its template and context."""
         config = self.get_config(request, instance_id=instance_id) or {}
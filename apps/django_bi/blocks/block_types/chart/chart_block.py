@@ -12,6 +12,8 @@ from apps.django_bi.blocks.models.block_filter_config import BlockFilterConfig
 from apps.django_bi.blocks.models.config_templates import BlockFilterLayoutTemplate
 from apps.django_bi.blocks.models.block_filter_layout import BlockFilterLayout
 from apps.django_bi.blocks.services.blocks_filter_utils import FilterResolutionMixin
+from apps.django_bi.blocks.services.filter_schema import get_filter_schema
+from apps.django_bi.blocks.services.etags import related_models
 from apps.django_bi.permissions.checks import (
     filter_viewable_queryset as filter_viewable_queryset_generic,
     can_read_field as can_read_field_generic,
@@ -67,6 +69,13 @@ class ChartBlock(BaseBlock, FilterResolutionMixin, ABC):
     def get_figure(self, user, filters):
         """Return a Plotly Figure based on ``filters`` for ``user``."""
 
+    def get_data_models(self, user):
+        """Default to the relations of ``get_model()`` when a subclass defines it."""
+        get_model = getattr(self, "get_model", None)
+        if get_model is None:
+            return None
+        return related_models(get_model())
+
     def get_layout(self, user):
         """Return Plotly layout for the chart (defaults + per-request overrides).
 
@@ -160,10 +169,7 @@ class ChartBlock(BaseBlock, FilterResolutionMixin, ABC):
 
     def _resolve_filters(self, request, active_filter_config, instance_id=None):
         user = request.user
-        try:
-            raw_schema = self.get_filter_schema(request)
-        except TypeError:
-            raw_schema = self.get_filter_schema(user)
+        raw_schema = get_filter_schema(self, request)
         filter_schema = self._resolve_filter_schema(raw_schema, user)
         # Remove filters for fields the user cannot read
         filtered_schema = {}
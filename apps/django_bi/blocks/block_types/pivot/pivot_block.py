@@ -4,6 +4,8 @@ from apps.django_bi.blocks.models.block_filter_config import BlockFilterConfig
 from apps.django_bi.blocks.models.config_templates import BlockFilterLayoutTemplate
 from apps.django_bi.blocks.models.block_filter_layout import BlockFilterLayout
 from apps.django_bi.blocks.services.blocks_filter_utils import FilterResolutionMixin
+from apps.django_bi.blocks.services.filter_schema import get_filter_schema
+from apps.django_bi.blocks.services.etags import related_models
 from apps.django_bi.blocks.models.pivot_config import PivotConfig
 from apps.django_bi.blocks.services.filtering import apply_filter_registry
 from django.contrib.admin.utils import label_for_field
@@ -45,6 +47,9 @@ class PivotBlock(BaseBlock, FilterResolutionMixin):
     def get_model(self):
         raise NotImplementedError
 
+    def get_data_models(self, user):
+        return related_models(self.get_model())
+
     def get_filter_schema(self, request):
         return {}
 
@@ -130,10 +135,7 @@ class PivotBlock(BaseBlock, FilterResolutionMixin):
                 active_filter_config = None
 
         # Resolve filters
-        try:
-            raw_schema = self.get_filter_schema(request)
-        except TypeError:
-            raw_schema = self.get_filter_schema(user)
+        raw_schema = get_filter_schema(self, request)
         filter_schema = self._resolve_filter_schema(raw_schema, user)
         base_values = active_filter_config.values if active_filter_config else {}
         ns_prefix = f"{self.block_name}__{instance_id}__filters."
@@ -23,6 +23,8 @@ from django.core.exceptions import FieldDoesNotExist
 from django.contrib.admin.utils import label_for_field
 import json
 from apps.django_bi.blocks.services.blocks_filter_utils import FilterResolutionMixin
+from apps.django_bi.blocks.services.filter_schema import get_filter_schema
+from apps.django_bi.blocks.services.etags import related_models
 import uuid
 
 
@@ -55,6 +57,9 @@ class TableBlock(BaseBlock, FilterResolutionMixin):
     def get_model(self):
         raise NotImplementedError("You must override get_model()")
 
+    def get_data_models(self, user):
+        return related_models(self.get_model())
+
     def get_queryset(self, user, filters, active_column_config):
         """Default queryset builder for table blocks.
 
@@ -475,10 +480,7 @@ class TableBlock(BaseBlock, FilterResolutionMixin):
 
     def _resolve_filters(self, request, active_filter_config, instance_id=None):
         user = request.user
-        try:
-            raw_schema = self.get_filter_schema(request)
-        except TypeError:
-            raw_schema = self.get_filter_schema(user)
+        raw_schema = get_filter_schema(self, request)
         filter_schema = self._resolve_filter_schema(raw_schema, user)
         base_values = active_filter_config.values if active_filter_config else {}
         # Use namespaced filter params to avoid collisions across blocks and instances
@@ -29,6 +29,12 @@ class BlockRegistry:
         if block_id in self._blocks:
             raise ValueError(f"Block '{block_id}' is already registered")
         self._blocks[block_id] = block_instance
+        # Bump the data versions of the models the block reads on writes
+        from apps.django_bi.utils.data_versions import track_data_versions
+        try:
+            track_data_versions(*(block_instance.get_data_models(None) or ()))
+        except Exception:
+            pass
         # Derive app name at registration time for reliable labeling later
         # Resolve app name once by matching the block class module
         from django.apps import apps as django_apps
@@ -0,0 +1,144 @@
+"""ETag support for block render endpoints.
+
+An ETag summarises everything a rendered block depends on: the block and
+instance, the query string (filters, column/filter config selections), the
+user's permission fingerprint, the current date (relative date filters) and
+the data versions of both the block configuration models and the models the
+block reads.  When a client presents a matching ``If-None-Match`` header the
+views answer ``304 Not Modified`` without running any data query.
+
+Blocks opt in by returning their models from ``get_data_models(user)``;
+blocks returning ``None`` are always rendered in full.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from django.contrib.messages import get_messages
+from django.utils import timezone
+
+from apps.django_bi.blocks.models import (
+    Block,
+    BlockColumnConfig,
+    BlockFilterConfig,
+    BlockFilterLayout,
+    FieldDisplayRule,
+    PivotConfig,
+)
+from apps.django_bi.blocks.models.config_templates import BlockFilterLayoutTemplate
+from apps.django_bi.blocks.registry import block_registry
+from apps.django_bi.utils.data_versions import get_data_versions, track_data_versions
+
+__all__ = [
+    "CONFIG_MODELS",
+    "block_etag",
+    "block_view_etag",
+    "related_models",
+]
+
+CONFIG_MODELS = (
+    Block,
+    BlockColumnConfig,
+    BlockFilterConfig,
+    BlockFilterLayout,
+    BlockFilterLayoutTemplate,
+    FieldDisplayRule,
+    PivotConfig,
+)
+track_data_versions(*CONFIG_MODELS)
+
+
+@lru_cache(maxsize=None)
+def related_models(model) -> tuple:
+    """Return ``model`` plus every model reachable through forward FK/O2O
+    relations and reverse one-to-one relations.
+
+    This mirrors the relations table and pivot blocks can traverse for
+    columns and filters.
+    """
+    seen = []
+    stack = [model]
+    while stack:
+        current = stack.pop()
+        if current in seen:
+            continue
+        seen.append(current)
+        for field in current._meta.get_fields():
+            if not field.is_relation or field.many_to_many or field.one_to_many:
+                continue
+            target = field.related_model
+            if target is not None and target not in seen:
+                stack.append(target)
+    return tuple(seen)
+
+
+def _permission_fingerprint(user) -> str:
+    if not getattr(user, "is_authenticated", False):
+        return "anonymous"
+    try:
+        perms = sorted(user.get_all_permissions())
+    except Exception:
+        perms = []
+    raw = "|".join(
+        [
+            str(user.pk),
+            str(bool(getattr(user, "is_superuser", False))),
+            str(bool(getattr(user, "is_staff", False))),
+            ",".join(perms),
+        ]
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def block_etag(
+    block,
+    request,
+    *,
+    instance_id=None,
+    extra_models: Iterable = (),
+    extra=None,
+) -> Optional[str]:
+    """Return an ETag for rendering ``block`` for ``request`` or ``None``.
+
+    ``None`` means the response must not be validated by ETag, either because
+    the block does not declare its data models or because the request carries
+    pending flash messages that the render would consume.
+    """
+    get_models = getattr(block, "get_data_models", None)
+    if get_models is None:
+        return None
+    user = getattr(request, "user", None)
+    models = get_models(user)
+    if models is None:
+        return None
+    try:
+        if len(get_messages(request)):
+            return None
+    except Exception:
+        pass
+    versions = get_data_versions([*CONFIG_MODELS, *extra_models, *models])
+    params = sorted((k, request.GET.getlist(k)) for k in request.GET.keys())
+    parts = [
+        getattr(block, "block_name", type(block).__name__),
+        instance_id,
+        params,
+        _permission_fingerprint(user),
+        request.META.get("CSRF_COOKIE", ""),
+        timezone.localdate().isoformat(),
+        sorted(versions.items()),
+        extra,
+    ]
+    payload = json.dumps(parts, default=str, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def block_view_etag(request, block_name, *args, **kwargs) -> Optional[str]:
+    """``etag_func`` for the ``render_*_block`` views."""
+    block = block_registry.get(block_name)
+    if not block:
+        return None
+    return block_etag(block, request)
@@ -0,0 +1,209 @@
+"""Resolve AJAX filter choices with interdependent narrowing.
+
+:class:`FilterChoiceResolver` holds everything shared between the filter keys
+of one block for one request (raw schema, collected filter values and the
+permission-filtered base queryset), so both the single-key and the batch
+choices endpoints build them once.
+
+Narrowing by the other active filters happens in SQL: choice callables
+accepting ``allowed`` receive the values still reachable in the block's
+filtered queryset, either as an ``IN (subquery)`` or, for small sets, as a
+list cached briefly per filter state so rapid typing does not rescan the
+block's table.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+from typing import Iterable, Optional, Sequence, Set
+
+from django.core.cache import cache
+
+from apps.django_bi.blocks.services.blocks_filter_utils import FilterResolutionMixin
+from apps.django_bi.blocks.services.etags import related_models
+from apps.django_bi.blocks.services.filter_schema import get_filter_schema
+from apps.django_bi.utils.data_versions import get_data_versions
+
+__all__ = ["FilterChoiceResolver"]
+
+# Cache marker for filter states whose allowed set is too large to keep as a list.
+_TOO_MANY = "__too_many__"
+
+
+class FilterChoiceResolver:
+    MAX_OPTIONS = 200
+    ALLOWED_CACHE_TTL = 60
+    ALLOWED_CACHE_MAX = 2000
+
+    def __init__(self, block_impl, block_name, request):
+        self.block_impl = block_impl
+        self.block_name = block_name
+        self.user = request.user
+        self.raw_schema = get_filter_schema(block_impl, request)
+        # Resolve schema and collect current filter values (namespaced as filters.<key>)
+        schema = FilterResolutionMixin._resolve_filter_schema(self.raw_schema, self.user)
+        self.current_filters = FilterResolutionMixin._collect_filters(
+            request.GET, schema, base={}, prefix="filters.", allow_flat=False
+        )
+        self._base_querysets = {}
+
+    # ----- base queryset -------------------------------------------------------
+    def _base_queryset(self, cfg):
+        """Build (once per source) a base queryset compatible with ``cfg``."""
+        block_impl = self.block_impl
+        if hasattr(block_impl, "get_base_queryset"):
+            source = "block"
+        elif cfg.get("model") is not None:
+            source = cfg["model"]
+        elif hasattr(block_impl, "get_model"):
+            source = "model"
+        else:
+            return None
+        if source in self._base_querysets:
+            return self._base_querysets[source]
+        try:
+            if source == "block":
+                qs = block_impl.get_base_queryset(self.user)
+            elif source == "model":
+                qs = block_impl.get_model().objects.all()
+            else:
+                qs = source.objects.all()
+        except Exception:
+            qs = None
+        try:
+            if qs is not None and hasattr(block_impl, "filter_queryset"):
+                qs = block_impl.filter_queryset(self.user, qs)
+        except Exception:
+            pass
+        self._base_querysets[source] = qs
+        return qs
+
+    def _apply_other_filters(self, qs, key):
+        return self.raw_schema.apply(
+            qs,
+            self.current_filters,
+            exclude=(key,),
+            types={"select", "multiselect"},
+            ignore_errors=True,
+        )
+
+    # ----- choices -------------------------------------------------------------
+    def choices_for(self, key, query: str = "", ids: Sequence[str] = ()) -> list:
+        """Return ``[{"value", "label"}, ...]`` for filter ``key``.
+
+        ``ids`` hydrates labels for preselected values.
+        """
+        cfg = self.raw_schema.get(key, {})
+        choices_callable = cfg.get("choices")
+        raw_tokens = list(ids or [])
+        choices = []
+
+        base_qs = self._base_queryset(cfg)
+        if base_qs is not None:
+            try:
+                base_qs = self._apply_other_filters(base_qs, key)
+            except Exception:
+                pass
+
+        value_path = cfg.get("value_path") or cfg.get("field")
+        allowed = None
+        if base_qs is not None and value_path:
+            try:
+                allowed = self._get_allowed(key, base_qs, value_path)
+            except Exception:
+                allowed = None
+
+        # Python-side allowed set, only built when something cannot narrow in SQL.
+        allowed_ids: Optional[Set[str]] = None
+        if isinstance(allowed, list):
+            allowed_ids = set(allowed)
+
+        if callable(choices_callable):
+            try:
+                sig = inspect.signature(choices_callable)
+                params = sig.parameters
+                kwargs = {}
+                args = [self.user]
+                if "query" in params:
+                    kwargs["query"] = query
+                elif len(params) >= 2:
+                    args.append(query)
+                if "ids" in params and raw_tokens:
+                    kwargs["ids"] = raw_tokens
+
+                if "allowed" in params:
+                    # Narrowing and LIMIT both happen in the choices query.
+                    if allowed is not None:
+                        kwargs["allowed"] = allowed
+                    choices = choices_callable(*args, **kwargs)
+                else:
+                    # Legacy callables: intersect their results in Python.
+                    if allowed is not None and allowed_ids is None:
+                        raw_vals: Iterable = (
+                            base_qs.order_by().values_list(value_path, flat=True).distinct()
+                        )
+                        allowed_ids = {str(v) for v in raw_vals if v not in (None, "")}
+                    if "ids" in params and not raw_tokens and not query and allowed_ids is not None:
+                        kwargs["ids"] = sorted(allowed_ids)[: self.MAX_OPTIONS]
+                    elif "ids" in params and raw_tokens and allowed_ids is not None:
+                        kwargs["ids"] = [v for v in raw_tokens if v in allowed_ids]
+                    choices = choices_callable(*args, **kwargs)
+                    if allowed_ids is not None and not raw_tokens:
+                        choices = [(v, lbl) for (v, lbl) in choices if str(v) in allowed_ids]
+            except Exception:
+                choices = []
+        elif isinstance(choices_callable, (list, tuple)):
+            choices = list(choices_callable)
+            if allowed is not None and allowed_ids is None and base_qs is not None:
+                # Static lists are short: check just their values against the table.
+                try:
+                    present = base_qs.filter(
+                        **{f"{value_path}__in": [v for v, _ in choices]}
+                    ).order_by().values_list(value_path, flat=True).distinct()
+                    allowed_ids = {str(v) for v in present}
+                except Exception:
+                    allowed_ids = None
+            if allowed_ids is not None and not raw_tokens:
+                choices = [(v, lbl) for (v, lbl) in choices if str(v) in allowed_ids]
+
+        results = []
+        q_lower = (query or "").lower()
+        for value, label in choices[: self.MAX_OPTIONS]:
+            label_str = str(label)
+            if not query or q_lower in label_str.lower():
+                results.append({"value": value, "label": label_str})
+        return results
+
+    def _get_allowed(self, key, base_qs, value_path):
+        """Return the values of ``value_path`` reachable in ``base_qs``.
+
+        Small sets come back as a list cached per filter state for
+        ``ALLOWED_CACHE_TTL`` seconds; larger ones as a subquery so the choices
+        query narrows with ``IN (SELECT ...)``.
+        """
+        subquery = base_qs.order_by().values(value_path)
+        state = {k: v for k, v in self.current_filters.items() if k != key}
+        versions = get_data_versions(related_models(base_qs.model))
+        raw = json.dumps(
+            [self.block_name, key, value_path, self.user.pk, state, sorted(versions.items())],
+            default=str,
+            sort_keys=True,
+        )
+        cache_key = "django_bi:filter_allowed:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        cached = cache.get(cache_key)
+        if cached is None:
+            values = list(
+                base_qs.order_by()
+                .values_list(value_path, flat=True)
+                .distinct()[: self.ALLOWED_CACHE_MAX + 1]
+            )
+            if len(values) > self.ALLOWED_CACHE_MAX:
+                cached = _TOO_MANY
+            else:
+                cached = sorted(str(v) for v in values if v not in (None, ""))
+            cache.set(cache_key, cached, self.ALLOWED_CACHE_TTL)
+        if cached == _TOO_MANY:
+            return subquery
+        return cached
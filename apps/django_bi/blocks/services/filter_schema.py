@@ -0,0 +1,151 @@
+"""Compiled, cached block filter schemas.
+
+``get_filter_schema(block, request_or_user)`` returns the block's raw filter
+schema built once per block per process, wrapped in a
+:class:`CompiledFilterSchema` that also carries a precomputed filter plan.
+Schemas built by the block from the current request or user must opt out by
+setting ``filter_schema_cacheable = False`` on the block class.
+
+Filter configs may declare a ``"q"`` builder next to their ``"handler"``;
+:func:`q_handler` derives the handler from it so the two cannot drift::
+
+    q = lambda val: Q(item__code__in=val) if val else None
+    {"q": q, "handler": q_handler(q)}
+
+:meth:`CompiledFilterSchema.apply` composes every active Q into a single
+``filter()`` call (one WHERE clause, one QuerySet clone) and runs the
+remaining plain handlers afterwards.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import weakref
+from typing import Iterable, Optional
+
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "CompiledFilterSchema",
+    "clear_filter_schema_cache",
+    "get_filter_schema",
+    "q_handler",
+]
+
+_compiled = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def q_handler(q):
+    """Return a ``handler(qs, val)`` filtering by ``q(val)``; None leaves ``qs`` as is."""
+
+    def handler(qs, val):
+        cond = q(val)
+        return qs.filter(cond) if cond is not None else qs
+
+    return handler
+
+
+class CompiledFilterSchema(dict):
+    """A raw filter schema (``{key: cfg}``) plus its filter plan.
+
+    Shared between requests: callers must copy entries before changing them.
+    """
+
+    def __init__(self, raw_schema):
+        super().__init__(raw_schema or {})
+        self.plan = tuple(
+            (
+                key,
+                cfg.get("type"),
+                cfg.get("q") if callable(cfg.get("q")) else None,
+                cfg.get("handler"),
+            )
+            for key, cfg in self.items()
+        )
+
+    def apply(self, queryset, values, *, exclude: Iterable[str] = (), types=None, ignore_errors=False):
+        """Filter ``queryset`` by the active ``values``.
+
+        Keys in ``exclude`` or whose type is not in ``types`` are skipped, as
+        are empty values. With ``ignore_errors`` a failing filter is logged and
+        skipped instead of raised.
+        """
+        exclude = set(exclude or ())
+        conditions = []
+        handlers = []
+        for key, ftype, q_builder, handler in self.plan:
+            if key in exclude or (types is not None and ftype not in types):
+                continue
+            val = values.get(key)
+            if val is None or val == "":
+                continue
+            if q_builder is not None:
+                try:
+                    cond = q_builder(val)
+                except Exception:
+                    if not ignore_errors:
+                        raise
+                    logger.debug("Filter '%s' Q builder failed", key, exc_info=True)
+                    continue
+                if cond is not None:
+                    conditions.append(cond)
+            elif callable(handler):
+                handlers.append((key, handler, val))
+
+        if conditions:
+            combined = Q()
+            for cond in conditions:
+                combined &= cond
+            try:
+                queryset = queryset.filter(combined)
+            except Exception:
+                if not ignore_errors:
+                    raise
+                for cond in conditions:
+                    try:
+                        queryset = queryset.filter(cond)
+                    except Exception:
+                        logger.debug("Filter condition %s failed", cond, exc_info=True)
+
+        for key, handler, val in handlers:
+            logger.debug("Applying filter '%s' with value '%s'", key, val)
+            try:
+                queryset = handler(queryset, val)
+            except Exception:
+                if not ignore_errors:
+                    raise
+                logger.debug("Filter '%s' handler failed", key, exc_info=True)
+        return queryset
+
+
+def _build(block, request_or_user):
+    try:
+        return block.get_filter_schema(request_or_user)
+    except TypeError:
+        return block.get_filter_schema(getattr(request_or_user, "user", request_or_user))
+
+
+def get_filter_schema(block, request_or_user=None) -> CompiledFilterSchema:
+    """Return the compiled filter schema of ``block``."""
+    if block is None or not hasattr(block, "get_filter_schema"):
+        return CompiledFilterSchema({})
+    if not getattr(block, "filter_schema_cacheable", True):
+        return CompiledFilterSchema(_build(block, request_or_user))
+    compiled: Optional[CompiledFilterSchema] = _compiled.get(block)
+    if compiled is None:
+        with _lock:
+            compiled = _compiled.get(block)
+            if compiled is None:
+                compiled = CompiledFilterSchema(_build(block, request_or_user))
+                _compiled[block] = compiled
+    return compiled
+
+
+def clear_filter_schema_cache() -> None:
+    """Drop all compiled schemas (e.g. after reloading block code)."""
+    with _lock:
+        _compiled.clear()
@@ -2,6 +2,7 @@
 
 import logging
 from apps.django_bi.blocks.registry import block_registry
+from apps.django_bi.blocks.services.filter_schema import get_filter_schema
 
 logger = logging.getLogger(__name__)
 
@@ -17,19 +18,13 @@ def apply_filter_registry(table_name, queryset, filters, user):
 
     Returns:
         QuerySet: The queryset after all matching filters have been applied.
+
+    Filters declaring a ``"q"`` builder are combined into a single
+    ``filter()`` call; plain handlers run afterwards.
     """
     block = block_registry.get(table_name)
+    schema = get_filter_schema(block, user)
 
-    # Dynamic per-instance filter schema
-    if block and hasattr(block, "get_filter_schema"):
-        schema = block.get_filter_schema(user)
-    else:
-        schema = {}
-
-    logger.debug("Resolved filter schema for %s: %s", table_name, schema)
+    logger.debug("Resolved filter schema for %s: %s", table_name, list(schema))
 
-    for key, config in schema.items():
-        if key in filters and filters[key] is not None:
-            logger.debug("Applying filter '%s' with value '%s'", key, filters[key])
-            queryset = config["handler"](queryset, filters[key])
-    return queryset
+    return schema.apply(queryset, filters or {})
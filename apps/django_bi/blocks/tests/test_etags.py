@@ -0,0 +1,120 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.db.models import F
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from apps.django_bi.blocks.base import BaseBlock
+from apps.django_bi.blocks.models import Block
+from apps.django_bi.blocks.registry import block_registry
+from apps.django_bi.blocks.services.etags import block_etag, related_models
+from apps.django_bi.blocks.views.table import render_table_block
+from apps.django_bi.utils.data_versions import bump_data_version, data_version_snapshot, get_data_version, model_label
+from apps.django_bi.utils.models import DataVersion
+
+
+class _StubBlock(BaseBlock):
+    block_name = "etag_test_block"
+    template_name = "blocks/table/table_block.html"
+
+    def __init__(self, models=(Block,)):
+        self.models = models
+        self.get_config = mock.Mock(return_value={})
+        self.get_data = mock.Mock(return_value={})
+
+    def get_config(self, request, instance_id=None):  # pragma: no cover - replaced
+        return {}
+
+    def get_data(self, request, instance_id=None):  # pragma: no cover - replaced
+        return {}
+
+    def get_data_models(self, user):
+        return self.models
+
+
+class DataVersionTests(TestCase):
+    def test_save_and_delete_bump_version(self):
+        before = get_data_version(Block)
+        block = Block.objects.create(code="dv_block", name="DV")
+        after_save = get_data_version(Block)
+        self.assertGreater(after_save, before)
+        block.delete()
+        self.assertGreater(get_data_version(Block), after_save)
+
+    def test_shared_counter_bumped_on_commit(self):
+        label = model_label(Block)
+        get_data_version(Block)
+        shared = DataVersion.objects.get(label=label).version
+        with self.captureOnCommitCallbacks(execute=True):
+            Block.objects.create(code="dv_block", name="DV")
+            self.assertEqual(DataVersion.objects.get(label=label).version, shared)
+        self.assertGreater(DataVersion.objects.get(label=label).version, shared)
+
+    def test_one_shared_bump_per_transaction(self):
+        label = model_label(Block)
+        get_data_version(Block)
+        shared = DataVersion.objects.get(label=label).version
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for n in range(5):
+                Block.objects.create(code=f"dv_block_{n}", name="DV")
+            Block.objects.filter(code__startswith="dv_block_").delete()
+        self.assertEqual(len(callbacks), 1)
+        self.assertGreater(DataVersion.objects.get(label=label).version, shared)
+
+    def test_untracked_models_are_not_bumped(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            Session.objects.create(session_key="dv", session_data="", expire_date=timezone.now())
+        self.assertEqual(callbacks, [])
+
+    def test_other_process_bumps_seen_from_next_snapshot(self):
+        before = get_data_version(Block)
+        with data_version_snapshot():
+            self.assertEqual(get_data_version(Block), before)
+            # Another process's bump: only the shared row changes
+            DataVersion.objects.filter(label=model_label(Block)).update(version=F("version") + 1)
+            with self.assertNumQueries(0):
+                self.assertEqual(get_data_version(Block), before)
+        self.assertEqual(get_data_version(Block), before + 1)
+
+
+class BlockEtagTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = get_user_model().objects.create_user(username="etag", password="x")
+
+    def _request(self, path="/", **extra):
+        request = self.factory.get(path, **extra)
+        request.user = self.user
+        return request
+
+    def test_etag_is_stable_until_data_changes(self):
+        block = _StubBlock()
+        first = block_etag(block, self._request("/?filters.x=1"))
+        self.assertEqual(first, block_etag(block, self._request("/?filters.x=1")))
+        self.assertNotEqual(first, block_etag(block, self._request("/?filters.x=2")))
+        bump_data_version(Block)
+        self.assertNotEqual(first, block_etag(block, self._request("/?filters.x=1")))
+
+    def test_unknown_data_models_disable_etag(self):
+        self.assertIsNone(block_etag(_StubBlock(models=None), self._request()))
+
+    def test_related_models_follow_forward_relations(self):
+        from apps.common.models import PurchaseOrderLine, PurchaseOrder
+
+        self.assertIn(PurchaseOrder, related_models(PurchaseOrderLine))
+
+    def test_view_returns_304_without_querying_data(self):
+        block = _StubBlock()
+        block_registry._blocks[block.block_name] = block
+        self.addCleanup(block_registry._blocks.pop, block.block_name, None)
+        etag = block_etag(block, self._request())
+
+        response = render_table_block(
+            self._request(HTTP_IF_NONE_MATCH=f'"{etag}"'), block.block_name
+        )
+
+        self.assertEqual(response.status_code, 304)
+        block.get_config.assert_not_called()
+        block.get_data.assert_not_called()
@@ -0,0 +1,127 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from apps.django_bi.blocks.base import BaseBlock
+from apps.django_bi.blocks.models import Block
+from apps.django_bi.blocks.registry import block_registry
+from apps.django_bi.blocks.services.filter_choices import FilterChoiceResolver
+from apps.django_bi.blocks.views.filter_choices import FilterChoicesBatchView, FilterChoicesView
+
+
+class _ChoicesBlock(BaseBlock):
+    block_name = "filter_choices_test_block"
+
+    def __init__(self, code_choices):
+        self.code_choices = code_choices
+
+    def get_config(self, request, instance_id=None):
+        return {}
+
+    def get_data(self, request, instance_id=None):
+        return {}
+
+    def get_base_queryset(self, user):
+        return Block.objects.all()
+
+    def get_filter_schema(self, request):
+        return {
+            "code": {
+                "type": "multiselect",
+                "multiple": True,
+                "choices": self.code_choices,
+                "choices_url": "/choices/code/",
+                "value_path": "code",
+                "handler": lambda qs, val: qs.filter(code__in=val),
+            },
+            "name": {
+                "type": "multiselect",
+                "multiple": True,
+                "choices": [],
+                "value_path": "name",
+                "handler": lambda qs, val: qs.filter(name__in=val),
+            },
+        }
+
+
+class FilterChoicesViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = get_user_model().objects.create_user(username="fc", password="x")
+        Block.objects.create(code="a", name="Alpha")
+        Block.objects.create(code="b", name="Beta")
+        Block.objects.create(code="c", name="Alpha")
+
+    def _register(self, block):
+        block_registry._blocks[block.block_name] = block
+        self.addCleanup(block_registry._blocks.pop, block.block_name, None)
+
+    def _get(self, block, params):
+        self._register(block)
+        request = self.factory.get("/", params)
+        request.user = self.user
+        response = FilterChoicesView.as_view()(request, block_name=block.block_name, key="code")
+        return [row["value"] for row in json.loads(response.content)]
+
+    def test_allowed_is_applied_by_choices_callable(self):
+        seen = {}
+
+        def code_choices(user, query="", ids=None, allowed=None):
+            seen["allowed"] = allowed
+            qs = Block.objects.all()
+            if allowed is not None:
+                qs = qs.filter(code__in=allowed)
+            return [(b.code, b.name) for b in qs.order_by("code")[:200]]
+
+        values = self._get(_ChoicesBlock(code_choices), {"filters.name": "Alpha"})
+
+        self.assertEqual(values, ["a", "c"])
+        self.assertEqual(sorted(seen["allowed"]), ["a", "c"])
+
+    def test_large_allowed_sets_are_passed_as_subquery(self):
+        def code_choices(user, query="", ids=None, allowed=None):
+            return [(b.code, b.name) for b in Block.objects.filter(code__in=allowed).order_by("code")]
+
+        view_max = FilterChoiceResolver.ALLOWED_CACHE_MAX
+        FilterChoiceResolver.ALLOWED_CACHE_MAX = 1
+        self.addCleanup(setattr, FilterChoiceResolver, "ALLOWED_CACHE_MAX", view_max)
+
+        values = self._get(_ChoicesBlock(code_choices), {"filters.name": "Alpha"})
+
+        self.assertEqual(values, ["a", "c"])
+
+    def test_legacy_callable_is_intersected(self):
+        def code_choices(user, query=""):
+            return [(b.code, b.name) for b in Block.objects.order_by("code")]
+
+        values = self._get(_ChoicesBlock(code_choices), {"filters.name": "Beta"})
+
+        self.assertEqual(values, ["b"])
+
+    def test_batch_returns_choices_per_key(self):
+        calls = []
+
+        def code_choices(user, query="", ids=None, allowed=None):
+            calls.append(ids)
+            qs = Block.objects.filter(code__in=allowed)
+            if ids:
+                qs = qs.filter(code__in=ids)
+            return [(b.code, b.name) for b in qs.order_by("code")]
+
+        block = _ChoicesBlock(code_choices)
+        self._register(block)
+        request = self.factory.get(
+            "/",
+            {"keys": "code,name,unknown", "filters.name": "Alpha", "ids.code": "c"},
+        )
+        request.user = self.user
+
+        response = FilterChoicesBatchView.as_view()(request, block_name=block.block_name)
+        payload = json.loads(response.content)
+
+        self.assertEqual(sorted(payload), ["code", "name"])
+        self.assertEqual([row["value"] for row in payload["code"]], ["c"])
+        self.assertEqual(calls, [["c"]])
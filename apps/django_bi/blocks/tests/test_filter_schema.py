@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.db.models import Q
+from django.test import SimpleTestCase
+
+from apps.django_bi.blocks.services.filter_schema import (
+    CompiledFilterSchema,
+    get_filter_schema,
+    q_handler,
+)
+
+
+class _SchemaBlock:
+    def __init__(self):
+        self.calls = 0
+
+    def get_filter_schema(self, request):
+        self.calls += 1
+        return {"a": {"type": "multiselect", "handler": lambda qs, val: qs}}
+
+
+class CompiledFilterSchemaTests(SimpleTestCase):
+    def test_schema_is_built_once_per_block(self):
+        block = _SchemaBlock()
+        first = get_filter_schema(block, None)
+        second = get_filter_schema(block, None)
+        self.assertIs(first, second)
+        self.assertEqual(block.calls, 1)
+
+    def test_non_cacheable_schema_is_rebuilt(self):
+        block = _SchemaBlock()
+        block.filter_schema_cacheable = False
+        get_filter_schema(block, None)
+        get_filter_schema(block, None)
+        self.assertEqual(block.calls, 2)
+
+    def test_q_builders_compose_into_one_filter_call(self):
+        handler = mock.Mock(side_effect=lambda qs, val: qs)
+        schema = CompiledFilterSchema(
+            {
+                "a": {"q": lambda val: Q(a__in=val), "handler": mock.Mock()},
+                "b": {"q": lambda val: Q(b__in=val), "handler": mock.Mock()},
+                "c": {"handler": handler},
+                "d": {"q": lambda val: Q(d=val)},
+            }
+        )
+        qs = mock.Mock()
+        qs.filter.return_value = qs
+
+        schema.apply(qs, {"a": ["1"], "b": ["2"], "c": "x", "d": ""})
+
+        qs.filter.assert_called_once_with(Q(a__in=["1"]) & Q(b__in=["2"]))
+        handler.assert_called_once_with(qs, "x")
+
+    def test_q_handler_filters_by_the_q_builder(self):
+        handler = q_handler(lambda val: Q(a__in=val) if val else None)
+        qs = mock.Mock()
+        self.assertIs(handler(qs, []), qs)
+        qs.filter.assert_not_called()
+        handler(qs, ["1"])
+        qs.filter.assert_called_once_with(Q(a__in=["1"]))
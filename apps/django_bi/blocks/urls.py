@@ -5,9 +5,10 @@ from apps.django_bi.blocks.views import pivot as pivot_views
 from apps.django_bi.blocks.views.pivot_config import PivotConfigView
 from apps.django_bi.blocks.views.pivot_filter_config import PivotFilterConfigView
 from apps.django_bi.blocks.views.inline_edit import InlineEditView
+from apps.django_bi.blocks.views.bulk_transition import BulkTransitionView
 from apps.django_bi.blocks.views.column_config import ColumnConfigView
 from apps.django_bi.blocks.views.filter_config import FilterConfigView, ChartFilterConfigView
-from apps.django_bi.blocks.views.filter_choices import FilterChoicesView
+from apps.django_bi.blocks.views.filter_choices import FilterChoicesView, FilterChoicesBatchView
 from apps.django_bi.blocks.views.filter_layout import FilterLayoutView, AdminFilterLayoutView
 
 app_name = "blocks"
@@ -15,6 +16,7 @@ app_name = "blocks"
 urlpatterns = [
     path("table/<str:block_name>/", table_views.render_table_block, name="render_table_block"),
     path("table/<str:block_name>/edit/", InlineEditView.as_view(), name="inline_edit"),
+    path("table/<str:block_name>/transition/", BulkTransitionView.as_view(), name="bulk_transition"),
     path("table/<str:block_name>/columns/", ColumnConfigView.as_view(), name="column_config_view"),
     path("table/<str:block_name>/filters/", FilterConfigView.as_view(), name="table_filter_config"),
     path(
@@ -33,6 +35,11 @@ urlpatterns = [
         chart_views.filter_delete_view,
         name="chart_filter_delete",
     ),
+    path(
+        "filter-options/<str:block_name>/",
+        FilterChoicesBatchView.as_view(),
+        name="block_filter_choices_batch",
+    ),
     path(
         "filter-options/<str:block_name>/<str:key>/",
         FilterChoicesView.as_view(),
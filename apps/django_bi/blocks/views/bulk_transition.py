@@ -0,0 +1,62 @@
+import json
+from django import forms
+from django.http import JsonResponse
+from django.views import View
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import FieldDoesNotExist, PermissionDenied
+
+from apps.django_bi.workflow.apply_transition import apply_transition_bulk
+from apps.django_bi.blocks.registry import block_registry
+
+
+class BulkTransitionForm(forms.Form):
+    transition = forms.CharField()
+    comment = forms.CharField(required=False)
+
+
+class BulkTransitionView(LoginRequiredMixin, View):
+    """Apply one workflow transition to the selected rows of a table block.
+
+    Expects JSON ``{"ids": [...], "transition": "<name>", "comment": "..."}``
+    with the CSRF token in the ``X-CSRFToken`` header.
+    Rows are looked up in the block's base queryset; either all of them move
+    or none do.
+    """
+
+    form_class = BulkTransitionForm
+
+    def post(self, request, block_name):
+        try:
+            data = json.loads(request.body or "{}")
+        except json.JSONDecodeError:
+            return JsonResponse({"success": False, "error": "Invalid JSON"}, status=400)
+
+        form = self.form_class(data)
+        if not form.is_valid():
+            return JsonResponse({"success": False, "error": form.errors}, status=400)
+        ids = data.get("ids")
+        if not isinstance(ids, list) or not ids or not all(isinstance(i, int) for i in ids):
+            return JsonResponse({"success": False, "error": "ids must be a non-empty list of integers"}, status=400)
+
+        block = block_registry.get(block_name)
+        if not block or not hasattr(block, "get_base_queryset"):
+            return JsonResponse({"success": False, "error": "Invalid block"}, status=400)
+
+        model = block.get_model()
+        try:
+            model._meta.get_field("workflow_state")
+        except FieldDoesNotExist:
+            return JsonResponse({"success": False, "error": "Block model has no workflow"}, status=400)
+
+        queryset = block.get_base_queryset(request.user).filter(pk__in=ids)
+        try:
+            count = apply_transition_bulk(
+                queryset,
+                form.cleaned_data["transition"],
+                request.user,
+                comment=form.cleaned_data["comment"],
+            )
+        except PermissionDenied as e:
+            return JsonResponse({"success": False, "error": str(e)}, status=403)
+
+        return JsonResponse({"success": True, "count": count, "missing": len(set(ids)) - count})
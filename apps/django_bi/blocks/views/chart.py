@@ -2,13 +2,18 @@ from django.http import Http404
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 
 from django.shortcuts import render
 from apps.django_bi.blocks.registry import block_registry
 from apps.django_bi.blocks.models.block import Block
 from apps.django_bi.blocks.models.block_filter_config import BlockFilterConfig
+from apps.django_bi.blocks.services.etags import block_view_etag
 
 
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=block_view_etag)
 def render_chart_block(request, block_name):
     block = block_registry.get(block_name)
     if not block:
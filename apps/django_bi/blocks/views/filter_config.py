@@ -12,6 +12,7 @@ from apps.django_bi.blocks.models.block import Block
 from apps.django_bi.blocks.models.block_filter_config import BlockFilterConfig
 from apps.django_bi.blocks.models.config_templates import BlockFilterLayoutTemplate
 from apps.django_bi.blocks.services.blocks_filter_utils import FilterResolutionMixin
+from apps.django_bi.blocks.services.filter_schema import get_filter_schema
 from apps.django_bi.permissions.checks import (
     can_read_field as can_read_field_generic,
 )
@@ -60,7 +61,7 @@ class FilterConfigView(LoginRequiredMixin, FilterResolutionMixin, FormView):
                 output_field=IntegerField(),
             )
         ).order_by("_vis_order", "name")
-        self.raw_schema = self.block_impl.get_filter_schema(request)
+        self.raw_schema = get_filter_schema(self.block_impl, request)
         # Resolve dynamic choices and normalize types
         schema = self._resolve_filter_schema(self.raw_schema, request.user)
         # Prune fields the user cannot read at field/state level
@@ -10,6 +10,7 @@ from apps.django_bi.blocks.models.block_filter_layout import BlockFilterLayout
 from apps.django_bi.blocks.models.config_templates import BlockFilterLayoutTemplate
 from apps.django_bi.blocks.registry import block_registry
 from apps.django_bi.blocks.services.blocks_filter_utils import FilterResolutionMixin
+from apps.django_bi.blocks.services.filter_schema import get_filter_schema
 
 
 class FilterLayoutForm(forms.Form):
@@ -33,10 +34,7 @@ class FilterLayoutView(LoginRequiredMixin, View):
         block_impl = block_registry.get(block_name)
         if not block_impl:
             raise Http404("Invalid block")
-        try:
-            raw_schema = block_impl.get_filter_schema(request)
-        except TypeError:
-            raw_schema = block_impl.get_filter_schema(request.user)
+        raw_schema = get_filter_schema(block_impl, request)
         schema = FilterResolutionMixin._resolve_filter_schema(raw_schema, request.user)
         available = []
         for k, cfg in (schema or {}).items():
@@ -73,10 +71,7 @@ class FilterLayoutView(LoginRequiredMixin, View):
             block_impl = block_registry.get(block_name)
             if not block_impl:
                 raise Http404("Invalid block")
-            try:
-                raw_schema = block_impl.get_filter_schema(request)
-            except TypeError:
-                raw_schema = block_impl.get_filter_schema(request.user)
+            raw_schema = get_filter_schema(block_impl, request)
             schema = FilterResolutionMixin._resolve_filter_schema(raw_schema, request.user)
             available = []
             for k, cfg in (schema or {}).items():
@@ -131,10 +126,7 @@ class AdminFilterLayoutView(LoginRequiredMixin, View):
         block_impl = block_registry.get(block_name)
         if not block_impl:
             raise Http404("Invalid block")
-        try:
-            raw_schema = block_impl.get_filter_schema(request)
-        except TypeError:
-            raw_schema = block_impl.get_filter_schema(request.user)
+        raw_schema = get_filter_schema(block_impl, request)
         schema = FilterResolutionMixin._resolve_filter_schema(raw_schema, request.user)
         available = []
         for k, cfg in (schema or {}).items():
@@ -50,7 +50,12 @@ class InlineEditView(LoginRequiredMixin, View):
             python_value = model_field.clean(value, instance)
             setattr(instance, field_name, python_value)
             instance.full_clean(validate_unique=False)
-            instance.save()
+            # Write just this column (plus auto_now stamps); auto-computed
+            # models add the computed fields that depend on it.
+            update_fields = [model_field.name] + [
+                f.name for f in model._meta.concrete_fields if getattr(f, "auto_now", False)
+            ]
+            instance.save(update_fields=update_fields)
         except FieldDoesNotExist:
             return JsonResponse({"success": False, "error": "Invalid field"}, status=400)
         except ValidationError as e:
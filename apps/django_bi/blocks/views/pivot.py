@@ -1,9 +1,14 @@
 from django.http import Http404
 from django.shortcuts import render
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 
 from apps.django_bi.blocks.registry import block_registry
+from apps.django_bi.blocks.services.etags import block_view_etag
 
 
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=block_view_etag)
 def render_pivot_block(request, block_name):
     block = block_registry.get(block_name)
     if not block:
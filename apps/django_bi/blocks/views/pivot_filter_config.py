@@ -9,6 +9,7 @@ from apps.django_bi.blocks.models.block import Block
 from apps.django_bi.blocks.models.block_filter_config import BlockFilterConfig
 from apps.django_bi.blocks.registry import block_registry
 from apps.django_bi.blocks.services.blocks_filter_utils import FilterResolutionMixin
+from apps.django_bi.blocks.services.filter_schema import get_filter_schema
 from apps.django_bi.blocks.models.config_templates import BlockFilterLayoutTemplate
 
 
@@ -32,10 +33,7 @@ class PivotFilterConfigView(LoginRequiredMixin, FormView, FilterResolutionMixin)
         if not self.block_instance:
             raise Http404(f"Block '{block_name}' not found.")
         self.user = request.user
-        try:
-            raw_schema = self.block_instance.get_filter_schema(request)
-        except TypeError:
-            raw_schema = self.block_instance.get_filter_schema(self.user)
+        raw_schema = get_filter_schema(self.block_instance, request)
         self.filter_schema = self._resolve_filter_schema(raw_schema, self.user)
         return super().dispatch(request, block_name, *args, **kwargs)
 
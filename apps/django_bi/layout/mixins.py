@@ -1,6 +1,7 @@
 from apps.django_bi.blocks.registry import block_registry
 from apps.django_bi.blocks.models.block_filter_layout import BlockFilterLayout
 from apps.django_bi.blocks.services.blocks_filter_utils import FilterResolutionMixin
+from apps.django_bi.blocks.services.filter_schema import get_filter_schema
 from apps.django_bi.layout.models import Layout
 from django.http import Http404
 from django.shortcuts import get_object_or_404
@@ -109,11 +110,7 @@ class LayoutFilterSchemaMixin(FilterResolutionMixin):
                 # No user layout for this block -> contribute nothing
                 continue
             # Get the block's full schema then filter down to allowed keys
-            try:
-                schema = block_impl.get_filter_schema(request)
-            except TypeError:
-                schema = block_impl.get_filter_schema(user)
-            schema = schema or {}
+            schema = get_filter_schema(block_impl, request)
             limited = {k: v for k, v in schema.items() if k in allowed_keys}
             raw_schema.update(limited)
         return self._resolve_filter_schema(raw_schema, user)
@@ -11,11 +11,14 @@ from django.views.generic import TemplateView, FormView, DeleteView
 from django import forms
 from django.views import View
 from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 
 from apps.django_bi.blocks.registry import block_registry
 from apps.django_bi.layout.models import Layout, LayoutBlock, LayoutFilterConfig
 from apps.django_bi.blocks.models.block_filter_config import BlockFilterConfig
 from apps.django_bi.blocks.models.block_column_config import BlockColumnConfig
+from apps.django_bi.blocks.services.etags import block_etag
 
 from apps.django_bi.layout.forms import (
     LayoutForm,
@@ -768,6 +771,20 @@ class LayoutBlockRenderView(LoginRequiredMixin, LayoutAccessMixin, LayoutFilterS
                     )
                 }
             )
+        # Answer 304 before any filter/data work when the client copy is current.
+        etag = block_etag(
+            block_impl,
+            request,
+            instance_id=str(lb.id),
+            extra_models=(Layout, LayoutBlock, LayoutFilterConfig),
+            extra=layout.pk,
+        )
+        if etag:
+            etag = quote_etag(etag)
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                patch_cache_control(not_modified, private=True, no_cache=True)
+                return not_modified
         # Rebuild layout sidebar filter schema and selected values based on current URL
         from django.db.models import Q, Case, When, IntegerField
         q = LayoutFilterConfig.objects.filter(layout=layout).filter(
@@ -845,4 +862,9 @@ class LayoutBlockRenderView(LoginRequiredMixin, LayoutAccessMixin, LayoutFilterS
                 f"Error rendering block '{lb.block.name}': {str(exc)}"
                 "</div></div>"
             )
-        return JsonResponse({"html": html})
+            etag = None
+        response = JsonResponse({"html": html})
+        if etag:
+            response.headers["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('django_bi', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transitionlog',
+            index=models.Index(fields=['content_type', 'object_id', 'timestamp', 'id'], name='idx_translog_object_time'),
+        ),
+        migrations.AddIndex(
+            model_name='transitionlog',
+            index=models.Index(fields=['timestamp', 'id'], name='idx_translog_time'),
+        ),
+    ]
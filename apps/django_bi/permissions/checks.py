@@ -50,6 +50,28 @@ def has_perm_cached(user, perm: str) -> bool:
     return _cached_has_perm(user, perm)
 
 
+def get_user_group_ids(user) -> frozenset:
+    """Return the ids of ``user``'s groups, loaded once per request.
+
+    Shares the per-request permission cache, so it is cleared and disabled
+    together with it. Anonymous users (and ``None``) have no groups.
+    """
+
+    if user is None or getattr(user, "pk", None) is None:
+        return frozenset()
+    if _cache_disabled_var.get():
+        return frozenset(user.groups.values_list("id", flat=True))
+
+    cache = _perm_cache_var.get()
+    if cache is None:
+        cache = {}
+        _perm_cache_var.set(cache)
+    key = (id(user), "__group_ids__")
+    if key not in cache:
+        cache[key] = frozenset(user.groups.values_list("id", flat=True))
+    return cache[key]
+
+
 def _bypass_all(user) -> bool:
     """Return True if the user should bypass all permission checks.
 
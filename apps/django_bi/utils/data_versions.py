@@ -0,0 +1,211 @@
+"""Per-model data version counters.
+
+Every model keeps a monotonically increasing version number in the
+``DataVersion`` table, shared by every process using the database. Saves
+and deletes of tracked models bump it automatically through signals, which
+lets callers validate cached results (ETags, in-memory indexes, lookup
+caches) across web workers and import commands.
+
+Only models registered with :func:`track_data_versions` are bumped by the
+signals: block data models (at block registration), block configuration,
+workflow and the models behind process-wide caches, plus any model whose
+version was read in this process. Writes to other models cost nothing.
+
+Bulk operations such as ``QuerySet.update()``, ``bulk_create()`` or raw SQL
+bypass model signals; code performing them should call
+:func:`bump_data_version` once the write has completed.
+
+The shared counters are bumped when the surrounding transaction commits,
+with one ``UPDATE`` for every model written in the transaction, so a bump
+never holds a row lock for the length of an import. A process-local counter
+is bumped right away, so the writing process sees its own changes before
+the commit. Within :func:`data_version_snapshot` (every request, through
+``DataVersionMiddleware``, and the import commands) shared versions are
+read once per model.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional, Set
+
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.django_bi.utils.models import DataVersion
+
+__all__ = [
+    "bump_data_version",
+    "data_version_snapshot",
+    "get_data_version",
+    "get_data_versions",
+    "model_label",
+    "track_data_versions",
+]
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_local_bumps: Dict[str, int] = {}
+_snapshot: ContextVar[Optional[Dict[str, int]]] = ContextVar("django_bi_data_versions", default=None)
+_tracked: Set[str] = set()
+_pending = threading.local()
+_table_ready = False
+
+
+def model_label(model) -> str:
+    """Return the lower-cased ``app_label.model_name`` for ``model``."""
+    return model._meta.label_lower
+
+
+def track_data_versions(*models) -> None:
+    """Bump the versions of ``models`` on every save, delete and m2m change."""
+    _tracked.update(model_label(m) for m in models if m is not None)
+
+
+def _initial_version() -> int:
+    # Seeded from the clock, and bumps never go below it: a counter whose
+    # bump was rolled back doesn't hand out the same value again.
+    return time.time_ns()
+
+
+def _has_table() -> bool:
+    # Writes during ``migrate`` can run before the table exists.
+    global _table_ready
+    if not _table_ready:
+        _table_ready = DataVersion._meta.db_table in connection.introspection.table_names()
+    return _table_ready
+
+
+def _read_shared(labels) -> Dict[str, int]:
+    if not _has_table():
+        return {}
+    found = dict(DataVersion.objects.filter(label__in=labels).values_list("label", "version"))
+    missing = [label for label in labels if label not in found]
+    if missing:
+        DataVersion.objects.bulk_create(
+            [DataVersion(label=label, version=_initial_version()) for label in missing], ignore_conflicts=True
+        )
+        found.update(DataVersion.objects.filter(label__in=missing).values_list("label", "version"))
+    return found
+
+
+def get_data_versions(models: Iterable) -> Dict[str, int]:
+    """Return ``{label: version}`` for each model in ``models``.
+
+    Missing counters are initialised on first access.
+    """
+    labels = sorted({model_label(m) for m in models})
+    if not labels:
+        return {}
+    _tracked.update(labels)
+    snapshot = _snapshot.get()
+    shared = {label: snapshot[label] for label in labels if label in snapshot} if snapshot is not None else {}
+    missing = [label for label in labels if label not in shared]
+    if missing:
+        read = _read_shared(missing)
+        shared.update(read)
+        if snapshot is not None:
+            snapshot.update(read)
+    return {label: shared.get(label, 0) + _local_bumps.get(label, 0) for label in labels}
+
+
+def get_data_version(model) -> int:
+    """Return the current data version of ``model``."""
+    return get_data_versions([model])[model_label(model)]
+
+
+def _bump_shared(labels) -> None:
+    try:
+        if not _has_table():
+            return
+        bumped = DataVersion.objects.filter(label__in=labels).update(
+            version=Greatest(F("version") + 1, Value(_initial_version()))
+        )
+        if bumped < len(labels):
+            # Counter missing (never read): start a fresh one.
+            DataVersion.objects.bulk_create(
+                [DataVersion(label=label, version=_initial_version()) for label in labels], ignore_conflicts=True
+            )
+    except DatabaseError:
+        log.exception("Could not bump data versions of %s", ", ".join(labels))
+
+
+class _PendingBumps:
+    """Labels written in the current transaction, bumped together on commit."""
+
+    def __init__(self):
+        self.labels: Set[str] = set()
+
+    def __call__(self):
+        if getattr(_pending, "bumps", None) is self:
+            _pending.bumps = None
+        _bump_shared(sorted(self.labels))
+
+
+def _queue_shared_bump(labels) -> None:
+    conn = transaction.get_connection()
+    if not conn.in_atomic_block:
+        _bump_shared(labels)
+        return
+    bumps = getattr(_pending, "bumps", None)
+    # A rolled back transaction drops its callback without running it.
+    if bumps is None or not any(entry[1] is bumps for entry in conn.run_on_commit):
+        bumps = _pending.bumps = _PendingBumps()
+        conn.on_commit(bumps)
+    bumps.labels.update(labels)
+
+
+def bump_data_version(*models) -> None:
+    """Increment the data version of each model in ``models``."""
+    labels = sorted({model_label(m) for m in models})
+    if not labels:
+        return
+    with _lock:
+        for label in labels:
+            _local_bumps[label] = _local_bumps.get(label, 0) + 1
+    _queue_shared_bump(labels)
+
+
+@contextmanager
+def data_version_snapshot():
+    """Read each model's shared version at most once inside the block.
+
+    Bumps made by this process are still seen at once; those of other
+    processes from the next snapshot on. Nested blocks share the outer one.
+    """
+    if _snapshot.get() is not None:
+        yield
+        return
+    token = _snapshot.set({})
+    try:
+        yield
+    finally:
+        _snapshot.reset(token)
+
+
+def _is_tracked(model) -> bool:
+    return model is not None and model._meta.label_lower in _tracked
+
+
+@receiver(post_save, dispatch_uid="apps.django_bi.data_versions.post_save")
+@receiver(post_delete, dispatch_uid="apps.django_bi.data_versions.post_delete")
+def _bump_on_write(sender, **kwargs):
+    if _is_tracked(sender):
+        bump_data_version(sender)
+
+
+@receiver(m2m_changed, dispatch_uid="apps.django_bi.data_versions.m2m_changed")
+def _bump_on_m2m_change(sender, instance=None, model=None, action=None, **kwargs):
+    if not action or not action.startswith("post_"):
+        return
+    touched = [m for m in (sender, type(instance) if instance is not None else None, model) if _is_tracked(m)]
+    if touched:
+        bump_data_version(*touched)
@@ -0,0 +1,21 @@
+from asgiref.sync import iscoroutinefunction
+
+from .data_versions import data_version_snapshot
+
+
+class DataVersionMiddleware:
+    """Read each model's shared data version once per request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._is_async = iscoroutinefunction(get_response)
+
+    def __call__(self, request):
+        if self._is_async:
+            return self._acall(request)
+        with data_version_snapshot():
+            return self.get_response(request)
+
+    async def _acall(self, request):
+        with data_version_snapshot():
+            return await self.get_response(request)
@@ -0,0 +1,11 @@
+from django.db import models
+
+
+class DataVersion(models.Model):
+    """Shared data version counter of one model (see ``utils.data_versions``)."""
+
+    label = models.CharField(max_length=255, primary_key=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.label}@{self.version}"
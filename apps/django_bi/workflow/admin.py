@@ -19,4 +19,5 @@ class TransitionAdmin(admin.ModelAdmin):
 @admin.register(TransitionLog)
 class TransitionLogAdmin(admin.ModelAdmin):
     list_display = ("timestamp", "user", "content_type", )
+    list_select_related = ("user", "content_type")
     search_fields = ("timestamp",)
@@ -1,7 +1,12 @@
 from django.core.exceptions import PermissionDenied
 from django.contrib.contenttypes.models import ContentType
 from django.conf import settings
+from django.db import transaction
 
+from apps.django_bi.permissions.checks import get_user_group_ids
+from apps.django_bi.utils.data_versions import bump_data_version
+
+from .graph import get_transition_graph
 from .models import Transition, TransitionLog, Workflow
 
 def _bypass_all(user) -> bool:
@@ -12,24 +17,25 @@ def _bypass_all(user) -> bool:
 
 
 def get_allowed_transitions(obj, user):
-    state = getattr(obj, "workflow_state", None)
-    workflow = getattr(obj, "workflow", None)
+    # Ids only, so objects loaded without select_related cost no queries
+    state_id = getattr(obj, "workflow_state_id", None)
+    workflow_id = getattr(obj, "workflow_id", None)
 
-    if not state or not workflow:
+    if not state_id or not workflow_id:
         return []
 
-    if workflow.status == Workflow.INACTIVE:
+    graph = get_transition_graph(workflow_id)
+    if graph.status == Workflow.INACTIVE:
         return Transition.objects.none()
 
-    transitions = Transition.objects.filter(
-        workflow=workflow,
-        source_state=state,
-    ).prefetch_related("allowed_groups")
+    return _transitions_for_user(graph, state_id, user)
+
 
+def _transitions_for_user(graph, state_id, user):
     if _bypass_all(user):
-        return list(transitions)
+        return graph.transitions_from(state_id)
 
-    return [t for t in transitions if t.is_allowed_for_user(user)]
+    return graph.transitions_from(state_id, get_user_group_ids(user))
 
 def apply_transition(obj, transition_name, user, *, comment="", save=True):
     allowed_transitions = get_allowed_transitions(obj, user)
@@ -59,3 +65,60 @@ def apply_transition(obj, transition_name, user, *, comment="", save=True):
     )
 
     return transition.dest_state
+
+
+BULK_CHUNK_SIZE = 500
+
+
+def apply_transition_bulk(queryset, transition_name, user, *, comment=""):
+    """Apply ``transition_name`` to every object of ``queryset``; return how many moved.
+
+    Permissions are checked once per distinct (workflow, state). If any of
+    them does not allow the transition nothing is changed. The state change
+    is one UPDATE per source state (per chunk of ``BULK_CHUNK_SIZE`` rows)
+    and the ``TransitionLog`` rows are written with ``bulk_create``, all in
+    one transaction. Like ``apply_transition(save=True)`` only
+    ``workflow_state`` is written: no ``save()``, signals or auto_now stamps.
+    """
+    model = queryset.model
+    with transaction.atomic():
+        groups = {}
+        for pk, workflow_id, state_id in queryset.select_for_update().values_list("pk", "workflow_id", "workflow_state_id"):
+            groups.setdefault((workflow_id, state_id), []).append(pk)
+
+        plan = []
+        for (workflow_id, state_id), pks in groups.items():
+            graph = get_transition_graph(workflow_id) if workflow_id else None
+            if graph is None or graph.status == Workflow.INACTIVE:
+                raise PermissionDenied("This workflow is inactive and cannot be modified.")
+            allowed = _transitions_for_user(graph, state_id, user) if state_id else []
+            transition = next((t for t in allowed if t.name == transition_name), None)
+            if not transition:
+                raise PermissionDenied(f"User is not allowed to perform transition '{transition_name}'.")
+            plan.append((transition, state_id, pks))
+
+        content_type = ContentType.objects.get_for_model(model)
+        logs = []
+        for transition, state_id, pks in plan:
+            for i in range(0, len(pks), BULK_CHUNK_SIZE):
+                chunk = pks[i : i + BULK_CHUNK_SIZE]
+                model.objects.filter(pk__in=chunk).update(workflow_state_id=transition.dest_state_id)
+            logs.extend(
+                TransitionLog(
+                    user=user if getattr(user, "pk", None) else None,
+                    content_type=content_type,
+                    object_id=pk,
+                    from_state_id=state_id,
+                    to_state_id=transition.dest_state_id,
+                    transition=transition,
+                    comment=comment,
+                )
+                for pk in pks
+            )
+        TransitionLog.objects.bulk_create(logs, batch_size=BULK_CHUNK_SIZE)
+
+    if logs:
+        # update() and bulk_create() send no post_save
+        bump_data_version(model, TransitionLog)
+    return len(logs)
+
@@ -0,0 +1,95 @@
+"""In-memory workflow structure: transition graphs and start states.
+
+Each workflow's transitions are loaded once per process, grouped by source
+state with their allowed group ids, and kept until the data version of the
+workflow tables changes. Together with the per-request group-id cache
+(:func:`~apps.django_bi.permissions.checks.get_user_group_ids`) this lets
+list templates ask for the allowed transitions of many objects without
+further queries. :func:`get_start_states` does the same for the start
+state of each workflow, used when creating objects.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from apps.django_bi.utils.data_versions import get_data_versions, track_data_versions
+from apps.django_bi.workflow.models import State, Transition, Workflow
+
+_lock = threading.Lock()
+_graphs: Dict[int, Tuple[Dict[str, int], "TransitionGraph"]] = {}
+_start_states: Optional[Tuple[Dict[str, int], Dict[int, Tuple[str, Optional[int]]]]] = None
+
+
+def _graph_models():
+    return (Workflow, State, Transition, Transition.allowed_groups.through)
+
+
+track_data_versions(*_graph_models())
+
+
+class TransitionGraph:
+    """Transitions of one workflow keyed by source state id.
+
+    Transition instances come with ``source_state``, ``dest_state`` and
+    ``workflow`` loaded and are shared between callers: don't modify them.
+    """
+
+    def __init__(self, workflow_id: int, status: Optional[str], transitions):
+        self.workflow_id = workflow_id
+        self.status = status
+        self.by_source: Dict[int, List[Tuple[Transition, FrozenSet[int]]]] = {}
+        for transition in transitions:
+            groups = frozenset(group.pk for group in transition.allowed_groups.all())
+            self.by_source.setdefault(transition.source_state_id, []).append((transition, groups))
+
+    @classmethod
+    def load(cls, workflow_id: int) -> "TransitionGraph":
+        status = Workflow.objects.filter(pk=workflow_id).values_list("status", flat=True).first()
+        transitions = (
+            Transition.objects.filter(workflow_id=workflow_id)
+            .select_related("workflow", "source_state", "dest_state")
+            .prefetch_related("allowed_groups")
+            .order_by("id")
+        )
+        return cls(workflow_id, status, transitions)
+
+    def transitions_from(self, state_id, group_ids: Optional[FrozenSet[int]] = None) -> List[Transition]:
+        """Transitions leaving ``state_id``; only those open to ``group_ids`` unless it is None."""
+        entries = self.by_source.get(state_id, ())
+        if group_ids is None:
+            return [transition for transition, _groups in entries]
+        return [transition for transition, groups in entries if groups & group_ids]
+
+
+def get_transition_graph(workflow_id: int) -> TransitionGraph:
+    """Process-wide :class:`TransitionGraph` for ``workflow_id``, rebuilt when workflow data changes."""
+    versions = get_data_versions(_graph_models())
+    cached = _graphs.get(workflow_id)
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+    with _lock:
+        cached = _graphs.get(workflow_id)
+        if cached is None or cached[0] != versions:
+            cached = _graphs[workflow_id] = (versions, TransitionGraph.load(workflow_id))
+        return cached[1]
+
+
+def get_start_states() -> Dict[int, Tuple[str, Optional[int]]]:
+    """``{workflow_id: (status, start state id or None)}`` for every workflow, cached like the graphs."""
+    global _start_states
+    versions = get_data_versions((Workflow, State))
+    cached = _start_states
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+    with _lock:
+        cached = _start_states
+        if cached is None or cached[0] != versions:
+            starts: Dict[int, Optional[int]] = {}
+            for workflow_id, state_id in State.objects.filter(is_start=True).order_by("id").values_list("workflow_id", "id"):
+                starts.setdefault(workflow_id, state_id)
+            mapping = {pk: (status, starts.get(pk)) for pk, status in Workflow.objects.values_list("id", "status")}
+            cached = _start_states = (versions, mapping)
+        return cached[1]
+
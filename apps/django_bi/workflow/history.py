@@ -0,0 +1,152 @@
+"""Transition history: paginated log queries and time-in-state analytics.
+
+:func:`get_history` pages through ``TransitionLog`` newest first with a
+keyset cursor on ``(timestamp, id)``, which the ``(content_type, object_id,
+timestamp)`` and ``timestamp`` indexes serve without OFFSET scans, and
+resolves the logged objects with one query per content type.
+:func:`time_in_state` measures how long objects stayed in each state with a
+``LEAD()`` window over each object's log, aggregated in the database.
+"""
+
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, DateTimeField, DurationField, ExpressionWrapper, F, Q, Sum, Value, Window
+from django.db.models.functions import Coalesce, Greatest, Lead, Least
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.django_bi.workflow.models import TransitionLog
+
+__all__ = ["HistoryPage", "get_history", "history_queryset", "resolve_content_objects", "time_in_state"]
+
+
+@dataclass
+class HistoryPage:
+    entries: List[TransitionLog] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def history_queryset(obj=None, *, model=None, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Logs of ``obj`` (or of every object of ``model``) in ``[start, end)``, newest first."""
+    qs = TransitionLog.objects.select_related("user", "content_type", "from_state", "to_state", "transition")
+    if obj is not None:
+        qs = qs.filter(content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk)
+    elif model is not None:
+        qs = qs.filter(content_type=ContentType.objects.get_for_model(model))
+    if start is not None:
+        qs = qs.filter(timestamp__gte=start)
+    if end is not None:
+        qs = qs.filter(timestamp__lt=end)
+    return qs.order_by("-timestamp", "-id")
+
+
+def _encode_cursor(log: TransitionLog) -> str:
+    raw = f"{log.timestamp.isoformat()}|{log.pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        stamp, pk = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        timestamp = parse_datetime(stamp)
+        if timestamp is None:
+            raise ValueError(stamp)
+        return timestamp, int(pk)
+    except Exception as e:
+        raise ValueError(f"Invalid history cursor: {cursor!r}") from e
+
+
+def resolve_content_objects(logs: Iterable[TransitionLog]) -> None:
+    """Load the ``content_object`` of ``logs`` with one query per content type."""
+    by_type: Dict[int, List[TransitionLog]] = {}
+    for log in logs:
+        by_type.setdefault(log.content_type_id, []).append(log)
+    for content_type_id, group in by_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        found = model._base_manager.in_bulk({log.object_id for log in group}) if model else {}
+        for log in group:
+            TransitionLog.content_object.set_cached_value(log, found.get(log.object_id))
+
+
+def get_history(
+    obj=None,
+    *,
+    model=None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    resolve_objects: bool = True,
+) -> HistoryPage:
+    """One page of :func:`history_queryset`; pass ``next_cursor`` back for the next one."""
+    qs = history_queryset(obj, model=model, start=start, end=end)
+    if cursor:
+        timestamp, pk = _decode_cursor(cursor)
+        qs = qs.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=pk))
+    limit = max(1, int(limit))
+    entries = list(qs[: limit + 1])
+    page = HistoryPage(entries=entries[:limit])
+    if len(entries) > limit:
+        page.next_cursor = _encode_cursor(page.entries[-1])
+    if resolve_objects and obj is None:
+        resolve_content_objects(page.entries)
+    elif obj is not None:
+        for log in page.entries:
+            TransitionLog.content_object.set_cached_value(log, obj)
+    return page
+
+
+def time_in_state(
+    obj=None,
+    *,
+    model=None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Dict[int, Dict[str, object]]:
+    """``{state_id: {"duration": timedelta, "visits": int}}`` spent in each state.
+
+    A stay runs from the log entering the state to the object's next log
+    (or ``end``/now for the current state) and is clipped to ``[start, end)``.
+    """
+    until = end or timezone.now()
+    qs = TransitionLog.objects.all()
+    if obj is not None:
+        qs = qs.filter(content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk)
+    elif model is not None:
+        qs = qs.filter(content_type=ContentType.objects.get_for_model(model))
+    state_ids = sorted(set(qs.exclude(to_state=None).values_list("to_state_id", flat=True)))
+    if not state_ids:
+        return {}
+
+    upper = Value(until, output_field=DateTimeField())
+    left = Window(
+        Lead("timestamp"),
+        partition_by=[F("content_type"), F("object_id")],
+        order_by=[F("timestamp").asc(), F("id").asc()],
+    )
+    stays = qs.annotate(left_at=Coalesce(left, upper)).filter(timestamp__lt=until)
+    entered = F("timestamp")
+    if start is not None:
+        stays = stays.filter(left_at__gt=start)
+        entered = Greatest(F("timestamp"), Value(start, output_field=DateTimeField()))
+    stays = stays.annotate(stay=ExpressionWrapper(Least(F("left_at"), upper) - entered, output_field=DurationField()))
+
+    aggregates = {}
+    for state_id in state_ids:
+        aggregates[f"duration_{state_id}"] = Sum("stay", filter=Q(to_state_id=state_id))
+        aggregates[f"visits_{state_id}"] = Count("id", filter=Q(to_state_id=state_id))
+    totals = stays.aggregate(**aggregates)
+    return {
+        state_id: {
+            "duration": totals[f"duration_{state_id}"] or timedelta(0),
+            "visits": totals[f"visits_{state_id}"],
+        }
+        for state_id in state_ids
+        if totals[f"visits_{state_id}"]
+    }
@@ -1,4 +1,5 @@
 from django.db import models
+from apps.django_bi.utils.data_versions import bump_data_version
 from apps.django_bi.workflow.models import Workflow
 
 class State(models.Model):
@@ -28,4 +29,6 @@ class State(models.Model):
 
         # If user marks this state as start, demote others in same workflow
         elif self.is_start:
-            self.workflow.states.exclude(pk=self.pk).filter(is_start=True).update(is_start=False)
+            if self.workflow.states.exclude(pk=self.pk).filter(is_start=True).update(is_start=False):
+                # update() sends no post_save; cached start states must see the demotion
+                bump_data_version(State)
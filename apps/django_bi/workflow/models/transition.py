@@ -24,4 +24,7 @@ class Transition(models.Model):
         staff_bypass = getattr(settings, "PERMISSIONS_STAFF_BYPASS", True)
         if staff_bypass and getattr(user, "is_staff", False):
             return True
-        return user.groups.filter(id__in=self.allowed_groups.values_list("id", flat=True)).exists()
+        from apps.django_bi.permissions.checks import get_user_group_ids
+
+        # allowed_groups.all() uses prefetched groups when present
+        return any(group.pk in get_user_group_ids(user) for group in self.allowed_groups.all())
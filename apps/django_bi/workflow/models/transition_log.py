@@ -20,6 +20,11 @@ class TransitionLog(models.Model):
 
     class Meta:
         ordering = ["-timestamp"]
+        indexes = [
+            # Per-object history and keyset pagination on (timestamp, id)
+            models.Index(fields=["content_type", "object_id", "timestamp", "id"], name="idx_translog_object_time"),
+            models.Index(fields=["timestamp", "id"], name="idx_translog_time"),
+        ]
 
     def __str__(self):
         return f"{self.content_object} — {self.from_state} → {self.to_state} by {self.user}"
@@ -2,6 +2,55 @@ from django.db import models
 from django.core.exceptions import PermissionDenied
 from apps.django_bi.workflow.models import Workflow, State
 
+
+def _creation_error(status):
+    """Why objects may not be created in a workflow with ``status``, or None."""
+    if status == Workflow.DEPRECATED:
+        # Deprecated: block creation entirely
+        return "This workflow is deprecated; new objects cannot be created."
+    if status == Workflow.INACTIVE:
+        # Inactive: block creation entirely
+        return "This workflow is inactive; new objects cannot be created."
+    return None
+
+
+def assign_start_states(objs):
+    """Apply ``WorkflowModelMixin.save``'s creation rules to unsaved objects in memory.
+
+    ``objs`` are model instances or field dicts (``workflow``/``workflow_id``
+    as instance or id), as built for ``bulk_create`` or a staged import.
+    Objects without a state get their workflow's start state from the cached
+    start-state map. Returns ``{index: message}`` for the objects whose
+    workflow does not allow creation; those are left untouched.
+    """
+    from apps.django_bi.workflow.graph import get_start_states
+
+    starts = None
+    rejected = {}
+    for i, obj in enumerate(objs):
+        if isinstance(obj, dict):
+            workflow = obj.get("workflow", obj.get("workflow_id"))
+            workflow_id = workflow.pk if isinstance(workflow, models.Model) else workflow
+            has_state = obj.get("workflow_state", obj.get("workflow_state_id")) is not None
+        else:
+            workflow_id = obj.workflow_id
+            has_state = obj.workflow_state_id is not None
+        if not workflow_id:
+            continue
+        if starts is None:
+            starts = get_start_states()
+        status, start_id = starts.get(workflow_id, (None, None))
+        error = _creation_error(status)
+        if error:
+            rejected[i] = error
+        elif not has_state and start_id:
+            if isinstance(obj, dict):
+                obj["workflow_state"] = start_id
+            else:
+                obj.workflow_state_id = start_id
+    return rejected
+
+
 class WorkflowModelMixin(models.Model):
     workflow = models.ForeignKey(Workflow, on_delete=models.PROTECT, default=None, blank=True, null=True)
     workflow_state = models.ForeignKey(State, on_delete=models.PROTECT, default=None, blank=True, null=True)
@@ -16,17 +65,10 @@ class WorkflowModelMixin(models.Model):
         return self.workflow_state
 
     def save(self, *args, **kwargs):
-        # Enforce creation rules based on workflow status
-        if not self.pk and self.workflow:
-            status = getattr(self.workflow, "status", None)
-            if status == getattr(self.workflow, "DEPRECATED", "deprecated"):
-                # Deprecated: block creation entirely
-                raise PermissionDenied("This workflow is deprecated; new objects cannot be created.")
-            if status == getattr(self.workflow, "INACTIVE", "inactive"):
-                # Inactive: block creation entirely
-                raise PermissionDenied("This workflow is inactive; new objects cannot be created.")
-
-            # Assign start state if not already set
-            if not self.workflow_state:
-                self.workflow_state = self.workflow.states.filter(is_start=True).first()
+        # Enforce creation rules based on workflow status, and assign the
+        # start state if not already set (from the cached start-state map)
+        if not self.pk and self.workflow_id:
+            rejected = assign_start_states([self])
+            if rejected:
+                raise PermissionDenied(rejected[0])
         super().save(*args, **kwargs)
@@ -1,3 +1,231 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import PermissionDenied
+from django.db import connection
+from django.db.models import F
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.common.models import PurchaseOrder, PurchaseOrderLine
+from apps.django_bi.permissions.checks import clear_perm_cache
+from apps.django_bi.utils.data_versions import data_version_snapshot, model_label
+from apps.django_bi.utils.models import DataVersion
+from apps.django_bi.workflow.apply_transition import apply_transition_bulk, get_allowed_transitions
+from apps.django_bi.workflow.history import get_history, time_in_state
+from apps.django_bi.workflow.models import State, Transition, TransitionLog, Workflow
+from apps.django_bi.workflow.models.workflow_model_mixin import assign_start_states
+
+
+class AllowedTransitionsTests(TestCase):
+    def setUp(self):
+        self.workflow = Workflow.objects.create(name="PO", content_type=ContentType.objects.get_for_model(PurchaseOrder))
+        self.draft = State.objects.create(workflow=self.workflow, name="Draft")
+        self.approved = State.objects.create(workflow=self.workflow, name="Approved")
+        self.rejected = State.objects.create(workflow=self.workflow, name="Rejected")
+        self.buyers = Group.objects.create(name="Buyers")
+        self.managers = Group.objects.create(name="Managers")
+        self.approve = Transition.objects.create(
+            workflow=self.workflow, name="approve", source_state=self.draft, dest_state=self.approved
+        )
+        self.approve.allowed_groups.add(self.managers)
+        self.reject = Transition.objects.create(
+            workflow=self.workflow, name="reject", source_state=self.draft, dest_state=self.rejected
+        )
+        self.reject.allowed_groups.add(self.buyers, self.managers)
+        self.user = get_user_model().objects.create_user("buyer")
+        self.user.groups.add(self.buyers)
+        self.orders = [PurchaseOrder.objects.create(order=f"PO{i}", workflow=self.workflow) for i in range(5)]
+        self.addCleanup(clear_perm_cache)
+
+    def _names(self, obj, user):
+        return [t.name for t in get_allowed_transitions(obj, user)]
+
+    def test_many_objects_cost_no_queries_once_loaded(self):
+        orders = list(PurchaseOrder.objects.filter(pk__in=[o.pk for o in self.orders]))
+        with data_version_snapshot():
+            self.assertEqual(self._names(orders[0], self.user), ["reject"])
+            with self.assertNumQueries(0):
+                for order in orders:
+                    self.assertEqual(self._names(order, self.user), ["reject"])
+                    self.assertEqual(get_allowed_transitions(order, self.user)[0].dest_state, self.rejected)
+
+    def test_graph_and_groups_refresh(self):
+        self.assertEqual(self._names(self.orders[0], self.user), ["reject"])
+        self.approve.allowed_groups.add(self.buyers)
+        self.assertEqual(self._names(self.orders[0], self.user), ["approve", "reject"])
+
+        self.user.groups.clear()
+        # Group ids are cached for the request
+        self.assertEqual(self._names(self.orders[0], self.user), ["approve", "reject"])
+        clear_perm_cache()
+        self.assertEqual(self._names(self.orders[0], self.user), [])
+        self.assertFalse(self.approve.is_allowed_for_user(self.user))
+
+        self.workflow.status = Workflow.INACTIVE
+        self.workflow.save()
+        self.assertEqual(self._names(self.orders[0], get_user_model().objects.create_superuser("admin")), [])
+
+    def test_group_revoked_in_another_process(self):
+        with data_version_snapshot():
+            self.assertEqual(self._names(self.orders[0], self.user), ["reject"])
+        # The admin runs in another worker: the row goes and only the shared counter moves
+        through = Transition.allowed_groups.through
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {through._meta.db_table} WHERE transition_id = %s AND group_id = %s",
+                [self.reject.pk, self.buyers.pk],
+            )
+        DataVersion.objects.filter(label=model_label(through)).update(version=F("version") + 1)
+        clear_perm_cache()
+        with data_version_snapshot():
+            self.assertEqual(self._names(self.orders[0], self.user), [])
+
+
+class StartStateTests(TestCase):
+    def setUp(self):
+        self.workflow = Workflow.objects.create(name="PO", content_type=ContentType.objects.get_for_model(PurchaseOrder))
+        self.draft = State.objects.create(workflow=self.workflow, name="Draft", is_start=True)
+        self.approved = State.objects.create(workflow=self.workflow, name="Approved")
+
+    def test_save_uses_cached_start_state(self):
+        order = PurchaseOrder(order="PO1", workflow=self.workflow)
+        with data_version_snapshot():
+            PurchaseOrder.objects.create(order="PO0", workflow=self.workflow)
+            with self.assertNumQueries(0):
+                self.assertEqual(assign_start_states([order]), {})
+        self.assertEqual(order.workflow_state_id, self.draft.pk)
+
+        self.approved.is_start = True
+        self.approved.save()
+        self.assertEqual(PurchaseOrder.objects.create(order="PO2", workflow=self.workflow).workflow_state, self.approved)
+
+    def test_batches_of_instances_and_rows(self):
+        closed = Workflow.objects.create(
+            name="Old", content_type=ContentType.objects.get_for_model(PurchaseOrder), status=Workflow.DEPRECATED
+        )
+        objs = [
+            PurchaseOrder(order="PO1", workflow=self.workflow),
+            {"order": "PO2", "workflow": self.workflow.pk},
+            {"order": "PO3", "workflow": closed},
+            {"order": "PO4", "workflow": self.workflow, "workflow_state": self.approved},
+            {"order": "PO5"},
+        ]
+        rejected = assign_start_states(objs)
+        self.assertEqual(list(rejected), [2])
+        self.assertIn("deprecated", rejected[2])
+        self.assertEqual(objs[0].workflow_state_id, self.draft.pk)
+        self.assertEqual(objs[1]["workflow_state"], self.draft.pk)
+        self.assertEqual(objs[3]["workflow_state"], self.approved)
+        self.assertNotIn("workflow_state", objs[4])
+        with self.assertRaises(PermissionDenied):
+            PurchaseOrder.objects.create(order="PO6", workflow=closed)
+
+
+class BulkTransitionTests(TestCase):
+    def setUp(self):
+        self.workflow = Workflow.objects.create(
+            name="PO line", content_type=ContentType.objects.get_for_model(PurchaseOrderLine)
+        )
+        self.open = State.objects.create(workflow=self.workflow, name="Open")
+        self.hold = State.objects.create(workflow=self.workflow, name="On hold")
+        self.closed = State.objects.create(workflow=self.workflow, name="Closed")
+        buyers = Group.objects.create(name="Buyers")
+        for source in (self.open, self.hold):
+            transition = Transition.objects.create(
+                workflow=self.workflow, name="close", source_state=source, dest_state=self.closed
+            )
+            transition.allowed_groups.add(buyers)
+        self.user = get_user_model().objects.create_user("buyer", password="x")
+        self.user.groups.add(buyers)
+        order = PurchaseOrder.objects.create(order="PO1")
+        self.lines = [
+            PurchaseOrderLine.objects.create(order=order, line=i, sequence=1, workflow=self.workflow) for i in range(6)
+        ]
+        PurchaseOrderLine.objects.filter(pk__in=[line.pk for line in self.lines[:2]]).update(workflow_state=self.hold)
+        self.addCleanup(clear_perm_cache)
+
+    def test_moves_every_row_and_logs_in_bulk(self):
+        queryset = PurchaseOrderLine.objects.filter(pk__in=[line.pk for line in self.lines])
+        self.assertEqual(apply_transition_bulk(queryset, "close", self.user, comment="done"), 6)
+        self.assertEqual(set(queryset.values_list("workflow_state", flat=True)), {self.closed.pk})
+        logs = TransitionLog.objects.filter(to_state=self.closed, comment="done", user=self.user)
+        self.assertEqual(logs.count(), 6)
+        self.assertEqual(logs.filter(from_state=self.hold).count(), 2)
+
+    def test_all_or_nothing_when_a_state_is_not_allowed(self):
+        PurchaseOrderLine.objects.filter(pk=self.lines[-1].pk).update(workflow_state=self.closed)
+        with self.assertRaises(PermissionDenied):
+            apply_transition_bulk(PurchaseOrderLine.objects.all(), "close", self.user)
+        self.assertFalse(PurchaseOrderLine.objects.filter(workflow_state=self.closed).exclude(pk=self.lines[-1].pk).exists())
+        self.assertFalse(TransitionLog.objects.exists())
+
+    def test_table_block_endpoint(self):
+        self.client.force_login(self.user)
+        url = reverse("blocks:bulk_transition", args=["purchase_order_lines_table"])
+        ids = [line.pk for line in self.lines[:3]]
+        response = self.client.post(url, {"ids": ids, "transition": "close"}, content_type="application/json")
+        self.assertEqual(response.json(), {"success": True, "count": 3, "missing": 0})
+        response = self.client.post(url, {"ids": ids, "transition": "close"}, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(url, {"ids": "x", "transition": "close"}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_table_block_endpoint_requires_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        url = reverse("blocks:bulk_transition", args=["purchase_order_lines_table"])
+        body = {"ids": [self.lines[0].pk], "transition": "close"}
+        response = client.post(url, body, content_type="text/plain")
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(TransitionLog.objects.exists())
+
+        token = "a" * 32
+        client.cookies["csrftoken"] = token
+        response = client.post(url, body, content_type="application/json", HTTP_X_CSRFTOKEN=token)
+        self.assertEqual(response.json()["count"], 1)
+
+
+class TransitionHistoryTests(TestCase):
+    def setUp(self):
+        self.workflow = Workflow.objects.create(name="PO", content_type=ContentType.objects.get_for_model(PurchaseOrder))
+        self.draft = State.objects.create(workflow=self.workflow, name="Draft")
+        self.approved = State.objects.create(workflow=self.workflow, name="Approved")
+        self.orders = [PurchaseOrder.objects.create(order=f"PO{i}", workflow=self.workflow) for i in range(3)]
+        content_type = ContentType.objects.get_for_model(PurchaseOrder)
+        self.now = timezone.now()
+        # PO0: Draft for 60 min, then Approved; PO1 and PO2 entered Draft 30 and 20 min ago
+        for order, minutes_ago, state in (
+            (self.orders[0], 90, self.draft),
+            (self.orders[0], 30, self.approved),
+            (self.orders[1], 30, self.draft),
+            (self.orders[2], 20, self.draft),
+        ):
+            log = TransitionLog.objects.create(content_type=content_type, object_id=order.pk, to_state=state)
+            TransitionLog.objects.filter(pk=log.pk).update(timestamp=self.now - timedelta(minutes=minutes_ago))
+
+    def test_keyset_pages_with_resolved_objects(self):
+        seen, cursor = [], None
+        while True:
+            page = get_history(model=PurchaseOrder, cursor=cursor, limit=2)
+            with self.assertNumQueries(0):
+                seen.extend((log.content_object.order, log.to_state.name) for log in page.entries)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+        # Same-timestamp entries continue across the page break by id
+        self.assertEqual(seen, [("PO2", "Draft"), ("PO1", "Draft"), ("PO0", "Approved"), ("PO0", "Draft")])
+        self.assertEqual(len(get_history(self.orders[0]).entries), 2)
+        with self.assertRaises(ValueError):
+            get_history(cursor="bogus")
+
+    def test_time_in_state_with_window_function(self):
+        totals = time_in_state(model=PurchaseOrder, end=self.now)
+        self.assertEqual(totals[self.draft.pk], {"duration": timedelta(minutes=110), "visits": 3})
+        self.assertEqual(totals[self.approved.pk], {"duration": timedelta(minutes=30), "visits": 1})
+        clipped = time_in_state(self.orders[0], start=self.now - timedelta(minutes=45), end=self.now - timedelta(minutes=15))
+        self.assertEqual(clipped[self.draft.pk]["duration"], timedelta(minutes=15))
+        self.assertEqual(clipped[self.approved.pk]["duration"], timedelta(minutes=15))
@@ -1,6 +1,8 @@
 from apps.django_bi.blocks.block_types.chart.dial_block import DialChartBlock
+from apps.django_bi.blocks.services.etags import related_models
 from apps.django_bi.blocks.services.filtering import apply_filter_registry
 from apps.common.models.receipts import ReceiptLine, PurchaseSettings
+from apps.common.settings_cache import get_otd_target_percent
 from apps.common.filters.schemas import (
     supplier_filter,
     date_from_filter,
@@ -18,11 +20,14 @@ class SupplierOtdDial(DialChartBlock):
 
     def get_filter_schema(self, request):
         return {
-            "supplier": supplier_filter(self.block_name, "po_line__order__supplier_id"),
+            "supplier": supplier_filter(self.block_name, "po_line__order__supplier__code"),
             "receipt_date_from": date_from_filter("receipt_date_from", "Receipt From", "receipt_date"),
             "receipt_date_to": date_to_filter("receipt_date_to", "Receipt To", "receipt_date"),
         }
 
+    def get_data_models(self, user):
+        return (*related_models(ReceiptLine), PurchaseSettings)
+
     def get_value(self, user, filters) -> float:
         qs = apply_filter_registry(self.block_name, ReceiptLine.objects.all(), filters, user)
         total = qs.count()
@@ -32,6 +37,5 @@ class SupplierOtdDial(DialChartBlock):
         return round((ontime / total) * 100.0, 2)
 
     def get_target(self, user, filters) -> float:
-        settings = PurchaseSettings.objects.first()
-        return float(getattr(settings, "otd_target_percent", 95) or 95)
+        return get_otd_target_percent()
 
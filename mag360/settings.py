@@ -70,6 +70,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'apps.django_bi.permissions.middleware.PermissionCacheMiddleware',
+    'apps.django_bi.utils.middleware.DataVersionMiddleware',
 ]
 
 ROOT_URLCONF = 'mag360.urls'